@@ -0,0 +1,162 @@
+"""
+规划引擎差分校验：所有引擎在同一布局与配置下的最优代价必须与Dijkstra一致，且路径合法
+
+用法（在项目根目录）：
+    python -m benchmarks.differential --sample 2000 --seed 0
+    python -m benchmarks.differential --full --processes 8
+    python -m benchmarks.differential --engines dijkstra,pareto --random-profiles 4
+
+发现不一致时返回码为1，结果以JSON输出（含各引擎累计耗时）。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from core.engines import PLANNER_ENGINES, EngineNotApplicable, make_table_engine  # noqa: E402
+from core.layouts import count_layouts, unrank_layout, shard_range  # noqa: E402
+from core.path_planner import PathPlanner, COST_PARAMETERS  # noqa: E402
+from core.plan_table import PlanTable, default_profiles  # noqa: E402
+
+REFERENCE_ENGINE = 'dijkstra'
+
+
+def random_profiles(count, seed):
+    """随机代价配置（构型与收集要求也随机）"""
+    rng = random.Random(seed)
+    base = PathPlanner().get_profile()
+    profiles = []
+    for _ in range(count):
+        profile = dict(base)
+        for name in COST_PARAMETERS:
+            profile[name] = rng.randint(0, 10)
+        profile['allow_400'] = rng.random() < 0.5
+        profile['required_r2_count'] = rng.choice((2, 3, 4))
+        profiles.append(profile)
+    return profiles
+
+
+def load_engines(names, table_path):
+    """按名称取引擎，'table' 表示预计算查找表"""
+    engines = {}
+    for name in names:
+        if name == 'table':
+            engines[name] = make_table_engine(PlanTable(table_path))
+        else:
+            engines[name] = PLANNER_ENGINES[name]
+    return engines
+
+
+def check_unit(engine_names, table_path, profile, ranks):
+    """在一个配置下校验一组布局，返回 (不一致列表, 各引擎耗时, 各引擎适用次数)"""
+    engines = load_engines(engine_names, table_path)
+    planner = PathPlanner()
+    planner.apply_profile(profile)
+    timings = dict.fromkeys(engines, 0.0)
+    counts = dict.fromkeys(engines, 0)
+    mismatches = []
+
+    for rank in ranks:
+        layout = unrank_layout(rank)
+        obstacles, r2_positions = layout.get_obstacles(), layout.get_r2_positions()
+        costs = {}
+        for name, engine in engines.items():
+            start = time.perf_counter()
+            try:
+                path = engine(planner, obstacles, r2_positions)
+            except EngineNotApplicable:
+                continue
+            finally:
+                timings[name] += time.perf_counter() - start
+            counts[name] += 1
+
+            if path is None:
+                costs[name] = None
+                continue
+            valid, reason = planner.validate_path(path, obstacles, r2_positions)
+            if not valid:
+                mismatches.append({'rank': rank, 'engine': name, 'error': f"非法路径: {reason}"})
+            costs[name] = planner.calculate_path_cost_with_collection(path)
+
+        reference = costs.get(REFERENCE_ENGINE)
+        for name, cost in costs.items():
+            if cost != reference:
+                mismatches.append({'rank': rank, 'engine': name, 'error': f"代价 {cost} != {reference}"})
+
+    return mismatches, timings, counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="规划引擎差分校验")
+    parser.add_argument('--engines', default=','.join(PLANNER_ENGINES),
+                        help=f"逗号分隔的引擎名（可选: {', '.join(PLANNER_ENGINES)}, table）")
+    parser.add_argument('--table', default=None, help="查找表路径（引擎列表含table时使用）")
+    parser.add_argument('--full', action='store_true', help="校验全部合法布局")
+    parser.add_argument('--shard', default=None, help="K/N：只校验编号区间均分N份后的第K份（0起），用于多机分摊")
+    parser.add_argument('--sample', type=int, default=2000, help="随机抽取的布局数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--random-profiles', type=int, default=2, help="除默认配置外追加的随机代价配置数")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=250)
+    args = parser.parse_args(argv)
+
+    engine_names = [name.strip() for name in args.engines.split(',') if name.strip()]
+    if REFERENCE_ENGINE not in engine_names:
+        engine_names.insert(0, REFERENCE_ENGINE)
+    table_path = args.table
+    if 'table' in engine_names and table_path is None:
+        from core.plan_table import DEFAULT_PLAN_TABLE_PATH
+        table_path = DEFAULT_PLAN_TABLE_PATH
+
+    rank_range = range(count_layouts())
+    if args.shard:
+        index, count = (int(n) for n in args.shard.split('/'))
+        rank_range = range(*shard_range(index, count))
+    if args.full:
+        ranks = list(rank_range)
+    else:
+        ranks = sorted(random.Random(args.seed).sample(rank_range, min(args.sample, len(rank_range))))
+    profiles = default_profiles() + random_profiles(args.random_profiles, args.seed)
+
+    units = [(profile, ranks[i:i + args.chunk_size])
+             for profile in profiles for i in range(0, len(ranks), args.chunk_size)]
+
+    start = time.perf_counter()
+    mismatches = []
+    timings = dict.fromkeys(engine_names, 0.0)
+    counts = dict.fromkeys(engine_names, 0)
+    with ProcessPoolExecutor(args.processes) as pool:
+        futures = [pool.submit(check_unit, engine_names, table_path, profile, unit_ranks)
+                   for profile, unit_ranks in units]
+        for (profile, _), future in zip(units, futures):
+            unit_mismatches, unit_timings, unit_counts = future.result()
+            for item in unit_mismatches:
+                item['profile'] = profile
+            mismatches.extend(unit_mismatches)
+            for name in engine_names:
+                timings[name] += unit_timings[name]
+                counts[name] += unit_counts[name]
+
+    report = {
+        'layouts': len(ranks),
+        'profiles': len(profiles),
+        'wall_time': time.perf_counter() - start,
+        'engines': {name: {'checked': counts[name], 'total_time': timings[name],
+                           'mean_time': timings[name] / counts[name] if counts[name] else None}
+                    for name in engine_names},
+        'mismatches': mismatches[:100],
+        'mismatch_count': len(mismatches),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
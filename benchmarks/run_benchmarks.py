@@ -0,0 +1,199 @@
+"""
+性能基准：规划器、视频渲染与启动耗时
+
+用法（在项目根目录）：
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+
+每项结果取多次重复的最小值（秒），与基线相比超过阈值即判定为退化，返回码为1。
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import product
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 固定布局编号：覆盖不同F/R1位置组合
+FIXED_LAYOUT_RANKS = (0, 5000, 12345, 21000, 30303, 43784)
+
+# 默认退化阈值（相对基线的增幅），启动耗时受系统缓存影响较大
+DEFAULT_THRESHOLD = 0.15
+THRESHOLDS = {
+    'startup.import_main': 0.30,
+    'startup.main_window': 0.30,
+}
+
+
+def measure(func, repeats):
+    """重复执行func，返回 {'value': 最小值, 'median': 中位数, 'repeats': 次数}"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {'value': min(samples), 'median': statistics.median(samples), 'repeats': repeats}
+
+
+def bench_planner(results, repeats, sweep_stride):
+    """单布局求解、全布局扫描与各规则变体"""
+    from core.layouts import count_layouts, unrank_layout
+    from core.path_planner import PathPlanner
+
+    planner = PathPlanner()
+    fixed = [unrank_layout(rank) for rank in FIXED_LAYOUT_RANKS]
+    for rank, layout in zip(FIXED_LAYOUT_RANKS, fixed):
+        obstacles, r2_positions = layout.get_obstacles(), layout.get_r2_positions()
+        results[f'planner.solve.rank_{rank}'] = measure(lambda: planner.plan(obstacles, r2_positions), repeats * 20)
+
+    sweep = [unrank_layout(rank) for rank in range(0, count_layouts(), sweep_stride)]
+    sweep_sets = [(layout.get_obstacles(), layout.get_r2_positions()) for layout in sweep]
+
+    def solve_all():
+        for obstacles, r2_positions in sweep_sets:
+            planner.plan(obstacles, r2_positions)
+
+    results['planner.sweep'] = dict(measure(solve_all, max(1, repeats // 2)), layouts=len(sweep_sets))
+
+    variant_sets = sweep_sets[::max(1, len(sweep_sets) // 500)]
+    for allow_400, required in product((True, False), (2, 3, 4)):
+        planner.set_r2_config(allow_400)
+        planner.required_r2_count = required
+
+        def solve_variant():
+            for obstacles, r2_positions in variant_sets:
+                planner.plan(obstacles, r2_positions)
+
+        name = f"planner.variant.{'400' if allow_400 else '200'}_r{required}"
+        results[name] = dict(measure(solve_variant, max(1, repeats // 2)), layouts=len(variant_sets))
+
+
+def bench_renderer(results, repeats):
+    """单帧渲染与长路径的完整视频生成"""
+    from core.layouts import count_layouts, unrank_layout
+    from core.path_planner import PathPlanner
+    from core.video_generator import VideoGenerator
+
+    # 取若干布局中最长的路径
+    planner = PathPlanner()
+    longest, longest_layout = None, None
+    for rank in range(0, count_layouts(), 97):
+        layout = unrank_layout(rank)
+        path = planner.plan(layout.get_obstacles(), layout.get_r2_positions())
+        if path and (longest is None or len(path) > len(longest)):
+            longest, longest_layout = path, layout
+
+    generator = VideoGenerator()
+    cells_data = generator.create_cells_data_from_blocks(longest_layout.get_blocks())
+    pos, collected = longest[len(longest) // 2]
+    frame_data = generator._prepare_cells_data(cells_data, longest[:len(longest) // 2 + 1])
+    results['render.frame'] = measure(lambda: generator.create_frame(frame_data, pos, collected, "bench"),
+                                      repeats * 5)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'bench.mp4')
+
+        def generate():
+            generator.generate_video(longest, generator.create_cells_data_from_blocks(longest_layout.get_blocks()),
+                                     output, fps=2, duration_per_step=1.0)
+
+        results['render.video'] = dict(measure(generate, max(1, repeats // 2)), steps=len(longest))
+
+
+def bench_startup(results, repeats):
+    """冷启动：新进程中导入main.py，以及创建主窗口"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    scripts = {
+        'startup.import_main': "import main",
+        'startup.main_window': ("import sys\n"
+                                "from PyQt5.QtWidgets import QApplication\n"
+                                "app = QApplication(sys.argv)\n"
+                                "from ui.main_window import PlumForestQT\n"
+                                "PlumForestQT()"),
+    }
+    for name, script in scripts.items():
+        def run():
+            subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        results[name] = measure(run, repeats)
+
+
+def compare(results, baseline, threshold_scale=1.0):
+    """与基线比较，返回退化项列表 [(名称, 基线, 当前, 增幅)]"""
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None or reference['value'] <= 0:
+            continue
+        change = current['value'] / reference['value'] - 1
+        if change > THRESHOLDS.get(name, DEFAULT_THRESHOLD) * threshold_scale:
+            regressions.append((name, reference['value'], current['value'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="梅花林规划器性能基准")
+    parser.add_argument('--only', choices=['planner', 'renderer', 'startup'], action='append',
+                        help="只运行指定组（可重复）")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help="全布局扫描改为每20个取1个")
+    parser.add_argument('--output', help="结果JSON输出路径（默认输出到标准输出）")
+    parser.add_argument('--baseline', help="与之比较的基线JSON")
+    parser.add_argument('--save-baseline', help="将本次结果保存为基线")
+    parser.add_argument('--threshold-scale', type=float, default=1.0, help="退化阈值整体缩放")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, PROJECT_ROOT)
+    groups = args.only or ['planner', 'renderer', 'startup']
+    results = {}
+    if 'planner' in groups:
+        bench_planner(results, args.repeats, 20 if args.quick else 1)
+    if 'renderer' in groups:
+        bench_renderer(results, args.repeats)
+    if 'startup' in groups:
+        bench_startup(results, args.repeats)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold_scale)
+        for name, old, new, change in regressions:
+            print(f"退化: {name} {old * 1000:.3f} ms -> {new * 1000:.3f} ms (+{change:.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print("未发现性能退化", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
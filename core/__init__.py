@@ -1,7 +1,12 @@
 """核心模块"""
 
 from .path_planner import PathPlanner
+from .instrumentation import PlannerStats, ProfileSession
+from .pareto_planner import ParetoPlanner
+from .layouts import Layout, random_layout
+from .adversarial import AdversarialSearch
+from .plan_table import PlanTable
 from .grid_cell import GridCell
 from .video_generator import VideoGenerator
 
-__all__ = ['PathPlanner', 'GridCell', 'VideoGenerator']
\ No newline at end of file
+__all__ = ['PathPlanner', 'PlannerStats', 'ProfileSession', 'ParetoPlanner', 'Layout', 'random_layout', 'AdversarialSearch', 'PlanTable', 'GridCell', 'VideoGenerator']
\ No newline at end of file
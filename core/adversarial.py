@@ -0,0 +1,117 @@
+"""最坏情况布局搜索模块 - 给定R2位置，求使最优代价最大的R1/F放置"""
+
+import math
+from core.layouts import Layout, layout_key
+from utils.constants import (
+    ORIGINAL_GRID_SIZE, OUTER_POSITIONS, FORBIDDEN_F_POSITIONS,
+    MAX_R1_COUNT, MAX_F_COUNT, get_extended_position
+)
+
+
+class AdversarialSearch:
+    """
+    最坏情况布局搜索（分支定界）
+
+    R1/F只会封堵格子，因此最优代价随障碍增加单调不减：
+    - 下界：当前部分布局的最优代价是其所有补全的下界；
+      若补全时不占用当前最优路径上的任何格子，代价恰好等于该下界；
+    - 因此只有占用当前最优路径上格子的分支才可能更差，其余分支直接以下界结算；
+    - 上界：把所有剩余可放格子都封堵时的代价，不超过当前最优值的子树被剪掉；
+    - 部分布局的求解结果与子树结果按障碍集合记忆化（R1/F对规划器等价）。
+    不可行（无路径）视为代价无穷大。
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+        self.solve_cache = {}
+        self.solves = 0
+
+    def solve(self, obstacles):
+        """求解障碍集合（R1/F）加上R2时的最优代价与路径，结果按规范布局键缓存"""
+        obstacles = set(obstacles) | self.r2_positions
+        key = layout_key(obstacles, self.r2_positions)
+        if key not in self.solve_cache:
+            self.solves += 1
+            path = self.path_planner.plan(obstacles, self.r2_positions)
+            cost = math.inf if path is None else self.path_planner.calculate_path_cost_with_collection(path)
+            self.solve_cache[key] = (cost, path)
+        return self.solve_cache[key]
+
+    def complete(self, r1, f, r1_left, f_left, excluded=()):
+        """
+        在不占用excluded格子的前提下补全剩余R1/F，无法补全时返回None
+        两类方块的可放格子部分重叠，先用各自独占的格子即可保证贪心最优
+        """
+        used = set(r1) | set(f) | set(excluded)
+        r1_free = [p for p in self.r1_cells if p not in used]
+        f_free = [p for p in self.f_cells if p not in used]
+        f_choice = sorted(f_free, key=lambda p: p in self.r1_cells)[:f_left]
+        r1_choice = sorted((p for p in r1_free if p not in f_choice), key=lambda p: p in self.f_cells)[:r1_left]
+        if len(f_choice) < f_left or len(r1_choice) < r1_left:
+            return None
+        return tuple(r1) + tuple(r1_choice), tuple(f) + tuple(f_choice)
+
+    def worst_case(self, r2_positions, r1_count=MAX_R1_COUNT, f_count=MAX_F_COUNT):
+        """
+        搜索最坏布局
+        返回 {'cost', 'layout', 'path', 'solves'}；cost为math.inf表示存在使任务无法完成的放置，
+        无法放下指定数量的方块时返回None
+        """
+        self.r2_positions = set(r2_positions)
+        self.r1_cells = [get_extended_position(p) for p in OUTER_POSITIONS
+                         if get_extended_position(p) not in self.r2_positions]
+        self.f_cells = [get_extended_position(p) for p in range(ORIGINAL_GRID_SIZE)
+                        if p not in FORBIDDEN_F_POSITIONS and get_extended_position(p) not in self.r2_positions]
+        self.solve_cache = {}
+        self.memo = {}
+        self.solves = 0
+        self.incumbent = -math.inf
+
+        if self.complete((), (), r1_count, f_count) is None:
+            return None
+        cost, r1, f = self.search((), (), r1_count, f_count)
+        _, path = self.solve(set(r1) | set(f))
+        return {'cost': cost, 'layout': Layout(r1, self.r2_positions, f), 'path': path, 'solves': self.solves}
+
+    def search(self, r1, f, r1_left, f_left):
+        """返回部分布局(r1, f)所有补全中的 (最大代价, r1, f)；被上界剪枝时代价为-inf"""
+        key = (frozenset(r1), frozenset(f))
+        if key in self.memo:
+            return self.memo[key]
+
+        lower_bound, path = self.solve(set(r1) | set(f))
+        if math.isinf(lower_bound) or (r1_left == 0 and f_left == 0):
+            # 不可行时任何补全都不可行
+            best = (lower_bound,) + self.complete(r1, f, r1_left, f_left)
+            self.memo[key] = best
+            self.incumbent = max(self.incumbent, lower_bound)
+            return best
+
+        # 上界：剩余可放格子全部封堵
+        used = set(r1) | set(f)
+        all_free = (set(self.r1_cells) | set(self.f_cells)) - used
+        upper_bound, _ = self.solve(used | all_free)
+        if upper_bound <= self.incumbent:
+            return (-math.inf, (), ())
+
+        best = (-math.inf, (), ())
+        path_cells = {pos for pos, _ in path}
+        avoiding = self.complete(r1, f, r1_left, f_left, excluded=path_cells)
+        if avoiding is not None:
+            best = (lower_bound,) + avoiding
+            self.incumbent = max(self.incumbent, lower_bound)
+
+        # 只有占用当前最优路径格子的分支才可能提高代价
+        for pos in sorted(path_cells - used):
+            if self.incumbent == math.inf:
+                break
+            if r1_left and pos in self.r1_cells and self.complete(r1 + (pos,), f, r1_left - 1, f_left):
+                best = max(best, self.search(tuple(sorted(r1 + (pos,))), f, r1_left - 1, f_left),
+                           key=lambda item: item[0])
+            if f_left and pos in self.f_cells and self.complete(r1, f + (pos,), r1_left, f_left - 1):
+                best = max(best, self.search(r1, tuple(sorted(f + (pos,))), r1_left, f_left - 1),
+                           key=lambda item: item[0])
+
+        # 剪枝只会丢弃不超过当前最优值的结果，而当前最优值只增不减，记忆化结果对求最大值仍然有效
+        self.memo[key] = best
+        return best
@@ -0,0 +1,247 @@
+"""限时路径规划模块 - ARA*（权重逐轮递减的加权A*），随时给出可行方案及其次优界"""
+
+import heapq
+import math
+import time
+
+from utils.constants import TRUE_START_POSITION, FINAL_OUTER_TARGET
+
+# 启发式权重依次递减，最后一轮为1时搜索结束即证明最优
+EPSILON_SCHEDULE = (3.0, 2.0, 1.5, 1.25, 1.0)
+
+# 每扩展这么多个状态检查一次截止时间
+DEADLINE_CHECK_INTERVAL = 64
+
+# 界面“Anytime限时”使用的求解时限（秒）
+DEFAULT_TIME_LIMIT = 0.05
+
+
+class AnytimeSolution:
+    """某一阶段结束（或截止）时的最好方案"""
+
+    def __init__(self, epsilon, cost, path, lower_bound, expansions, elapsed, complete):
+        self.epsilon = epsilon          # 本阶段启发式权重
+        self.cost = cost                # 最好方案代价，无方案为None
+        self.path = path                # path_with_states，无方案为None
+        self.lower_bound = lower_bound  # 已证明的最优代价下界，证明无解时为inf
+        self.expansions = expansions    # 累计扩展状态数
+        self.elapsed = elapsed          # 累计耗时（秒）
+        self.complete = complete        # 本阶段是否在截止前完成
+
+    @property
+    def bound(self):
+        """次优界：cost / 最优代价 的上界，已证明最优时为1，无方案时为inf"""
+        if self.cost is None:
+            return math.inf
+        if self.cost <= self.lower_bound:
+            return 1.0
+        return self.cost / self.lower_bound if self.lower_bound > 0 else math.inf
+
+    @property
+    def optimal(self):
+        return self.cost is not None and self.cost <= self.lower_bound
+
+    @property
+    def infeasible(self):
+        """已证明无可行路径"""
+        return self.cost is None and self.lower_bound == math.inf
+
+    def summary(self):
+        """单行摘要，用于状态栏"""
+        if self.cost is None:
+            result = "已证明无解" if self.infeasible else "尚无方案"
+        else:
+            result = f"代价 {self.cost}, 次优界 {self.bound:.3f}" + ("（最优）" if self.optimal else "")
+        stage = "" if self.complete else "，截止中断"
+        return f"ε={self.epsilon:g}{stage} | {result} | 扩展 {self.expansions} | {self.elapsed * 1000:.2f} ms"
+
+
+class AnytimePlanner:
+    """限时规划器 - 与 dijkstra_with_collection 使用相同的状态、动作与终止条件
+
+    启发式为忽略障碍的剩余移动代价下界 + 剩余必需拾取代价，二者均可采纳且一致；
+    每轮以 g + ε·h 出队，ε 递减时复用上一轮的 g 值与 INCONS 表（ARA*），
+    每轮结束报告当前最好方案与次优界 min(ε, cost / min(g + h))。
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+
+    def build_transitions(self):
+        """预计算每个位置的合法移动：[(邻居, 代价)]"""
+        planner = self.path_planner
+        transitions = []
+        for pos in range(planner.grid_size):
+            transitions.append([(neighbor, planner.get_edge_cost(pos, neighbor))
+                                for neighbor in planner.get_valid_neighbors(pos)
+                                if planner.is_transition_allowed(pos, neighbor)])
+        return transitions
+
+    def build_heuristic(self, transitions):
+        """各位置到外圈22的最小移动代价（忽略障碍），无法到达为inf"""
+        reverse = [[] for _ in transitions]
+        for pos, moves in enumerate(transitions):
+            for neighbor, cost in moves:
+                reverse[neighbor].append((pos, cost))
+        distances = [math.inf] * len(transitions)
+        distances[FINAL_OUTER_TARGET] = 0
+        pq = [(0, FINAL_OUTER_TARGET)]
+        while pq:
+            dist, pos = heapq.heappop(pq)
+            if dist > distances[pos]:
+                continue
+            for previous, cost in reverse[pos]:
+                if dist + cost < distances[previous]:
+                    distances[previous] = dist + cost
+                    heapq.heappush(pq, (dist + cost, previous))
+        return distances
+
+    def search(self, obstacles, r2_positions, time_limit=None, schedule=EPSILON_SCHEDULE):
+        """
+        按 schedule 逐轮搜索，每轮结束 yield 一个 AnytimeSolution；
+        超过 time_limit（秒）时 yield 一个 complete=False 的结果后结束，
+        证明最优或无解时提前结束
+        """
+        planner = self.path_planner
+        start_time = time.perf_counter()
+        deadline = None if time_limit is None else start_time + time_limit
+        grid_size = planner.grid_size
+        required = planner.required_r2_count
+        allow_extra_when_two = (required == 2)
+        pickup_cost = planner.pickup_cost
+        integral = all(isinstance(cost, int) for cost in planner.get_cost_vector())
+        transitions = self.build_transitions()
+        move_h = self.build_heuristic(transitions)
+
+        # R2位置 -> 位编号，已收集集合用整数位掩码表示，状态 = 掩码 * grid_size + 位置
+        r2_list = sorted(r2_positions)
+        r2_bit = {pos: 1 << i for i, pos in enumerate(r2_list)}
+        pickups_at = [[r2_bit[nb] for nb in planner.get_valid_neighbors(pos) if nb in r2_bit]
+                      for pos in range(grid_size)]
+        blocked_static = set(obstacles) - set(r2_positions)
+        popcount = [bin(mask).count('1') for mask in range(1 << len(r2_list))]
+
+        def heuristic(state):
+            mask, pos = divmod(state, grid_size)
+            return move_h[pos] + max(0, required - popcount[mask]) * pickup_cost
+
+        def is_goal(state):
+            mask, pos = divmod(state, grid_size)
+            count = popcount[mask]
+            return pos == FINAL_OUTER_TARGET and (count >= required if allow_extra_when_two else count == required)
+
+        start = TRUE_START_POSITION
+        g = {start: 0}
+        parent = {start: None}
+        h_cache = {start: heuristic(start)}
+        open_states = {start}
+        closed = set()
+        incons = set()
+        best_cost = None
+        best_path = None
+        lower_bound = h_cache[start]
+        expansions = 0
+
+        def snapshot(epsilon, complete):
+            return AnytimeSolution(epsilon, best_cost, best_path, lower_bound, expansions,
+                                   time.perf_counter() - start_time, complete)
+
+        for epsilon in schedule:
+            # 新一轮：OPEN ∪ INCONS 按新权重重建堆，CLOSED 清空
+            open_states |= incons
+            incons = set()
+            closed = set()
+            pq = [(g[s] + epsilon * h_cache[s], -g[s], s) for s in open_states]
+            heapq.heapify(pq)
+            interrupted = False
+
+            while pq:
+                f, neg_g, state = pq[0]
+                if best_cost is not None and best_cost <= f:
+                    break
+                heapq.heappop(pq)
+                if state not in open_states or -neg_g != g[state]:
+                    continue
+                open_states.discard(state)
+                closed.add(state)
+                expansions += 1
+                if deadline is not None and expansions % DEADLINE_CHECK_INTERVAL == 0 \
+                        and time.perf_counter() > deadline:
+                    interrupted = True
+                    break
+
+                dist = g[state]
+                mask, pos = divmod(state, grid_size)
+                successors = []
+                # 收集相邻R2（要求为2时允许继续多取）
+                if popcount[mask] < required or allow_extra_when_two:
+                    for bit in pickups_at[pos]:
+                        if not mask & bit:
+                            successors.append((state + bit * grid_size, pickup_cost))
+                # 移动：未收集的R2仍是障碍
+                for neighbor, cost in transitions[pos]:
+                    if neighbor in blocked_static:
+                        continue
+                    bit = r2_bit.get(neighbor)
+                    if bit is not None and not mask & bit:
+                        continue
+                    successors.append((mask * grid_size + neighbor, cost))
+
+                for successor, cost in successors:
+                    new_dist = dist + cost
+                    if new_dist >= g.get(successor, math.inf):
+                        continue
+                    g[successor] = new_dist
+                    parent[successor] = state
+                    if is_goal(successor):
+                        # 终点状态不再扩展，直接作为候选方案
+                        # 父指针链上的前驱可能已被改进，按实际路径计算代价（不大于 new_dist）
+                        if best_cost is None or new_dist < best_cost:
+                            best_path = self.reconstruct_path(successor, parent, r2_list)
+                            best_cost = planner.calculate_path_cost_with_collection(best_path)
+                        continue
+                    if successor not in h_cache:
+                        h_cache[successor] = heuristic(successor)
+                    if h_cache[successor] == math.inf:
+                        continue
+                    if successor in closed:
+                        incons.add(successor)
+                    else:
+                        open_states.add(successor)
+                        heapq.heappush(pq, (new_dist + epsilon * h_cache[successor], -new_dist, successor))
+
+            if interrupted:
+                # 下界沿用上一轮已证明的值，方案代价可能已经更小
+                yield snapshot(epsilon, False)
+                return
+
+            # 本轮完成：最优代价 ≥ min(最好方案, OPEN ∪ INCONS 中的 g + h)
+            # 同时有 cost ≤ ε·最优代价；代价均为整数时下界可向上取整
+            frontier = min((g[s] + h_cache[s] for s in open_states | incons), default=math.inf)
+            if best_cost is None:
+                lower_bound = max(lower_bound, frontier)
+            else:
+                lower_bound = max(lower_bound, min(best_cost, frontier), best_cost / epsilon)
+            if integral and lower_bound != math.inf:
+                lower_bound = math.ceil(lower_bound - 1e-9)
+            solution = snapshot(epsilon, True)
+            yield solution
+            if solution.optimal or solution.infeasible:
+                return
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+
+    def solve(self, obstacles, r2_positions, time_limit=None, schedule=EPSILON_SCHEDULE):
+        """返回 (最终结果, 各阶段结果列表)"""
+        stages = list(self.search(obstacles, r2_positions, time_limit, schedule))
+        return stages[-1], stages
+
+    def reconstruct_path(self, state, parent, r2_list):
+        """由父指针重建 (position, collected_r2_frozenset) 路径"""
+        grid_size = self.path_planner.grid_size
+        path = []
+        while state is not None:
+            mask, pos = divmod(state, grid_size)
+            path.append((pos, frozenset(p for i, p in enumerate(r2_list) if mask >> i & 1)))
+            state = parent[state]
+        return path[::-1]
@@ -0,0 +1,106 @@
+"""紧凑路径模块 - 位置序列 + 拾取事件，代替逐步保存已收集集合的 path_with_states"""
+
+
+class CompactPath:
+    """
+    紧凑路径：positions 为每个状态的位置（拾取时位置重复），pickups 为拾取事件 (状态下标, R2位置) 的扁平字节序列，
+    表示从该状态起R2已被收集。两者都是bytes，已收集集合只保存增量，需要时再展开为旧格式
+    [(position, collected_r2_frozenset), ...]；支持 len / 下标 / 切片 / 迭代，可直接替代旧格式传给只读的下游函数
+    """
+
+    __slots__ = ('positions', 'pickups')
+
+    def __init__(self, positions, pickups=b''):
+        self.positions = bytes(positions)
+        self.pickups = bytes(pickups)
+
+    @classmethod
+    def from_states(cls, path_with_states):
+        """旧格式 -> 紧凑路径"""
+        positions = bytearray()
+        pickups = bytearray()
+        previous = frozenset()
+        for index, (pos, collected) in enumerate(path_with_states):
+            positions.append(pos)
+            if len(collected) != len(previous):
+                for r2 in collected - previous:
+                    pickups += bytes((index, r2))
+                previous = collected
+        return cls(positions, pickups)
+
+    def pickup_events(self):
+        """[(状态下标, R2位置), ...]"""
+        return list(zip(self.pickups[::2], self.pickups[1::2]))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def collected_at(self, index):
+        """第index个状态时已收集的R2集合"""
+        return frozenset(r2 for step, r2 in self.pickup_events() if step <= index)
+
+    @property
+    def final_collected(self):
+        return frozenset(self.pickups[1::2])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.positions[index], self.collected_at(index)
+
+    def __iter__(self):
+        """逐步展开，已收集集合只在拾取时重建"""
+        collected = frozenset()
+        events = iter(self.pickup_events())
+        event = next(events, None)
+        for index, pos in enumerate(self.positions):
+            while event is not None and event[0] == index:
+                collected = collected | {event[1]}
+                event = next(events, None)
+            yield pos, collected
+
+    def expand(self):
+        """展开为旧格式列表"""
+        return list(self)
+
+    def iter_steps(self):
+        """逐步生成 (当前位置, 下一位置, 本步收集的R2位置或None)"""
+        picked = dict(self.pickup_events())
+        positions = self.positions
+        for index in range(1, len(positions)):
+            yield positions[index - 1], positions[index], picked.get(index)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactPath):
+            return self.positions == other.positions and self.pickups == other.pickups
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.positions, self.pickups))
+
+    def __repr__(self):
+        return f"CompactPath({list(self.positions)}, pickups={self.pickup_events()})"
+
+    def to_bytes(self):
+        """序列化：状态数(B) + 位置(各B) + 拾取数(B) + (状态下标, R2位置)(各B)"""
+        return (bytes((len(self.positions),)) + self.positions
+                + bytes((len(self.pickups) // 2,)) + self.pickups)
+
+    @classmethod
+    def from_bytes(cls, data):
+        n = data[0]
+        m = data[1 + n]
+        return cls(data[1:1 + n], data[2 + n:2 + n + 2 * m])
+
+    def __reduce__(self):
+        # 进程间传递批量结果时按紧凑字节序列化
+        return CompactPath.from_bytes, (self.to_bytes(),)
+
+
+def as_compact(path_with_states):
+    """接受旧格式或紧凑路径，返回紧凑路径（None保持为None）"""
+    if path_with_states is None or isinstance(path_with_states, CompactPath):
+        return path_with_states
+    return CompactPath.from_states(path_with_states)
@@ -0,0 +1,74 @@
+"""规划引擎注册模块 - 统一接口 engine(planner, obstacles, r2_positions) -> path_with_states 或 None"""
+
+from core.anytime_planner import AnytimePlanner
+from core.exact_planners import BitmaskDPPlanner, BidirectionalPlanner
+from core.pareto_planner import ParetoPlanner
+from core.sensitivity import SensitivityAnalyzer
+
+
+class EngineNotApplicable(Exception):
+    """引擎无法处理当前布局或配置（如查找表未命中），调用方应改用其他引擎"""
+
+
+def dijkstra_engine(planner, obstacles, r2_positions):
+    """带收集任务的Dijkstra（基准实现）"""
+    return planner.plan(obstacles, r2_positions)
+
+
+def pareto_engine(planner, obstacles, r2_positions):
+    """Pareto前沿中时间最短的方案"""
+    frontier = ParetoPlanner(planner).pareto_with_collection(obstacles, r2_positions)
+    return frontier[0][1] if frontier else None
+
+
+def anytime_engine(planner, obstacles, r2_positions):
+    """ARA*不设时限跑完全部权重，结果与Dijkstra同为最优"""
+    final, _ = AnytimePlanner(planner).solve(obstacles, r2_positions)
+    return final.path
+
+
+def astar_engine(planner, obstacles, r2_positions):
+    """A*：ARA*只跑权重为1的一轮"""
+    final, _ = AnytimePlanner(planner).solve(obstacles, r2_positions, schedule=(1.0,))
+    return final.path
+
+
+def bitmask_dp_engine(planner, obstacles, r2_positions):
+    """按已收集掩码分层的DP"""
+    return BitmaskDPPlanner(planner).plan(obstacles, r2_positions)
+
+
+def bidirectional_engine(planner, obstacles, r2_positions):
+    """双向Dijkstra"""
+    return BidirectionalPlanner(planner).plan(obstacles, r2_positions)
+
+
+def candidates_engine(planner, obstacles, r2_positions):
+    """灵敏度分析候选集合在当前代价下的最优方案"""
+    analyzer = SensitivityAnalyzer(planner)
+    if analyzer.prepare(obstacles, r2_positions) == 0:
+        return None
+    _, plans = analyzer.evaluate([planner.get_cost_vector()])
+    return analyzer.candidates[int(plans[0])][1]
+
+
+def make_table_engine(plan_table):
+    """查找表引擎：仅对完整合法布局和表中已有的配置适用"""
+    def table_engine(planner, obstacles, r2_positions):
+        # 查找表按规范布局键查询，R1/F的区分不改变路径
+        hit, path = plan_table.lookup_obstacles(obstacles, r2_positions, planner.get_profile())
+        if hit:
+            return path
+        raise EngineNotApplicable("查找表未命中")
+    return table_engine
+
+
+PLANNER_ENGINES = {
+    'dijkstra': dijkstra_engine,
+    'pareto': pareto_engine,
+    'anytime': anytime_engine,
+    'astar': astar_engine,
+    'bitmask_dp': bitmask_dp_engine,
+    'bidirectional': bidirectional_engine,
+    'candidates': candidates_engine,
+}
@@ -0,0 +1,204 @@
+"""精确规划算法变体模块 - 位掩码分层DP与双向Dijkstra，与 dijkstra_with_collection 的最优代价一致"""
+
+import heapq
+import math
+
+from utils.constants import TRUE_START_POSITION, FINAL_OUTER_TARGET
+
+
+class CollectionModel:
+    """
+    一次求解的静态模型：合法移动、可拾取的R2与收集要求
+    状态 = 掩码 * grid_size + 位置，掩码第i位表示已收集 r2_list[i]
+    """
+
+    def __init__(self, path_planner, obstacles, r2_positions):
+        planner = path_planner
+        self.grid_size = planner.grid_size
+        self.required = planner.required_r2_count
+        self.allow_extra = (self.required == 2)
+        self.pickup_cost = planner.pickup_cost
+        self.r2_list = sorted(r2_positions)
+        self.r2_bit = {pos: 1 << i for i, pos in enumerate(self.r2_list)}
+        self.blocked_static = set(obstacles) - set(r2_positions)
+        self.popcount = [bin(mask).count('1') for mask in range(1 << len(self.r2_list))]
+        self.transitions = []
+        self.pickups_at = []
+        for pos in range(self.grid_size):
+            self.transitions.append([(neighbor, planner.get_edge_cost(pos, neighbor))
+                                     for neighbor in planner.get_valid_neighbors(pos)
+                                     if planner.is_transition_allowed(pos, neighbor)])
+            self.pickups_at.append([self.r2_bit[nb] for nb in planner.get_valid_neighbors(pos) if nb in self.r2_bit])
+
+    def is_free(self, pos, mask):
+        """掩码mask下位置pos可站立（非障碍，或是已收集的R2）"""
+        if pos in self.blocked_static:
+            return False
+        bit = self.r2_bit.get(pos)
+        return bit is None or bool(mask & bit)
+
+    def can_pickup(self, mask):
+        return self.popcount[mask] < self.required or self.allow_extra
+
+    def meets_requirement(self, mask):
+        count = self.popcount[mask]
+        return count >= self.required if self.allow_extra else count == self.required
+
+    def to_path(self, states):
+        """状态序列 -> (position, collected_r2_frozenset) 路径"""
+        path = []
+        for state in states:
+            mask, pos = divmod(state, self.grid_size)
+            path.append((pos, frozenset(p for i, p in enumerate(self.r2_list) if mask >> i & 1)))
+        return path
+
+
+class BitmaskDPPlanner:
+    """
+    位掩码分层DP：拾取只会增加掩码，按掩码从小到大逐层求解；
+    每层先由子掩码层的拾取转移得到初值，再在该层障碍下做一次位置图上的Dijkstra
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+
+    def plan(self, obstacles, r2_positions):
+        model = CollectionModel(self.path_planner, obstacles, r2_positions)
+        grid_size = model.grid_size
+        layers = {}
+        parents = {}
+        best = None
+
+        for mask in range(1 << len(model.r2_list)):
+            if model.popcount[mask] > model.required and not model.allow_extra:
+                continue
+            dist = [math.inf] * grid_size
+            if mask == 0:
+                dist[TRUE_START_POSITION] = 0
+                parents[TRUE_START_POSITION] = None
+            # 子掩码层 + 一次拾取
+            for i in range(len(model.r2_list)):
+                bit = 1 << i
+                sub = mask ^ bit
+                if not mask & bit or sub not in layers or not model.can_pickup(sub):
+                    continue
+                sub_dist = layers[sub]
+                for pos in range(grid_size):
+                    if sub_dist[pos] + model.pickup_cost < dist[pos] and bit in model.pickups_at[pos]:
+                        dist[pos] = sub_dist[pos] + model.pickup_cost
+                        parents[mask * grid_size + pos] = sub * grid_size + pos
+
+            # 层内移动
+            pq = [(d, pos) for pos, d in enumerate(dist) if d < math.inf]
+            if not pq:
+                continue
+            heapq.heapify(pq)
+            while pq:
+                d, pos = heapq.heappop(pq)
+                if d > dist[pos]:
+                    continue
+                for neighbor, cost in model.transitions[pos]:
+                    if d + cost < dist[neighbor] and model.is_free(neighbor, mask):
+                        dist[neighbor] = d + cost
+                        parents[mask * grid_size + neighbor] = mask * grid_size + pos
+                        heapq.heappush(pq, (d + cost, neighbor))
+            layers[mask] = dist
+
+            if model.meets_requirement(mask) and dist[FINAL_OUTER_TARGET] < math.inf:
+                if best is None or dist[FINAL_OUTER_TARGET] < best[0]:
+                    best = (dist[FINAL_OUTER_TARGET], mask * grid_size + FINAL_OUTER_TARGET)
+
+        if best is None:
+            return None
+        states = []
+        state = best[1]
+        while state is not None:
+            states.append(state)
+            state = parents[state]
+        return model.to_path(states[::-1])
+
+
+class BidirectionalPlanner:
+    """
+    双向Dijkstra：正向从 (外圈14, 空集) 出发，反向同时从所有满足收集要求的 (外圈22, 掩码) 出发，
+    两侧队首距离之和不小于已知最短相遇代价时结束
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+
+    def plan(self, obstacles, r2_positions):
+        model = CollectionModel(self.path_planner, obstacles, r2_positions)
+        grid_size = model.grid_size
+        reverse = [[] for _ in range(grid_size)]
+        for pos, moves in enumerate(model.transitions):
+            for neighbor, cost in moves:
+                reverse[neighbor].append((pos, cost))
+
+        def forward_edges(state):
+            mask, pos = divmod(state, grid_size)
+            if model.can_pickup(mask):
+                for bit in model.pickups_at[pos]:
+                    if not mask & bit:
+                        yield state + bit * grid_size, model.pickup_cost
+            for neighbor, cost in model.transitions[pos]:
+                if model.is_free(neighbor, mask):
+                    yield mask * grid_size + neighbor, cost
+
+        def backward_edges(state):
+            mask, pos = divmod(state, grid_size)
+            for bit in model.pickups_at[pos]:
+                if mask & bit and model.can_pickup(mask ^ bit) and model.is_free(pos, mask ^ bit):
+                    yield state - bit * grid_size, model.pickup_cost
+            for previous, cost in reverse[pos]:
+                if model.is_free(previous, mask):
+                    yield mask * grid_size + previous, cost
+
+        start = TRUE_START_POSITION
+        dist = ({start: 0}, {})
+        links = ({start: None}, {})
+        queues = ([(0, start)], [])
+        for mask in range(1 << len(model.r2_list)):
+            if model.meets_requirement(mask):
+                goal = mask * grid_size + FINAL_OUTER_TARGET
+                dist[1][goal] = 0
+                links[1][goal] = None
+                queues[1].append((0, goal))
+        heapq.heapify(queues[1])
+        edges = (forward_edges, backward_edges)
+        best, meet = math.inf, None
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            # 每次扩展队首较小的一侧
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            d, state = heapq.heappop(queues[side])
+            if d > dist[side][state]:
+                continue
+            for successor, cost in edges[side](state):
+                new_dist = d + cost
+                if new_dist < dist[side].get(successor, math.inf):
+                    dist[side][successor] = new_dist
+                    links[side][successor] = state
+                    heapq.heappush(queues[side], (new_dist, successor))
+                    other = dist[1 - side].get(successor)
+                    if other is not None and new_dist + other < best:
+                        best, meet = new_dist + other, successor
+            other = dist[1 - side].get(state)
+            if other is not None and d + other < best:
+                best, meet = d + other, state
+
+        if meet is None:
+            return None
+        states = []
+        state = meet
+        while state is not None:
+            states.append(state)
+            state = links[0][state]
+        states.reverse()
+        state = links[1][meet]
+        while state is not None:
+            states.append(state)
+            state = links[1][state]
+        return model.to_path(states)
@@ -0,0 +1,193 @@
+"""朝向感知路径规划模块 - 状态加入车头朝向，计入转向与上下台阶前的对齐代价"""
+
+import heapq
+import math
+
+from core.anytime_planner import AnytimePlanner
+from utils.constants import TRUE_START_POSITION, FINAL_OUTER_TARGET, DEFAULT_TURN_COST, DEFAULT_ALIGN_COST
+
+# 朝向编号：北、东、南、西（顺时针），状态中占低2位
+HEADING_NAMES = ("北", "东", "南", "西")
+HEADING_COUNT = 4
+
+
+class MotionModel:
+    """
+    转向与对齐代价：
+        每转90°计 turn_cost（掉头为2倍）
+        转向后立即跨越高度变化（±200/±400）时另计 align_cost，直行上下台阶无需重新对齐
+    拾取时需转向面对R2，只计转向代价
+    """
+
+    def __init__(self, turn_cost=DEFAULT_TURN_COST, align_cost=DEFAULT_ALIGN_COST):
+        self.turn_cost = turn_cost
+        self.align_cost = align_cost
+
+    def key(self):
+        return self.turn_cost, self.align_cost
+
+    def turn(self, heading, new_heading):
+        steps = (new_heading - heading) % HEADING_COUNT
+        return self.turn_cost * min(steps, HEADING_COUNT - steps)
+
+
+class HeadingPlan:
+    """朝向感知的路径：path 与 path_with_states 格式相同，headings[i] 为第i个状态的朝向"""
+
+    def __init__(self, path, headings, cost):
+        self.path = path
+        self.headings = headings
+        self.cost = cost
+
+    def turns(self):
+        """转向次数（每次90°计一次）"""
+        return sum(min((b - a) % HEADING_COUNT, (a - b) % HEADING_COUNT)
+                   for a, b in zip(self.headings, self.headings[1:]))
+
+
+class HeadingPlanner:
+    """
+    状态 = ((掩码 * grid_size + 位置) << 2) | 朝向，起点朝向不限
+    转移表按 (位置, 朝向) 预先展开并缓存，代价配置或运动模型不变时跨求解复用；
+    启发式沿用不计转向的剩余移动代价下界 + 剩余拾取代价（转向与对齐代价非负，仍可采纳）
+    """
+
+    def __init__(self, path_planner, motion_model=None):
+        self.path_planner = path_planner
+        self.motion_model = motion_model if motion_model is not None else MotionModel()
+        self.tables_key = None
+        self.move_table = None
+        self.face_table = None
+        self.move_heuristic = None
+
+    def heading_of(self, pos1, pos2):
+        """从pos1移动到相邻pos2时的朝向"""
+        width = self.path_planner.grid_width
+        return {-width: 0, 1: 1, width: 2, -1: 3}[pos2 - pos1]
+
+    def build_tables(self):
+        """
+        展开转移表（下标 = 位置 * 4 + 朝向）：
+            move_table  [(邻居, 新朝向, 代价)]，代价 = 移动代价 + 转向 + 对齐
+            face_table  [(相邻格子, 新朝向, 转向代价)]，用于拾取
+        """
+        planner = self.path_planner
+        model = self.motion_model
+        key = (tuple(sorted(planner.get_profile().items())), model.key())
+        if key == self.tables_key:
+            return
+        transitions = AnytimePlanner(planner).build_transitions()
+        move_table = []
+        face_table = []
+        for pos in range(planner.grid_size):
+            height = planner.position_heights.get(pos, 0)
+            for heading in range(HEADING_COUNT):
+                moves = []
+                for neighbor, cost in transitions[pos]:
+                    new_heading = self.heading_of(pos, neighbor)
+                    cost += model.turn(heading, new_heading)
+                    if new_heading != heading and planner.position_heights.get(neighbor, 0) != height:
+                        cost += model.align_cost
+                    moves.append((neighbor, new_heading, cost))
+                move_table.append(moves)
+                face_table.append([(neighbor, self.heading_of(pos, neighbor),
+                                    model.turn(heading, self.heading_of(pos, neighbor)))
+                                   for neighbor in planner.get_valid_neighbors(pos)])
+        self.move_table = move_table
+        self.face_table = face_table
+        self.move_heuristic = AnytimePlanner(planner).build_heuristic(transitions)
+        self.tables_key = key
+
+    def plan(self, obstacles, r2_positions):
+        """返回 HeadingPlan，无可行路径时返回None"""
+        self.build_tables()
+        planner = self.path_planner
+        grid_size = planner.grid_size
+        required = planner.required_r2_count
+        allow_extra_when_two = (required == 2)
+        pickup_cost = planner.pickup_cost
+        move_table, face_table, move_h = self.move_table, self.face_table, self.move_heuristic
+
+        r2_list = sorted(r2_positions)
+        r2_bit = {pos: 1 << i for i, pos in enumerate(r2_list)}
+        blocked_static = set(obstacles) - set(r2_positions)
+        popcount = [bin(mask).count('1') for mask in range(1 << len(r2_list))]
+
+        def heuristic(mask, pos):
+            return move_h[pos] + max(0, required - popcount[mask]) * pickup_cost
+
+        dist = {}
+        parent = {}
+        pq = []
+        for heading in range(HEADING_COUNT):
+            state = TRUE_START_POSITION << 2 | heading
+            dist[state] = 0
+            parent[state] = None
+            pq.append((heuristic(0, TRUE_START_POSITION), 0, state))
+        heapq.heapify(pq)
+
+        while pq:
+            _, d, state = heapq.heappop(pq)
+            if d > dist[state]:
+                continue
+            heading = state & 3
+            mask, pos = divmod(state >> 2, grid_size)
+            count = popcount[mask]
+            if pos == FINAL_OUTER_TARGET and (count >= required if allow_extra_when_two else count == required):
+                return self.reconstruct(state, parent, d, r2_list)
+
+            index = pos * HEADING_COUNT + heading
+            successors = []
+            # 转向面对相邻R2后拾取
+            if count < required or allow_extra_when_two:
+                for neighbor, new_heading, turn_cost in face_table[index]:
+                    bit = r2_bit.get(neighbor)
+                    if bit is not None and not mask & bit:
+                        successors.append(((mask | bit), pos, new_heading, pickup_cost + turn_cost))
+            # 移动：未收集的R2仍是障碍
+            for neighbor, new_heading, cost in move_table[index]:
+                if neighbor in blocked_static:
+                    continue
+                bit = r2_bit.get(neighbor)
+                if bit is not None and not mask & bit:
+                    continue
+                successors.append((mask, neighbor, new_heading, cost))
+
+            for new_mask, new_pos, new_heading, cost in successors:
+                successor = (new_mask * grid_size + new_pos) << 2 | new_heading
+                new_dist = d + cost
+                if new_dist < dist.get(successor, math.inf):
+                    dist[successor] = new_dist
+                    parent[successor] = state
+                    h = heuristic(new_mask, new_pos)
+                    if h < math.inf:
+                        heapq.heappush(pq, (new_dist + h, new_dist, successor))
+        return None
+
+    def reconstruct(self, state, parent, cost, r2_list):
+        grid_size = self.path_planner.grid_size
+        path = []
+        headings = []
+        while state is not None:
+            mask, pos = divmod(state >> 2, grid_size)
+            path.append((pos, frozenset(p for i, p in enumerate(r2_list) if mask >> i & 1)))
+            headings.append(state & 3)
+            state = parent[state]
+        return HeadingPlan(path[::-1], headings[::-1], cost)
+
+    def path_cost(self, path_with_states, headings):
+        """按运动模型计算给定路径与朝向序列的总代价"""
+        planner = self.path_planner
+        model = self.motion_model
+        total = 0
+        for (pos, collected), (next_pos, _), heading, next_heading in zip(
+                path_with_states, path_with_states[1:], headings, headings[1:]):
+            total += model.turn(heading, next_heading)
+            if pos == next_pos:
+                total += planner.pickup_cost
+                continue
+            total += planner.get_edge_cost(pos, next_pos)
+            if next_heading != heading and \
+                    planner.position_heights.get(next_pos, 0) != planner.position_heights.get(pos, 0):
+                total += model.align_cost
+        return total
@@ -0,0 +1,127 @@
+"""
+格子通行热力图模块 - 把任意一组规划结果聚合为格子访问次数、相邻格转移次数与R2拾取次数
+
+用法（在项目根目录）：
+    python -m core.heatmap --store results --where "allow_400==0" --output heatmap.png
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from core.compact_path import as_compact
+from core.results_store import ResultsStore, parse_condition
+from utils.constants import EXTENDED_GRID_SIZE, MAX_R2_COUNT
+
+# 按行块聚合，限制一次展开的数组大小
+CHUNK_ROWS = 1 << 18
+
+
+class TraversalHeatmap:
+    """
+    通行统计（下标均为扩展网格位置）：
+        visits       每个格子被经过的次数（拾取时原地停留不重复计数）
+        transitions  [起点, 终点] 移动次数
+        pickups      每个格子上R2被拾取的次数
+    统计量可直接相加，分块或分进程聚合后用 merge 合并
+    """
+
+    def __init__(self):
+        self.plans = 0
+        self.visits = np.zeros(EXTENDED_GRID_SIZE, dtype=np.int64)
+        self.transitions = np.zeros((EXTENDED_GRID_SIZE, EXTENDED_GRID_SIZE), dtype=np.int64)
+        self.pickups = np.zeros(EXTENDED_GRID_SIZE, dtype=np.int64)
+
+    def add_arrays(self, lengths, positions, pickup_counts, pickups):
+        """
+        向量化累加一批路径，数组布局与 SharedResults 一致：
+        lengths[n] 状态数（0表示无解，不计入），positions[n, S]，pickup_counts[n]，pickups[n, 2×R2]
+        """
+        lengths = np.asarray(lengths, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int64)
+        pickup_counts = np.asarray(pickup_counts, dtype=np.int64)
+        pickups = np.asarray(pickups, dtype=np.int64)
+        self.plans += int(np.count_nonzero(lengths))
+
+        states = np.arange(positions.shape[1]) < lengths[:, None]
+        moved = np.ones_like(states)
+        moved[:, 1:] = positions[:, 1:] != positions[:, :-1]
+        self.visits += np.bincount(positions[states & moved], minlength=EXTENDED_GRID_SIZE)
+
+        steps = states[:, 1:] & moved[:, 1:]
+        codes = positions[:, :-1][steps] * EXTENDED_GRID_SIZE + positions[:, 1:][steps]
+        self.transitions += np.bincount(codes, minlength=EXTENDED_GRID_SIZE ** 2).reshape(
+            EXTENDED_GRID_SIZE, EXTENDED_GRID_SIZE)
+
+        picked = np.arange(pickups.shape[1] // 2) < pickup_counts[:, None]
+        self.pickups += np.bincount(pickups[:, 1::2][picked], minlength=EXTENDED_GRID_SIZE)
+
+    def add_paths(self, paths):
+        """累加任意路径（旧格式、CompactPath或None）"""
+        paths = [as_compact(path) for path in paths]
+        max_states = max((len(path.positions) for path in paths if path is not None), default=1)
+        n = len(paths)
+        lengths = np.zeros(n, dtype=np.int64)
+        positions = np.zeros((n, max_states), dtype=np.uint8)
+        pickup_counts = np.zeros(n, dtype=np.int64)
+        pickups = np.zeros((n, 2 * MAX_R2_COUNT), dtype=np.uint8)
+        for i, path in enumerate(paths):
+            if path is None:
+                continue
+            lengths[i] = len(path.positions)
+            positions[i, :lengths[i]] = np.frombuffer(path.positions, dtype=np.uint8)
+            pickup_counts[i] = len(path.pickups) // 2
+            pickups[i, :len(path.pickups)] = np.frombuffer(path.pickups, dtype=np.uint8)
+        self.add_arrays(lengths, positions, pickup_counts, pickups)
+
+    def add_store(self, store, indices=None):
+        """累加列存储中的行（默认全部行）"""
+        indices = np.arange(store.rows) if indices is None else np.asarray(indices)
+        for start in range(0, len(indices), CHUNK_ROWS):
+            rows = indices[start:start + CHUNK_ROWS]
+            lengths = np.where(store.column('cost')[rows] >= 0, store.column('steps')[rows].astype(np.int64) + 1, 0)
+            self.add_arrays(lengths, store.column('positions')[rows],
+                            store.column('pickup_count')[rows], store.column('pickup_events')[rows])
+
+    def merge(self, other):
+        self.plans += other.plans
+        self.visits += other.visits
+        self.transitions += other.transitions
+        self.pickups += other.pickups
+
+    def edge_counts(self):
+        """无向相邻格对的转移次数 {(a, b): 次数}，a < b"""
+        undirected = self.transitions + self.transitions.T
+        a, b = np.nonzero(np.triu(undirected))
+        return {(int(i), int(j)): int(undirected[i, j]) for i, j in zip(a, b)}
+
+    def visit_rates(self):
+        """平均每条路径经过各格子的次数（重访时可超过1），无路径时全为0"""
+        return self.visits / self.plans if self.plans else np.zeros(EXTENDED_GRID_SIZE)
+
+
+def main(argv=None):
+    """命令行入口：由列存储生成热力图PNG"""
+    # 绘图依赖较重，只在命令行中导入
+    from core.video_generator import VideoGenerator
+
+    parser = argparse.ArgumentParser(description="格子通行热力图")
+    parser.add_argument('--store', required=True, help="扫描结果列存储目录")
+    parser.add_argument('--where', action='append', default=[], help="筛选条件，如 allow_400==0、cost>20")
+    parser.add_argument('--output', default='heatmap.png')
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.store)
+    query = store.query()
+    for text in args.where:
+        query = query.where(*parse_condition(text))
+    heatmap = TraversalHeatmap()
+    heatmap.add_store(store, query.indices())
+    title = f"plans: {heatmap.plans}" + (f"  ({', '.join(args.where)})" if args.where else "")
+    VideoGenerator().save_heatmap(heatmap, args.output, title)
+    print(f"已写入 {args.output}（{heatmap.plans} 条路径）", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""规划器性能统计模块 - 计数器、耗时与cProfile/tracemalloc会话"""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+
+class PlannerStats:
+    """单次求解的计数与耗时（秒）"""
+
+    def __init__(self):
+        self.pops = 0             # 出队次数
+        self.stale_pops = 0       # 过期（已有更短距离）而跳过的出队
+        self.pushes = 0           # 入队次数
+        self.pickups = 0          # 生成的拾取转移数
+        self.peak_heap = 0        # 优先队列最大长度
+        self.search_time = 0.0
+        self.reconstruct_time = 0.0
+        self.found = False
+
+    @property
+    def total_time(self):
+        return self.search_time + self.reconstruct_time
+
+    @property
+    def expansions(self):
+        """实际扩展的状态数"""
+        return self.pops - self.stale_pops
+
+    def as_dict(self):
+        return {
+            'pops': self.pops,
+            'stale_pops': self.stale_pops,
+            'expansions': self.expansions,
+            'pushes': self.pushes,
+            'pickups': self.pickups,
+            'peak_heap': self.peak_heap,
+            'search_time': self.search_time,
+            'reconstruct_time': self.reconstruct_time,
+            'total_time': self.total_time,
+            'found': self.found,
+        }
+
+    def summary(self):
+        """单行摘要，用于状态栏"""
+        return (f"求解 {self.total_time * 1000:.2f} ms | 扩展 {self.expansions} "
+                f"(出队 {self.pops}, 过期 {self.stale_pops}) | 入队 {self.pushes} | "
+                f"拾取 {self.pickups} | 堆峰值 {self.peak_heap}")
+
+
+class ProfileSession:
+    """
+    cProfile / tracemalloc 采样会话
+    用法：with ProfileSession(memory=True) as session: planner.plan(...)
+         print(session.report())
+    """
+
+    def __init__(self, cpu=True, memory=False, top=15):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.profiler = None
+        self.memory_snapshot = None
+        self.memory_peak = 0
+
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start()
+        if self.cpu:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.memory:
+            self.memory_snapshot = tracemalloc.take_snapshot()
+            _, self.memory_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return False
+
+    def report(self, sort_by='cumulative'):
+        """返回文本报告"""
+        parts = []
+        if self.profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats(sort_by).print_stats(self.top)
+            parts.append(stream.getvalue())
+        if self.memory_snapshot is not None:
+            parts.append(f"内存峰值: {self.memory_peak / 1024:.1f} KiB")
+            for stat in self.memory_snapshot.statistics('lineno')[:self.top]:
+                parts.append(str(stat))
+        return "\n".join(parts)
@@ -0,0 +1,232 @@
+"""方块布局模块 - 合法布局的表示与生成（不依赖Qt，可在无界面批量求解中使用）"""
+
+import bisect
+import random
+from itertools import combinations
+from math import comb
+from utils.constants import (
+    ORIGINAL_GRID_SIZE, OUTER_POSITIONS, ENTRANCE_POSITIONS, FORBIDDEN_F_POSITIONS,
+    MAX_R1_COUNT, MAX_R2_COUNT, MAX_F_COUNT, get_extended_position
+)
+
+# 扩展网格位置 -> 原始位置（0-11）
+ORIGINAL_POSITIONS = {get_extended_position(p): p for p in range(ORIGINAL_GRID_SIZE)}
+
+
+def layout_key(obstacles, r2_positions):
+    """
+    规范布局键 (障碍位掩码, R2位掩码)
+    规划器只区分障碍与R2，R1和F同为障碍，R1/F互换后障碍集合相同的布局共享同一个键和同一个最优解
+    """
+    obstacle_mask = 0
+    for pos in obstacles:
+        obstacle_mask |= 1 << pos
+    r2_mask = 0
+    for pos in r2_positions:
+        r2_mask |= 1 << pos
+    return obstacle_mask, r2_mask
+
+
+class Layout:
+    """方块布局：R1、R2、F所在位置（扩展网格坐标）"""
+
+    def __init__(self, r1=(), r2=(), f=()):
+        self.r1 = tuple(sorted(r1))
+        self.r2 = tuple(sorted(r2))
+        self.f = tuple(sorted(f))
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        """由 {位置: 方块类型} 创建布局"""
+        return cls([p for p, t in blocks.items() if t == 'R1'],
+                   [p for p, t in blocks.items() if t == 'R2'],
+                   [p for p, t in blocks.items() if t == 'F'])
+
+    def get_blocks(self):
+        """返回 {位置: 方块类型}"""
+        blocks = {pos: 'R1' for pos in self.r1}
+        blocks.update((pos, 'R2') for pos in self.r2)
+        blocks.update((pos, 'F') for pos in self.f)
+        return blocks
+
+    def get_obstacles(self):
+        """所有方块都是障碍（R2被收集后才可通行）"""
+        return set(self.r1) | set(self.r2) | set(self.f)
+
+    def get_r2_positions(self):
+        return set(self.r2)
+
+    def canonical_key(self):
+        """规范布局键，见 layout_key"""
+        return layout_key(self.get_obstacles(), self.r2)
+
+    def __eq__(self, other):
+        return isinstance(other, Layout) and (self.r1, self.r2, self.f) == (other.r1, other.r2, other.f)
+
+    def __hash__(self):
+        return hash((self.r1, self.r2, self.f))
+
+    def __repr__(self):
+        return f"Layout(r1={self.r1}, r2={self.r2}, f={self.f})"
+
+
+def random_layout(rng=random):
+    """
+    在所有合法布局中均匀随机抽取一个（按编号抽样，见 unrank_layout）
+    rng 可传入 random.Random 实例以获得可复现的结果
+    """
+    return unrank_layout(rng.randrange(LAYOUT_COUNT))
+
+
+# ---------------------------------------------------------------------------
+# 合法布局的组合编号（rank/unrank）
+# 合法布局：恰好MAX_F_COUNT个F（不在入口）、MAX_R1_COUNT个R1（在外围）、
+# MAX_R2_COUNT个R2（至少1个在入口）。编号顺序为 F组合 → R1组合 → R2组合，均按字典序。
+# ---------------------------------------------------------------------------
+
+F_CHOICES = list(combinations([p for p in range(ORIGINAL_GRID_SIZE) if p not in FORBIDDEN_F_POSITIONS],
+                              MAX_F_COUNT))
+
+
+def _r2_universe(f, r1):
+    """放完F与R1后剩余可放R2的原始位置（升序）"""
+    used = set(f) | set(r1)
+    return [p for p in range(ORIGINAL_GRID_SIZE) if p not in used]
+
+
+def _count_r2(universe, start, need, has_entrance):
+    """universe[start:]中选need个、使整体至少含1个入口位置的组合数"""
+    rest = len(universe) - start
+    if has_entrance:
+        return comb(rest, need)
+    non_entrance = sum(1 for p in universe[start:] if p not in ENTRANCE_POSITIONS)
+    return comb(rest, need) - comb(non_entrance, need)
+
+
+def _build_index():
+    """预计算各(F, R1)组合下的R2组合数及累计偏移，供二分查找"""
+    blocks = []
+    offsets = []
+    total = 0
+    for f in F_CHOICES:
+        r1_cells = [p for p in OUTER_POSITIONS if p not in f]
+        for r1 in combinations(r1_cells, MAX_R1_COUNT):
+            count = _count_r2(_r2_universe(f, r1), 0, MAX_R2_COUNT, False)
+            if count:
+                blocks.append((f, r1))
+                offsets.append(total)
+                total += count
+    return blocks, offsets, total
+
+
+_INDEX_BLOCKS, _INDEX_OFFSETS, LAYOUT_COUNT = _build_index()
+_BLOCK_POSITIONS = {block: i for i, block in enumerate(_INDEX_BLOCKS)}
+
+
+def count_layouts():
+    """合法布局总数"""
+    return LAYOUT_COUNT
+
+
+def rank_layout(layout):
+    """布局 -> 编号（0 ≤ rank < LAYOUT_COUNT），非合法布局抛出ValueError"""
+    try:
+        f = tuple(sorted(ORIGINAL_POSITIONS[p] for p in layout.f))
+        r1 = tuple(sorted(ORIGINAL_POSITIONS[p] for p in layout.r1))
+        r2 = sorted(ORIGINAL_POSITIONS[p] for p in layout.r2)
+    except KeyError:
+        raise ValueError(f"布局包含绿色区域以外的位置: {layout}")
+    block = _BLOCK_POSITIONS.get((f, r1))
+    universe = _r2_universe(f, r1)
+    if (block is None or len(r2) != MAX_R2_COUNT or not set(r2) <= set(universe)
+            or not set(r2) & set(ENTRANCE_POSITIONS)):
+        raise ValueError(f"不是合法的完整布局: {layout}")
+
+    # R2组合在满足入口约束的组合中按字典序的名次
+    rank = 0
+    need = MAX_R2_COUNT
+    has_entrance = False
+    chosen = set(r2)
+    for i, p in enumerate(universe):
+        if need == 0:
+            break
+        if p in chosen:
+            need -= 1
+            has_entrance = has_entrance or p in ENTRANCE_POSITIONS
+        else:
+            # 此处选p的所有组合都排在前面
+            rank += _count_r2(universe, i + 1, need - 1, has_entrance or p in ENTRANCE_POSITIONS)
+    return _INDEX_OFFSETS[block] + rank
+
+
+def unrank_layout(rank):
+    """编号 -> 布局"""
+    if not 0 <= rank < LAYOUT_COUNT:
+        raise ValueError(f"布局编号超出范围: {rank}")
+    block = bisect.bisect_right(_INDEX_OFFSETS, rank) - 1
+    f, r1 = _INDEX_BLOCKS[block]
+    rank -= _INDEX_OFFSETS[block]
+
+    universe = _r2_universe(f, r1)
+    r2 = []
+    need = MAX_R2_COUNT
+    has_entrance = False
+    for i, p in enumerate(universe):
+        if need == 0:
+            break
+        with_p = _count_r2(universe, i + 1, need - 1, has_entrance or p in ENTRANCE_POSITIONS)
+        if rank < with_p:
+            r2.append(p)
+            need -= 1
+            has_entrance = has_entrance or p in ENTRANCE_POSITIONS
+        else:
+            rank -= with_p
+
+    return Layout([get_extended_position(p) for p in r1],
+                  [get_extended_position(p) for p in r2],
+                  [get_extended_position(p) for p in f])
+
+
+def shard_range(index, count, total=None):
+    """把编号区间[0, total)均分为count份，返回第index份的 (start, stop)"""
+    total = LAYOUT_COUNT if total is None else total
+    if not 0 <= index < count:
+        raise ValueError(f"分片下标超出范围: {index}/{count}")
+    return total * index // count, total * (index + 1) // count
+
+
+def iter_layouts(start=0, stop=None):
+    """按编号顺序遍历合法布局，生成 (rank, layout)"""
+    stop = LAYOUT_COUNT if stop is None else min(stop, LAYOUT_COUNT)
+    for rank in range(start, stop):
+        yield rank, unrank_layout(rank)
+
+
+_CANONICAL_RANKS = None
+
+
+def canonical_ranks():
+    """规范布局键 -> 该键下最小的布局编号（首次调用时遍历全部合法布局建立）"""
+    global _CANONICAL_RANKS
+    if _CANONICAL_RANKS is None:
+        ranks = {}
+        for rank, layout in iter_layouts():
+            ranks.setdefault(layout.canonical_key(), rank)
+        _CANONICAL_RANKS = ranks
+    return _CANONICAL_RANKS
+
+
+def canonical_rank(obstacles, r2_positions):
+    """与给定障碍/R2集合等价的合法布局中编号最小者，不等价于任何合法布局时返回None"""
+    return canonical_ranks().get(layout_key(obstacles, r2_positions))
+
+
+def group_equivalent(ranks):
+    """
+    按规范布局键对编号分组，返回编号列表的列表：每组首个编号为代表，组内布局只需求解一次
+    各组按代表编号升序排列
+    """
+    groups = {}
+    for rank in ranks:
+        groups.setdefault(unrank_layout(rank).canonical_key(), []).append(rank)
+    return sorted(groups.values())
@@ -0,0 +1,193 @@
+"""蒙特卡洛鲁棒性统计模块 - 无界面批量随机布局求解"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from core.instrumentation import ProfileSession
+from core.layouts import random_layout
+from core.path_planner import PathPlanner
+from utils.constants import POSITION_NUMBERS
+
+
+class RunningStats:
+    """可合并的在线统计量，内存只与代价取值种类数有关，与样本数无关"""
+
+    PERCENTILES = (5, 25, 50, 75, 95)
+
+    def __init__(self):
+        self.samples = 0
+        self.feasible = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.cost_histogram = Counter()
+        self.entry_usage = Counter()
+        self.exit_usage = Counter()
+
+    def add(self, cost, entry=None, exit_=None):
+        """加入一个样本，cost为None表示无可行路径"""
+        self.samples += 1
+        if cost is None:
+            return
+        self.feasible += 1
+        delta = cost - self.mean
+        self.mean += delta / self.feasible
+        self.m2 += delta * (cost - self.mean)
+        self.cost_histogram[cost] += 1
+        self.entry_usage[entry] += 1
+        self.exit_usage[exit_] += 1
+
+    def merge(self, other):
+        """合并另一组统计量（并行Welford公式）"""
+        total = self.feasible + other.feasible
+        if other.feasible:
+            delta = other.mean - self.mean
+            self.m2 += other.m2 + delta * delta * self.feasible * other.feasible / total
+            self.mean += delta * other.feasible / total
+        self.samples += other.samples
+        self.feasible = total
+        self.cost_histogram.update(other.cost_histogram)
+        self.entry_usage.update(other.entry_usage)
+        self.exit_usage.update(other.exit_usage)
+
+    def percentile(self, q):
+        """由代价直方图求精确百分位数（最近秩法）"""
+        if not self.feasible:
+            return None
+        rank = max(1, -(-q * self.feasible // 100))
+        seen = 0
+        for cost in sorted(self.cost_histogram):
+            seen += self.cost_histogram[cost]
+            if seen >= rank:
+                return cost
+
+    def snapshot(self):
+        """导出为可JSON序列化的dict，出入口以显示编号表示"""
+        def usage(counter):
+            return {str(POSITION_NUMBERS.get(pos, pos)): n for pos, n in sorted(counter.items())}
+
+        return {
+            'samples': self.samples,
+            'feasible': self.feasible,
+            'infeasible_rate': (self.samples - self.feasible) / self.samples if self.samples else 0.0,
+            'mean': self.mean if self.feasible else None,
+            'std': (self.m2 / self.feasible) ** 0.5 if self.feasible else None,
+            'min': min(self.cost_histogram) if self.feasible else None,
+            'max': max(self.cost_histogram) if self.feasible else None,
+            'percentiles': {str(q): self.percentile(q) for q in self.PERCENTILES},
+            'cost_histogram': {str(c): n for c, n in sorted(self.cost_histogram.items())},
+            'entry_usage': usage(self.entry_usage),
+            'exit_usage': usage(self.exit_usage),
+        }
+
+
+_worker_planner = None
+
+
+def _init_worker(profile):
+    """工作进程初始化：每个进程只创建一次规划器"""
+    global _worker_planner
+    _worker_planner = PathPlanner()
+    _worker_planner.apply_profile(profile)
+
+
+def _run_chunk(seed, chunk_index, size):
+    """
+    求解一个样本块
+    随机数种子由(seed, chunk_index)确定，与进程数和调度顺序无关，结果可复现
+    """
+    planner = _worker_planner
+    rng = random.Random(f"{seed}:{chunk_index}")
+    stats = RunningStats()
+    for _ in range(size):
+        layout = random_layout(rng)
+        path = planner.plan(layout.get_obstacles(), layout.get_r2_positions())
+        if path is None:
+            stats.add(None)
+            continue
+        entry, exit_ = planner.get_entry_exit(path)
+        stats.add(planner.calculate_path_cost_with_collection(path), entry, exit_)
+    return stats
+
+
+class MonteCarloSampler:
+    """随机合法布局采样器：分块并行求解，流式合并统计量"""
+
+    def __init__(self, profile=None, processes=None, chunk_size=1000):
+        self.profile = profile if profile is not None else PathPlanner().get_profile()
+        self.processes = processes
+        self.chunk_size = chunk_size
+
+    def iter_chunks(self, n_samples):
+        """生成 (chunk_index, size)"""
+        for chunk_index, start in enumerate(range(0, n_samples, self.chunk_size)):
+            yield chunk_index, min(self.chunk_size, n_samples - start)
+
+    def run(self, n_samples, seed=0):
+        """
+        采样n_samples个布局，每合并一个样本块就yield一次累计的RunningStats
+        同时在途的样本块数量有上限，因此内存不随样本数增长
+        """
+        stats = RunningStats()
+        if self.processes == 1:
+            _init_worker(self.profile)
+            for chunk_index, size in self.iter_chunks(n_samples):
+                stats.merge(_run_chunk(seed, chunk_index, size))
+                yield stats
+            return
+
+        with ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=(self.profile,)) as pool:
+            max_pending = 2 * (self.processes or os.cpu_count() or 1)
+            chunks = self.iter_chunks(n_samples)
+            pending = set()
+            while True:
+                for chunk_index, size in chunks:
+                    pending.add(pool.submit(_run_chunk, seed, chunk_index, size))
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.merge(future.result())
+                    yield stats
+
+
+def main(argv=None):
+    """命令行入口：python -m core.monte_carlo --samples 100000"""
+    parser = argparse.ArgumentParser(description="随机合法布局的蒙特卡洛鲁棒性统计")
+    parser.add_argument('--samples', type=int, default=10000, help="样本数")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子")
+    parser.add_argument('--processes', type=int, default=None, help="进程数（默认CPU核数，1为单进程）")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="每个样本块的布局数")
+    parser.add_argument('--required', type=int, default=None, help="必须收集的R2数（2/3/4）")
+    parser.add_argument('--only-200', action='store_true', help="R2构型仅能上下200台阶")
+    parser.add_argument('--report-every', type=int, default=10, help="每合并多少个样本块输出一次中间结果")
+    parser.add_argument('--profile', action='store_true', help="单进程运行并输出cProfile/tracemalloc报告")
+    args = parser.parse_args(argv)
+
+    profile = PathPlanner().get_profile()
+    if args.required is not None:
+        profile['required_r2_count'] = args.required
+    if args.only_200:
+        profile['allow_400'] = False
+
+    sampler = MonteCarloSampler(profile, 1 if args.profile else args.processes, args.chunk_size)
+    merged = 0
+    stats = RunningStats()
+    with ProfileSession(cpu=args.profile, memory=args.profile) as session:
+        for stats in sampler.run(args.samples, args.seed):
+            merged += 1
+            if merged % args.report_every == 0 and stats.samples < args.samples:
+                print(json.dumps(stats.snapshot(), ensure_ascii=False), flush=True)
+    print(json.dumps(stats.snapshot(), ensure_ascii=False), flush=True)
+    if args.profile:
+        print(session.report(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""多目标Pareto路径规划模块"""
+
+import heapq
+from array import array
+from utils.constants import TRUE_START_POSITION, FINAL_OUTER_TARGET
+
+
+class ParetoPlanner:
+    """多目标路径规划器 - 在总时间、±400台阶次数、额外拾取数之间求Pareto前沿
+
+    复用PathPlanner的移动规则（is_transition_allowed / get_edge_cost），
+    使用标签设定法（label-setting）按(时间, 风险)字典序出队并做支配剪枝。
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+
+    def build_transitions(self):
+        """预计算每个位置的合法移动：[(邻居, 时间代价, 是否±400)]"""
+        planner = self.path_planner
+        transitions = []
+        for pos in range(planner.grid_size):
+            moves = []
+            for neighbor in planner.get_valid_neighbors(pos):
+                if not planner.is_transition_allowed(pos, neighbor):
+                    continue
+                h1 = planner.position_heights.get(pos, 0)
+                h2 = planner.position_heights.get(neighbor, 0)
+                moves.append((neighbor, planner.get_edge_cost(pos, neighbor), int(abs(h2 - h1) == 400)))
+            transitions.append(moves)
+        return transitions
+
+    def pareto_with_collection(self, obstacles, r2_positions):
+        """
+        多目标标签设定搜索
+        目标向量：(总时间, ±400台阶次数, 额外拾取数)，额外拾取仅在要求为2时可能大于0
+        返回按时间升序排列的非支配方案列表 [(objectives, path_with_states), ...]
+        """
+        planner = self.path_planner
+        grid_size = planner.grid_size
+        required = planner.required_r2_count
+        allow_extra_when_two = (required == 2)
+        pickup_cost = planner.pickup_cost
+        transitions = self.build_transitions()
+
+        # R2位置 -> 位编号，已收集集合用整数位掩码表示
+        r2_list = sorted(r2_positions)
+        r2_bit = {pos: 1 << i for i, pos in enumerate(r2_list)}
+        pickups_at = []
+        for pos in range(grid_size):
+            pickups_at.append([(nb, r2_bit[nb]) for nb in planner.get_valid_neighbors(pos) if nb in r2_bit])
+        blocked_static = set(obstacles) - set(r2_positions)
+
+        # 紧凑标签存储：并行数组，标签编号即下标
+        label_state = array('q')
+        label_parent = array('i')
+
+        # 每个状态(位置, 掩码)只需记录已确定标签中的最小风险：
+        # 出队顺序保证已确定标签的时间不大于后续标签，故风险不更小者必被支配
+        best_risk = {}
+        solutions = []
+
+        def dominated_by_solution(time, risk, extra_lb):
+            for (s_time, s_risk, s_extra), _ in solutions:
+                if s_time <= time and s_risk <= risk and s_extra <= extra_lb:
+                    return True
+            return False
+
+        def push(time, risk, pos, mask, parent):
+            state = mask * grid_size + pos
+            if risk >= best_risk.get(state, risk + 1):
+                return
+            label_state.append(state)
+            label_parent.append(parent)
+            heapq.heappush(pq, (time, risk, len(label_state) - 1))
+
+        pq = []
+        push(0, 0, TRUE_START_POSITION, 0, -1)
+
+        while pq:
+            time, risk, label = heapq.heappop(pq)
+            state = label_state[label]
+            if risk >= best_risk.get(state, risk + 1):
+                continue
+            best_risk[state] = risk
+
+            mask, pos = divmod(state, grid_size)
+            collected_cnt = bin(mask).count('1')
+            extra_lb = max(0, collected_cnt - required)
+            if dominated_by_solution(time, risk, extra_lb):
+                continue
+
+            meets_requirement = (collected_cnt >= required) if allow_extra_when_two else (collected_cnt == required)
+            if pos == FINAL_OUTER_TARGET and meets_requirement:
+                solutions.append(((time, risk, extra_lb), label))
+                continue
+
+            # 收集相邻R2
+            if collected_cnt < required or allow_extra_when_two:
+                for _, bit in pickups_at[pos]:
+                    if not mask & bit:
+                        push(time + pickup_cost, risk, pos, mask | bit, label)
+
+            # 移动：未收集的R2仍是障碍
+            for neighbor, cost, is_risky in transitions[pos]:
+                if neighbor in blocked_static:
+                    continue
+                bit = r2_bit.get(neighbor)
+                if bit is not None and not mask & bit:
+                    continue
+                push(time + cost, risk + is_risky, neighbor, mask, label)
+
+        # 时间与风险相同的方案按出队顺序到达，额外拾取更少者可能后到，需再过滤一次
+        frontier = []
+        for objectives, label in solutions:
+            if any(other != objectives and all(a <= b for a, b in zip(other, objectives))
+                   for other, _ in solutions):
+                continue
+            frontier.append((objectives, self.reconstruct_path(label, label_state, label_parent, r2_list)))
+        return frontier
+
+    def reconstruct_path(self, label, label_state, label_parent, r2_list):
+        """由标签链重建 (position, collected_r2_frozenset) 路径"""
+        grid_size = self.path_planner.grid_size
+        path = []
+        while label != -1:
+            mask, pos = divmod(label_state[label], grid_size)
+            collected = frozenset(p for i, p in enumerate(r2_list) if mask >> i & 1)
+            path.append((pos, collected))
+            label = label_parent[label]
+        return path[::-1]
@@ -1,6 +1,8 @@
 """路径规划器模块"""
 
 import heapq
+import time
+from core.instrumentation import PlannerStats
 from utils.constants import (
     EXTENDED_GRID_WIDTH, EXTENDED_GRID_HEIGHT, EXTENDED_GRID_SIZE,
     EXTENDED_GREEN_POSITIONS, ENTRY_ZONE_POSITIONS, EXIT_ZONE_POSITIONS,
@@ -10,6 +12,13 @@ from utils.constants import (
     DEFAULT_OUTER_ZONE_MOVE_COST, ENTRANCE_MAPPING, EXIT_MAPPING, FINAL_OUTER_TARGET
 )
 
+# 线性代价参数（路径总代价 = 各类动作次数 · 对应代价）
+COST_PARAMETERS = ('cost_up_200', 'cost_down_200', 'cost_up_400', 'cost_down_400',
+                   'pickup_cost', 'outer_zone_move_cost')
+
+# 完整求解配置（代价 + 任务 + 构型），用于批量求解与跨进程传递
+PROFILE_KEYS = COST_PARAMETERS + ('required_r2_count', 'allow_400')
+
 
 class PathPlanner:
     """路径规划器类 - 扩展支持R2方块收集任务和外围区域"""
@@ -33,6 +42,10 @@ class PathPlanner:
 
         # R2构型：是否允许400台阶（默认允许）
         self.allow_400 = True
+
+        # 性能统计（默认关闭）：开启后每次求解的计数与耗时保存在last_stats
+        self.collect_stats = False
+        self.last_stats = None
     
     def set_costs(self, cost_up_200, cost_down_200, cost_up_400, cost_down_400, 
                   pickup_cost, required_r2_count, outer_zone_move_cost=None):
@@ -49,6 +62,16 @@ class PathPlanner:
     def set_r2_config(self, allow_400: bool):
         """设置R2构型：是否允许400台阶"""
         self.allow_400 = allow_400
+
+    def get_profile(self):
+        """导出当前代价、任务与构型为dict"""
+        return {key: getattr(self, key) for key in PROFILE_KEYS}
+
+    def apply_profile(self, profile):
+        """应用get_profile()导出的配置，缺省的键保持不变"""
+        for key in PROFILE_KEYS:
+            if key in profile:
+                setattr(self, key, profile[key])
         
     def is_valid_position(self, position):
         """检查位置是否在有效范围内"""
@@ -123,6 +146,20 @@ class PathPlanner:
         else:
             return 0
 
+    def get_edge_feature(self, pos1, pos2, is_to_end=False):
+        """获取边代价对应的COST_PARAMETERS下标（与get_edge_cost一致），无代价时返回None"""
+        if self.is_outer_zone(pos1) and self.is_outer_zone(pos2):
+            return 5
+        if is_to_end and self.is_outer_zone(pos1):
+            return 5
+
+        height_diff = self.position_heights.get(pos2, 0) - self.position_heights.get(pos1, 0)
+        return {200: 0, -200: 1, 400: 2, -400: 3}.get(height_diff)
+
+    def get_cost_vector(self):
+        """按COST_PARAMETERS顺序返回当前代价"""
+        return [getattr(self, name) for name in COST_PARAMETERS]
+
     def is_transition_allowed(self, pos1, pos2):
         """根据R2构型与出口/入口规则判断移动是否允许"""
         # 外围之间总是允许
@@ -179,6 +216,10 @@ class PathPlanner:
         # 特殊策略：当要求为2时，允许“≥2”并可继续拾取更多（由总代价决定是否更优）
         allow_extra_when_two = (self.required_r2_count == 2)
 
+        # 计数器使用局部变量，关闭统计时只多几次整数加法
+        pops = stale_pops = pushes = pickups = peak_heap = 0
+        search_start = time.perf_counter() if self.collect_stats else 0.0
+
         # 真实起点：外圈14
         start_state = (TRUE_START_POSITION, initial_collected)
         distances[start_state] = 0
@@ -186,16 +227,27 @@ class PathPlanner:
         heapq.heappush(pq, (0, TRUE_START_POSITION, initial_collected))
 
         while pq:
+            if len(pq) > peak_heap:
+                peak_heap = len(pq)
             current_dist, current_pos, collected_r2 = heapq.heappop(pq)
+            pops += 1
             current_state = (current_pos, collected_r2)
 
             # 终止条件：到达外围终点22并满足收集要求
             collected_cnt = len(collected_r2)
             meets_requirement = (collected_cnt >= self.required_r2_count) if allow_extra_when_two else (collected_cnt == self.required_r2_count)
             if current_pos == FINAL_OUTER_TARGET and meets_requirement:
+                if self.collect_stats:
+                    self.record_stats(pops, stale_pops, pushes, pickups, peak_heap, search_start)
+                    reconstruct_start = time.perf_counter()
+                    path = self.reconstruct_path_with_collection(predecessors, current_state)
+                    self.last_stats.reconstruct_time = time.perf_counter() - reconstruct_start
+                    self.last_stats.found = True
+                    return path
                 return self.reconstruct_path_with_collection(predecessors, current_state)
 
             if current_state in distances and current_dist > distances[current_state]:
+                stale_pops += 1
                 continue
 
             # 普通位置之间的扩展
@@ -214,6 +266,8 @@ class PathPlanner:
                             distances[new_state] = new_dist
                             predecessors[new_state] = current_state
                             heapq.heappush(pq, (new_dist, current_pos, new_collected))
+                            pushes += 1
+                            pickups += 1
 
                 # 移动到相邻位置（外→外、外↔绿、绿→绿；按构型与合法口过滤）
                 for neighbor_pos in self.get_valid_neighbors(current_pos):
@@ -227,9 +281,76 @@ class PathPlanner:
                             distances[new_state] = new_dist
                             predecessors[new_state] = current_state
                             heapq.heappush(pq, (new_dist, neighbor_pos, collected_r2))
+                            pushes += 1
 
+        if self.collect_stats:
+            self.record_stats(pops, stale_pops, pushes, pickups, peak_heap, search_start)
         return None
 
+    def record_stats(self, pops, stale_pops, pushes, pickups, peak_heap, search_start):
+        """保存本次搜索的计数与耗时到last_stats"""
+        stats = PlannerStats()
+        stats.pops = pops
+        stats.stale_pops = stale_pops
+        stats.pushes = pushes + 1  # 含起点
+        stats.pickups = pickups
+        stats.peak_heap = peak_heap
+        stats.search_time = time.perf_counter() - search_start
+        self.last_stats = stats
+
+    def plan(self, obstacles, r2_positions):
+        """按当前配置求解布局：从外圈14出发，收集R2后到达外圈22"""
+        return self.dijkstra_with_collection(ENTRY_ZONE_POSITIONS, list(EXIT_MAPPING), obstacles, r2_positions)
+
+    def validate_path(self, path_with_states, obstacles, r2_positions):
+        """
+        按当前规则检查路径是否合法：从外圈14出发、每步为合法移动或相邻R2拾取、
+        到达外圈22时满足收集要求。返回 (是否合法, 原因)
+        """
+        if not path_with_states:
+            return False, "空路径"
+        if path_with_states[0] != (TRUE_START_POSITION, frozenset()):
+            return False, "起点不是外圈14"
+
+        allow_extra_when_two = (self.required_r2_count == 2)
+        for i, ((pos, collected), (next_pos, next_collected)) in enumerate(
+                zip(path_with_states, path_with_states[1:])):
+            if pos == next_pos:
+                picked = next_collected - collected
+                if len(picked) != 1 or not collected <= next_collected:
+                    return False, f"第{i + 1}步收集状态变化非法"
+                r2_pos = next(iter(picked))
+                if r2_pos not in r2_positions or r2_pos not in self.get_valid_neighbors(pos):
+                    return False, f"第{i + 1}步收集了不相邻或不存在的R2"
+                if len(collected) >= self.required_r2_count and not allow_extra_when_two:
+                    return False, f"第{i + 1}步超出收集数量"
+            else:
+                if next_collected != collected:
+                    return False, f"第{i + 1}步移动时收集状态改变"
+                if next_pos not in self.get_valid_neighbors(pos):
+                    return False, f"第{i + 1}步移动到不相邻的位置"
+                if next_pos in set(obstacles) - collected:
+                    return False, f"第{i + 1}步进入障碍"
+                if not self.is_transition_allowed(pos, next_pos):
+                    return False, f"第{i + 1}步违反台阶/出入口规则"
+
+        final_pos, final_collected = path_with_states[-1]
+        count = len(final_collected)
+        meets_requirement = (count >= self.required_r2_count) if allow_extra_when_two else (count == self.required_r2_count)
+        if final_pos != FINAL_OUTER_TARGET or not meets_requirement:
+            return False, "终点不是外圈22或未满足收集要求"
+        return True, ""
+
+    def get_entry_exit(self, path_with_states):
+        """返回路径进入绿区所经的入口格和离开绿区所到的出口格（外圈位置）"""
+        entry = exit_ = None
+        for (pos1, _), (pos2, _) in zip(path_with_states, path_with_states[1:]):
+            if entry is None and self.is_outer_zone(pos1) and self.is_green_area(pos2):
+                entry = pos1
+            if self.is_green_area(pos1) and self.is_outer_zone(pos2):
+                exit_ = pos2
+        return entry, exit_
+
     def calculate_path_cost_with_collection(self, path_with_states):
         """计算带收集任务的路径总代价"""
         if not path_with_states or len(path_with_states) < 2:
@@ -249,6 +370,22 @@ class PathPlanner:
 
         return total_cost
     
+    def get_path_features(self, path_with_states):
+        """统计路径中各类动作次数，与get_cost_vector()点积即为路径总代价"""
+        features = [0] * len(COST_PARAMETERS)
+        for i in range(len(path_with_states) - 1):
+            current_pos, current_collected = path_with_states[i]
+            next_pos, next_collected = path_with_states[i + 1]
+
+            if current_pos == next_pos and current_collected != next_collected:
+                features[4] += 1
+            elif current_pos != next_pos:
+                index = self.get_edge_feature(current_pos, next_pos)
+                if index is not None:
+                    features[index] += 1
+
+        return features
+
     def reconstruct_path_with_collection(self, predecessors, end_state):
         """重建带收集任务的路径"""
         path = []
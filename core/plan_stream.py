@@ -0,0 +1,407 @@
+"""
+路径下发模块 - path_with_states 编码为紧凑的二进制指令流，带帧校验与应答
+
+帧格式（小端）：
+    帧头  magic(2s) 类型(B) 保留(B) 序号(I) 发送时间戳ns(Q) 负载长度(H)
+    负载
+    CRC32(I)  覆盖帧头与负载
+计划帧负载：起点格子编号(B) 指令数(H)，每条指令 操作(B) 目标格子编号(B) 预计耗时ms(H)
+    操作 1=移动到目标格，2=收集目标格上的R2；格子编号即界面显示编号
+应答帧负载：状态(B)，序号与被应答的计划帧相同
+
+发送时间戳取 time.monotonic_ns()，本机替身接收端据此统计单向延迟；跨机器时只有往返时间有意义。
+
+用法（在项目根目录）：
+    python -m core.plan_stream receive --port 9000
+    python -m core.plan_stream bench --transport pipe --plans 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from core.layouts import random_layout
+from core.path_planner import PathPlanner
+from utils.constants import POSITION_NUMBERS
+
+FRAME_MAGIC = b'PF'
+FRAME_HEADER = struct.Struct('<2sBBIQH')
+FRAME_CRC = struct.Struct('<I')
+PLAN_HEADER = struct.Struct('<BH')
+COMMAND = struct.Struct('<BBH')
+
+FRAME_PLAN = 1
+FRAME_ACK = 2
+
+OP_MOVE = 1
+OP_PICKUP = 2
+
+ACK_OK = 0
+ACK_BAD_CRC = 1
+ACK_BAD_PLAN = 2
+
+MAX_KEPT_ACKS = 256
+
+# 代价单位对应的预计耗时（毫秒），规划代价即以时间为单位
+DEFAULT_UNIT_MS = 1000
+
+CELL_POSITIONS = {number: pos for pos, number in POSITION_NUMBERS.items()}
+
+
+def encode_plan(path_with_states, planner, unit_ms=DEFAULT_UNIT_MS):
+    """路径 -> 计划帧负载"""
+    commands = []
+    for (pos, collected), (next_pos, next_collected) in zip(path_with_states, path_with_states[1:]):
+        if pos == next_pos:
+            target = next(iter(next_collected - collected))
+            commands.append(COMMAND.pack(OP_PICKUP, POSITION_NUMBERS[target],
+                                         min(planner.pickup_cost * unit_ms, 0xFFFF)))
+        else:
+            commands.append(COMMAND.pack(OP_MOVE, POSITION_NUMBERS[next_pos],
+                                         min(planner.get_edge_cost(pos, next_pos) * unit_ms, 0xFFFF)))
+    start = POSITION_NUMBERS[path_with_states[0][0]]
+    return PLAN_HEADER.pack(start, len(commands)) + b''.join(commands)
+
+
+def decode_plan(payload):
+    """计划帧负载 -> (起点格子编号, [(操作, 目标格子编号, 预计耗时ms), ...])"""
+    start, count = PLAN_HEADER.unpack_from(payload)
+    if len(payload) != PLAN_HEADER.size + count * COMMAND.size:
+        raise ValueError("计划帧长度与指令数不符")
+    return start, list(COMMAND.iter_unpack(payload[PLAN_HEADER.size:]))
+
+
+def commands_to_path(start, commands):
+    """指令 -> path_with_states（接收端还原，用于校验）"""
+    pos = CELL_POSITIONS[start]
+    collected = frozenset()
+    path = [(pos, collected)]
+    for op, cell, _ in commands:
+        if op == OP_PICKUP:
+            collected = collected | {CELL_POSITIONS[cell]}
+        elif op == OP_MOVE:
+            pos = CELL_POSITIONS[cell]
+        else:
+            raise ValueError(f"未知指令: {op}")
+        path.append((pos, collected))
+    return path
+
+
+class FrameChannel:
+    """
+    双向字节流上的分帧收发，recv(n) 可返回不足n字节（返回空表示对端关闭），sendall(data) 完整写出
+    帧头magic不符时逐字节滑动重新同步
+    """
+
+    def __init__(self, recv, sendall):
+        self.recv = recv
+        self.sendall = sendall
+        self.send_lock = threading.Lock()
+        self.buffer = bytearray()
+
+    @classmethod
+    def from_socket(cls, sock):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock.recv, sock.sendall)
+
+    @classmethod
+    def from_fds(cls, read_fd, write_fd):
+        """管道等文件描述符（类串口的字节流）"""
+        def sendall(data):
+            view = memoryview(data)
+            while view:
+                view = view[os.write(write_fd, view):]
+        return cls(lambda n: os.read(read_fd, n), sendall)
+
+    def send_frame(self, frame_type, seq, payload=b'', timestamp_ns=None):
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        frame = FRAME_HEADER.pack(FRAME_MAGIC, frame_type, 0, seq, timestamp_ns, len(payload)) + payload
+        frame += FRAME_CRC.pack(zlib.crc32(frame))
+        with self.send_lock:
+            self.sendall(frame)
+
+    def fill(self, size):
+        while len(self.buffer) < size:
+            chunk = self.recv(max(4096, size - len(self.buffer)))
+            if not chunk:
+                raise EOFError("对端已关闭")
+            self.buffer += chunk
+
+    def read_frame(self):
+        """
+        读取一帧，返回 (类型, 序号, 时间戳ns, 负载)
+        CRC错误时负载为None（序号仍可用于应答）
+        """
+        while True:
+            self.fill(FRAME_HEADER.size)
+            if self.buffer[:2] != FRAME_MAGIC:
+                del self.buffer[0]
+                continue
+            _, frame_type, _, seq, timestamp_ns, length = FRAME_HEADER.unpack_from(self.buffer)
+            total = FRAME_HEADER.size + length + FRAME_CRC.size
+            self.fill(total)
+            frame = bytes(self.buffer[:total])
+            del self.buffer[:total]
+            (crc,) = FRAME_CRC.unpack_from(frame, total - FRAME_CRC.size)
+            payload = frame[FRAME_HEADER.size:total - FRAME_CRC.size]
+            if zlib.crc32(frame[:total - FRAME_CRC.size]) != crc:
+                payload = None
+            return frame_type, seq, timestamp_ns, payload
+
+
+class PlanStreamSender:
+    """发送端：编码并发送计划，后台线程接收应答；重规划时直接发送新计划，不必等待上一帧应答"""
+
+    def __init__(self, channel, unit_ms=DEFAULT_UNIT_MS, sock=None):
+        self.channel = channel
+        self.sock = sock  # 通道所在的套接字，close时关闭
+        self.unit_ms = unit_ms
+        self.seq = 0
+        self.sent = {}    # 序号 -> 发送时刻ns
+        self.acks = {}    # 序号 -> (状态, 往返时间ns)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.ack_thread = threading.Thread(target=self.read_acks, daemon=True)
+        self.ack_thread.start()
+
+    def send_plan(self, path_with_states, planner):
+        """发送计划，返回 (序号, 帧字节数)"""
+        payload = encode_plan(path_with_states, planner, self.unit_ms)
+        with self.condition:
+            self.seq += 1
+            seq = self.seq
+            now = time.monotonic_ns()
+            self.sent[seq] = now
+        self.channel.send_frame(FRAME_PLAN, seq, payload, now)
+        return seq, FRAME_HEADER.size + len(payload) + FRAME_CRC.size
+
+    def read_acks(self):
+        try:
+            while True:
+                frame_type, seq, _, payload = self.channel.read_frame()
+                if frame_type != FRAME_ACK or not payload:
+                    continue
+                received = time.monotonic_ns()
+                with self.condition:
+                    sent = self.sent.pop(seq, None)
+                    if sent is not None:
+                        self.acks[seq] = (payload[0], received - sent)
+                        # 只保留最近的应答，连续重规划时未等待的应答不会无限累积
+                        for old in [s for s in self.acks if s <= seq - MAX_KEPT_ACKS]:
+                            del self.acks[old]
+                        self.condition.notify_all()
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+
+    def wait_ack(self, seq, timeout=1.0):
+        """等待应答，返回 (状态, 往返时间ns)；超时或连接关闭返回None"""
+        with self.condition:
+            self.condition.wait_for(lambda: seq in self.acks or self.closed, timeout)
+            return self.acks.pop(seq, None)
+
+    def close(self, timeout=1.0):
+        """
+        断开连接并等待应答线程退出
+        先shutdown再close：应答线程阻塞在recv时仅close不会发出FIN，对端也就收不到断开
+        """
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+        self.ack_thread.join(timeout)
+
+
+class PlanReceiver:
+    """本机替身接收端：解码计划、校验、应答，并记录单向延迟"""
+
+    def __init__(self, channel, on_plan=None):
+        self.channel = channel
+        self.on_plan = on_plan
+        self.current_plan = None
+        self.current_seq = 0
+        self.latencies_ns = []
+        self.errors = 0
+
+    def run(self):
+        """处理帧直到对端关闭"""
+        try:
+            while True:
+                frame_type, seq, timestamp_ns, payload = self.channel.read_frame()
+                if frame_type != FRAME_PLAN:
+                    continue
+                received = time.monotonic_ns()
+                status = ACK_OK
+                if payload is None:
+                    status = ACK_BAD_CRC
+                else:
+                    try:
+                        start, commands = decode_plan(payload)
+                        path = commands_to_path(start, commands)
+                    except (ValueError, KeyError, struct.error):
+                        status = ACK_BAD_PLAN
+                self.channel.send_frame(FRAME_ACK, seq, bytes([status]))
+                if status != ACK_OK:
+                    self.errors += 1
+                    continue
+                self.latencies_ns.append(received - timestamp_ns)
+                # 重规划：序号更大的计划替换当前计划
+                if seq > self.current_seq:
+                    self.current_seq = seq
+                    self.current_plan = (start, commands, path)
+                if self.on_plan is not None:
+                    self.on_plan(seq, start, commands, received - timestamp_ns)
+        except (EOFError, OSError):
+            pass
+
+    def start_thread(self):
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+
+def connect_plan_stream(host, port, unit_ms=DEFAULT_UNIT_MS):
+    """连接接收端，返回发送端（用完调用其close断开）"""
+    sock = socket.create_connection((host, port), timeout=2.0)
+    sock.settimeout(None)
+    return PlanStreamSender(FrameChannel.from_socket(sock), unit_ms, sock)
+
+
+def _make_transport(kind):
+    """返回 (发送端通道, 接收端通道, 关闭函数)"""
+    if kind == 'pipe':
+        to_robot_r, to_robot_w = os.pipe()
+        to_pc_r, to_pc_w = os.pipe()
+
+        def close():
+            for fd in (to_robot_w, to_pc_w):
+                os.close(fd)
+        return FrameChannel.from_fds(to_pc_r, to_robot_w), FrameChannel.from_fds(to_robot_r, to_pc_w), close
+
+    listener = socket.create_server(('127.0.0.1', 0))
+    client = socket.create_connection(listener.getsockname())
+    server, _ = listener.accept()
+    listener.close()
+
+    def close():
+        client.shutdown(socket.SHUT_RDWR)
+        server.close()
+    return FrameChannel.from_socket(client), FrameChannel.from_socket(server), close
+
+
+def _percentiles(values_ns):
+    values = sorted(values_ns)
+    if not values:
+        return {}
+    return {'p50': values[len(values) // 2] / 1000, 'p99': values[int(len(values) * 0.99)] / 1000,
+            'max': values[-1] / 1000}
+
+
+def _bench(args):
+    """本机回环：求解随机布局（不计时），测量编码、单向延迟与往返时间（微秒）"""
+    rng = random.Random(args.seed)
+    planner = PathPlanner()
+    paths = []
+    while len(paths) < min(args.plans, 200):
+        layout = random_layout(rng)
+        path = planner.plan(layout.get_obstacles(), layout.get_r2_positions())
+        if path:
+            paths.append(path)
+
+    sender_channel, receiver_channel, close = _make_transport(args.transport)
+    receiver = PlanReceiver(receiver_channel)
+    receiver_thread = receiver.start_thread()
+    sender = PlanStreamSender(sender_channel)
+
+    encode_ns, rtt_ns, frame_bytes = [], [], []
+    for i in range(args.plans):
+        path = paths[i % len(paths)]
+        start = time.perf_counter_ns()
+        encode_plan(path, planner)
+        encode_ns.append(time.perf_counter_ns() - start)
+        if args.burst > 1 and i % args.burst:
+            # 连续重规划：不等应答
+            seq, size = sender.send_plan(path, planner)
+            frame_bytes.append(size)
+            continue
+        seq, size = sender.send_plan(path, planner)
+        frame_bytes.append(size)
+        ack = sender.wait_ack(seq)
+        if ack is None or ack[0] != ACK_OK:
+            raise RuntimeError(f"计划#{seq}未得到正确应答: {ack}")
+        rtt_ns.append(ack[1])
+    if args.burst > 1 and (args.plans - 1) % args.burst:
+        sender.wait_ack(seq)
+
+    close()
+    receiver_thread.join(timeout=2.0)
+    print(json.dumps({
+        'transport': args.transport,
+        'plans': args.plans,
+        'received': len(receiver.latencies_ns),
+        'errors': receiver.errors,
+        'frame_bytes_mean': sum(frame_bytes) / len(frame_bytes),
+        'encode_us': _percentiles(encode_ns),
+        'one_way_us': _percentiles(receiver.latencies_ns),
+        'rtt_us': _percentiles(rtt_ns),
+    }, indent=2, ensure_ascii=False))
+
+
+def _receive(args):
+    """TCP替身接收端：打印每个计划与单向延迟"""
+    listener = socket.create_server((args.host, args.port))
+    print(f"接收端已启动: {args.host}:{args.port}", file=sys.stderr)
+    names = {OP_MOVE: "→", OP_PICKUP: "取"}
+
+    def on_plan(seq, start, commands, latency_ns):
+        steps = " ".join(f"{names[op]}{cell}({duration}ms)" for op, cell, duration in commands)
+        print(f"#{seq} [{latency_ns / 1000:.0f}us] {start}: {steps}", flush=True)
+
+    try:
+        while True:
+            conn, address = listener.accept()
+            print(f"连接: {address}", file=sys.stderr)
+            PlanReceiver(FrameChannel.from_socket(conn), on_plan).run()
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+
+
+def main(argv=None):
+    """命令行入口：receive 启动替身接收端，bench 本机回环测延迟"""
+    parser = argparse.ArgumentParser(description="路径二进制指令流下发")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    receive_parser = subparsers.add_parser('receive', help="TCP替身接收端")
+    receive_parser.add_argument('--host', default='127.0.0.1')
+    receive_parser.add_argument('--port', type=int, default=9000)
+    bench_parser = subparsers.add_parser('bench', help="本机回环延迟测试")
+    bench_parser.add_argument('--transport', choices=['pipe', 'tcp'], default='pipe')
+    bench_parser.add_argument('--plans', type=int, default=1000)
+    bench_parser.add_argument('--burst', type=int, default=1, help="每N个计划中前N-1个不等应答（模拟连续重规划）")
+    bench_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'receive':
+        _receive(args)
+    else:
+        _bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""预计算路径查找表模块 - 所有合法布局的最优路径，以内存映射二进制文件存储"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from itertools import product
+
+from core.compact_path import as_compact
+from core.layouts import Layout, count_layouts, rank_layout, canonical_rank
+from core.path_planner import PathPlanner, COST_PARAMETERS
+from core.sweep import LayoutSweep
+from utils.constants import (
+    EXTENDED_GRID_WIDTH, TRUE_START_POSITION, POSITION_NUMBERS, get_extended_position
+)
+
+# 文件格式（小端）：
+#   文件头  magic(4s) version(H) 配置数(H) 布局数(I) 记录字节数(H) 保留(H)
+#   配置表  每个配置：6个代价(H) + required_r2_count(B) + allow_400(B)
+#   记录区  [配置][布局编号] 定长记录：代价(H, 0xFFFF表示无解) + 步数(B) + 步骤编码
+# 步骤编码：从外圈14出发，每步4位，低2位为方向（上/下/左/右），
+#   第3位为0表示移动到该方向的格子，为1表示收集该方向相邻的R2
+PLAN_TABLE_MAGIC = b'PFPT'
+PLAN_TABLE_VERSION = 1
+HEADER_FORMAT = '<4sHHIHH'
+PROFILE_FORMAT = '<6HBB'
+NO_PATH_COST = 0xFFFF
+DIRECTION_OFFSETS = (-EXTENDED_GRID_WIDTH, EXTENDED_GRID_WIDTH, -1, 1)
+
+DEFAULT_PLAN_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       'plan_table.bin')
+
+
+def default_profiles():
+    """默认配置集合：默认代价 × R2构型(2种) × 收集要求(2/3/4)"""
+    base = PathPlanner().get_profile()
+    profiles = []
+    for allow_400, required in product((True, False), (2, 3, 4)):
+        profile = dict(base)
+        profile['allow_400'] = allow_400
+        profile['required_r2_count'] = required
+        profiles.append(profile)
+    return profiles
+
+
+def load_profiles(path):
+    """读取配置文件（JSON列表，每项只需给出与默认配置不同的字段）；未给出时使用默认配置集合"""
+    if path is None:
+        return default_profiles()
+    base = PathPlanner().get_profile()
+    with open(path, encoding='utf-8') as f:
+        return [dict(base, **overrides) for overrides in json.load(f)]
+
+
+def pack_profile(profile):
+    """配置 -> 定长字节，超出取值范围的配置无法写入查找表"""
+    return struct.pack(PROFILE_FORMAT, *[profile[name] for name in COST_PARAMETERS],
+                       profile['required_r2_count'], int(profile['allow_400']))
+
+
+def encode_path(path_with_states):
+    """路径（旧格式或CompactPath） -> 步骤编码字节，返回 (步数, bytes)"""
+    codes = []
+    for pos, next_pos, picked in as_compact(path_with_states).iter_steps():
+        if picked is not None:
+            codes.append(DIRECTION_OFFSETS.index(picked - pos) | 4)
+        else:
+            codes.append(DIRECTION_OFFSETS.index(next_pos - pos))
+    n_steps = len(codes)
+    if len(codes) % 2:
+        codes.append(0)
+    return n_steps, bytes(codes[i] | codes[i + 1] << 4 for i in range(0, len(codes), 2))
+
+
+def decode_path(n_steps, data):
+    """步骤编码 -> [(position, collected_r2_frozenset), ...]"""
+    pos = TRUE_START_POSITION
+    collected = frozenset()
+    path = [(pos, collected)]
+    for i in range(n_steps):
+        code = data[i >> 1] >> (4 * (i & 1)) & 0xF
+        target = pos + DIRECTION_OFFSETS[code & 3]
+        if code & 4:
+            collected = collected | {target}
+        else:
+            pos = target
+        path.append((pos, collected))
+    return path
+
+
+def build_plan_table(output_path, profiles=None, processes=None, progress=None, journal=None):
+    """
+    求解所有合法布局 × 配置并写出查找表，返回 (记录数, 去重比例)
+    R1/F互换后等价的布局只求解一次，记录复制到组内每个编号
+    给出journal路径时已完成的工作单元记入日志，中断后以相同参数重跑会跳过这些单元；写出成功后删除日志
+    """
+    profiles = default_profiles() if profiles is None else list(profiles)
+    packed_profiles = [pack_profile(p) for p in profiles]
+    n_layouts = count_layouts()
+    records = [[None] * n_layouts for _ in profiles]
+
+    total = n_layouts * len(profiles)
+    sweep = LayoutSweep(profiles, processes)
+    if journal is None:
+        # 工作进程直接写共享结果数组，主进程按编号读取
+        with sweep.solve_shared(progress=progress) as results:
+            for profile_index in range(len(profiles)):
+                for rank in range(n_layouts):
+                    cost, path = results.read(profile_index, rank)
+                    records[profile_index][rank] = (NO_PATH_COST, 0, b'') if path is None else \
+                        (cost,) + encode_path(path)
+    else:
+        done = 0
+        planner = PathPlanner()
+        for profile_index, groups, results in sweep.run(journal=journal):
+            planner.apply_profile(profiles[profile_index])
+            for group, path in zip(groups, results):
+                if path is None:
+                    record = (NO_PATH_COST, 0, b'')
+                else:
+                    record = (planner.calculate_path_cost_with_collection(path),) + encode_path(path)
+                for rank in group:
+                    records[profile_index][rank] = record
+                done += len(group)
+            if progress:
+                progress(done, total)
+
+    max_bytes = max(len(r[2]) for table in records for r in table)
+    record_size = 3 + max_bytes
+    record_format = f'<HB{max_bytes}s'
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, PLAN_TABLE_MAGIC, PLAN_TABLE_VERSION,
+                            len(profiles), n_layouts, record_size, 0))
+        for packed in packed_profiles:
+            f.write(packed)
+        for table in records:
+            f.write(b''.join(struct.pack(record_format, *r) for r in table))
+    os.replace(tmp_path, output_path)
+    if journal is not None:
+        os.remove(journal)
+    return total, sweep.dedup_ratio
+
+
+class PlanTable:
+    """只读查找表，以mmap打开，单次查询为O(1)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_profiles, self.n_layouts, self.record_size, _ = \
+            struct.unpack_from(HEADER_FORMAT, self.data, 0)
+        if magic != PLAN_TABLE_MAGIC or version != PLAN_TABLE_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的路径查找表: {path}")
+        if self.n_layouts != count_layouts():
+            self.close()
+            raise ValueError(f"查找表的布局数({self.n_layouts})与当前规则不一致")
+
+        profile_size = struct.calcsize(PROFILE_FORMAT)
+        offset = struct.calcsize(HEADER_FORMAT)
+        self.profile_index = {}
+        for i in range(n_profiles):
+            packed = bytes(self.data[offset:offset + profile_size])
+            self.profile_index[packed] = i
+            offset += profile_size
+        self.records_offset = offset
+
+    @classmethod
+    def open_default(cls):
+        """打开默认位置的查找表，不存在或无效时返回None"""
+        if not os.path.exists(DEFAULT_PLAN_TABLE_PATH):
+            return None
+        try:
+            return cls(DEFAULT_PLAN_TABLE_PATH)
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def find_profile(self, profile):
+        """返回配置在表中的下标，不在表中时返回None"""
+        try:
+            return self.profile_index.get(pack_profile(profile))
+        except struct.error:
+            return None
+
+    def lookup(self, layout, profile):
+        """
+        查询布局在给定配置下的最优路径
+        返回 (是否命中, path_with_states)；命中且无解时路径为None
+        不是合法布局但障碍集合与某个合法布局等价（如R1/F互换）时同样命中
+        """
+        try:
+            rank = rank_layout(layout)
+        except ValueError:
+            rank = canonical_rank(layout.get_obstacles(), layout.r2)
+        return self.lookup_rank(rank, profile)
+
+    def lookup_obstacles(self, obstacles, r2_positions, profile):
+        """按障碍集合与R2位置查询（不区分R1/F）"""
+        return self.lookup_rank(canonical_rank(obstacles, r2_positions), profile)
+
+    def lookup_rank(self, rank, profile):
+        """按布局编号查询，编号为None时视为未命中"""
+        profile_index = self.find_profile(profile)
+        if rank is None or profile_index is None:
+            return False, None
+
+        offset = self.records_offset + (profile_index * self.n_layouts + rank) * self.record_size
+        cost, n_steps = struct.unpack_from('<HB', self.data, offset)
+        if cost == NO_PATH_COST:
+            return True, None
+        return True, decode_path(n_steps, self.data[offset + 3:offset + self.record_size])
+
+
+def _parse_cells(text):
+    """'1,5,9' 形式的绿色格子编号(1-12) -> 扩展网格位置"""
+    return [get_extended_position(int(n) - 1) for n in text.split(',') if n.strip()]
+
+
+def main(argv=None):
+    """命令行入口：build 生成查找表，query 查询单个布局"""
+    parser = argparse.ArgumentParser(description="预计算路径查找表")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="求解所有合法布局并生成查找表")
+    build_parser.add_argument('--output', default=DEFAULT_PLAN_TABLE_PATH)
+    build_parser.add_argument('--processes', type=int, default=None)
+    build_parser.add_argument('--journal', default=None, help="扫描日志路径，中断后以相同参数重跑可续算")
+
+    query_parser = subparsers.add_parser('query', help="查询布局（格子编号1-12，逗号分隔）")
+    query_parser.add_argument('--table', default=DEFAULT_PLAN_TABLE_PATH)
+    query_parser.add_argument('--r1', required=True)
+    query_parser.add_argument('--r2', required=True)
+    query_parser.add_argument('--f', required=True)
+    query_parser.add_argument('--required', type=int, default=None)
+    query_parser.add_argument('--only-200', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+
+        def progress(done, total):
+            print(f"\r{done}/{total}", end='', file=sys.stderr, flush=True)
+
+        total, dedup_ratio = build_plan_table(args.output, processes=args.processes, progress=progress,
+                                              journal=args.journal)
+        print(f"\n已写入 {total} 条记录到 {args.output}，等价布局去重跳过 {dedup_ratio:.1%} 的求解 "
+              f"({os.path.getsize(args.output)} 字节, {time.perf_counter() - start:.1f}s)", file=sys.stderr)
+        return
+
+    planner = PathPlanner()
+    if args.required is not None:
+        planner.required_r2_count = args.required
+    if args.only_200:
+        planner.set_r2_config(False)
+    layout = Layout(_parse_cells(args.r1), _parse_cells(args.r2), _parse_cells(args.f))
+
+    table = PlanTable(args.table)
+    start = time.perf_counter()
+    hit, path = table.lookup(layout, planner.get_profile())
+    elapsed = time.perf_counter() - start
+    source = "查找表"
+    if not hit:
+        path = planner.plan(layout.get_obstacles(), layout.get_r2_positions())
+        elapsed = time.perf_counter() - start
+        source = "实时搜索"
+    if path is None:
+        print(f"无可行路径 [{source}, {elapsed * 1e6:.0f}us]")
+        return
+    cost = planner.calculate_path_cost_with_collection(path)
+    path_str = " → ".join(str(POSITION_NUMBERS.get(pos, pos)) for pos, _ in path)
+    print(f"总代价: {cost} [{source}, {elapsed * 1e6:.0f}us]\n路径: {path_str}")
+
+
+if __name__ == "__main__":
+    main()
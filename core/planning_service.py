@@ -0,0 +1,422 @@
+"""
+规划服务模块 - asyncio本地服务，JSON行协议，进程池求解
+
+请求（每行一个JSON对象）：
+    {"id": 1, "r1": [4, 6, 12], "r2": [1, 5, 8, 9], "f": [10], "profile": {"required_r2_count": 3}}
+    格子编号为绿色区域编号1-12，profile可只给出需要覆盖的字段（见 PROFILE_KEYS）
+    {"id": 2, "op": "stats"}  服务统计
+响应：
+    {"id": 1, "ok": true, "cost": 18, "path": [[14, []], ...], "source": "solve", "time_ms": 0.8}
+    path中每项为 [显示编号, 已收集R2的显示编号列表]；无解时 cost/path 为 null
+    source 为 cache / table / solve / coalesced
+    出错时 {"id": 1, "ok": false, "error": "..."}
+
+用法（在项目根目录）：
+    python -m core.planning_service serve --port 8765
+    python -m core.planning_service query --port 8765 --r1 4,6,12 --r2 1,5,8,9 --f 10
+    python -m core.planning_service bench --clients 16 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from core.layouts import Layout, random_layout
+from core.path_planner import PathPlanner, PROFILE_KEYS
+from core.plan_table import PlanTable
+from utils.constants import POSITION_NUMBERS, ORIGINAL_GRID_SIZE, get_extended_position
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+_worker_planner = None
+
+
+def _init_worker():
+    """工作进程初始化：每个进程只创建一次规划器"""
+    global _worker_planner
+    _worker_planner = PathPlanner()
+
+
+def solve_layout(profile, obstacles, r2_positions):
+    """工作进程中求解单个布局，返回 (代价, path_with_states)，无解为 (None, None)"""
+    if _worker_planner is None:
+        _init_worker()
+    planner = _worker_planner
+    planner.apply_profile(profile)
+    path = planner.plan(obstacles, r2_positions)
+    if path is None:
+        return None, None
+    return planner.calculate_path_cost_with_collection(path), path
+
+
+def parse_cells(values):
+    """绿色格子编号(1-12)列表 -> 扩展网格位置"""
+    cells = []
+    for value in values:
+        number = int(value)
+        if not 1 <= number <= ORIGINAL_GRID_SIZE:
+            raise ValueError(f"格子编号超出范围: {value}")
+        cells.append(get_extended_position(number - 1))
+    return cells
+
+
+def format_path(path_with_states):
+    """path_with_states -> 可JSON序列化的显示编号列表"""
+    return [[POSITION_NUMBERS.get(pos, pos), sorted(POSITION_NUMBERS.get(p, p) for p in collected)]
+            for pos, collected in path_with_states]
+
+
+class PlanningService:
+    """
+    规划服务：相同的在途请求合并为一次求解，结果按LRU缓存；
+    进程池中的在途求解数有上限，单个连接的未完成请求数也有上限，超出时暂停读取该连接
+    """
+
+    def __init__(self, processes=None, cache_size=4096, max_solves=None, max_per_connection=32,
+                 plan_table=None):
+        self.processes = processes
+        self.cache_size = cache_size
+        self.max_solves = max_solves or 2 * (processes or os.cpu_count() or 1)
+        self.max_per_connection = max_per_connection
+        self.plan_table = plan_table
+        self.cost_planner = PathPlanner()  # 查表命中时计算代价
+        self.default_profile = self.cost_planner.get_profile()
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.pool = None
+        self.solve_slots = None
+        self.connections = set()
+        self.stats = dict.fromkeys(('requests', 'cache', 'table', 'solve', 'coalesced', 'errors'), 0)
+
+    async def start(self):
+        """创建进程池（需在事件循环中调用）"""
+        self.pool = ProcessPoolExecutor(self.processes, initializer=_init_worker)
+        self.solve_slots = asyncio.Semaphore(self.max_solves)
+        # 在接受连接前启动工作进程：fork出的子进程不会继承客户端套接字（否则客户端断开后服务端收不到EOF），
+        # 也避免第一个请求承担进程启动耗时
+        await asyncio.get_running_loop().run_in_executor(self.pool, _init_worker)
+
+    async def stop(self, server):
+        """停止监听，等待已有连接处理完毕后关闭进程池"""
+        server.close()
+        await server.wait_closed()
+        if self.connections:
+            await asyncio.wait(self.connections, timeout=5)
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def make_profile(self, overrides):
+        """默认配置 + 请求中的覆盖字段"""
+        profile = dict(self.default_profile)
+        for name, value in (overrides or {}).items():
+            if name not in PROFILE_KEYS:
+                raise ValueError(f"未知配置字段: {name}")
+            profile[name] = bool(value) if name == 'allow_400' else int(value)
+        return profile
+
+    async def plan(self, layout, profile):
+        """返回 ((代价, 路径), 来源)"""
+        # R1/F互换后等价的布局共享缓存与在途求解
+        key = (layout.canonical_key(), tuple(profile[name] for name in PROFILE_KEYS))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key], 'cache'
+
+        if self.plan_table is not None:
+            hit, path = self.plan_table.lookup(layout, profile)
+            if hit:
+                self.cost_planner.apply_profile(profile)
+                result = (None, None) if path is None else (
+                    self.cost_planner.calculate_path_cost_with_collection(path), path)
+                self.store(key, result)
+                return result, 'table'
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            return await asyncio.shield(future), 'coalesced'
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            async with self.solve_slots:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.pool, solve_layout, profile, layout.get_obstacles(), layout.get_r2_positions())
+            self.store(key, result)
+            future.set_result(result)
+        except BaseException as e:
+            # 求解出错或发起者被取消（如 wait_for 超时、关闭服务）时都要让合并的请求结束等待；
+            # 对合并进来的其他请求而言，发起者被取消按求解失败处理
+            if not future.done():
+                future.set_exception(RuntimeError("求解已取消") if isinstance(e, asyncio.CancelledError) else e)
+                # 没有其他等待者时避免 "exception was never retrieved" 警告
+                future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+        return result, 'solve'
+
+    def store(self, key, result):
+        self.cache[key] = result
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def handle_request(self, request):
+        """处理单个请求对象，返回响应对象"""
+        self.stats['requests'] += 1
+        response = {'id': request.get('id')}
+        start = time.perf_counter()
+        try:
+            op = request.get('op', 'plan')
+            if op == 'stats':
+                response.update(ok=True, stats=dict(self.stats, cached=len(self.cache), in_flight=len(self.in_flight)))
+            elif op == 'plan':
+                layout = Layout(parse_cells(request.get('r1', [])), parse_cells(request.get('r2', [])),
+                                parse_cells(request.get('f', [])))
+                profile = self.make_profile(request.get('profile'))
+                (cost, path), source = await self.plan(layout, profile)
+                self.stats[source] += 1
+                response.update(ok=True, cost=cost, path=None if path is None else format_path(path), source=source)
+            else:
+                raise ValueError(f"未知操作: {op}")
+        except Exception as e:
+            self.stats['errors'] += 1
+            response.update(ok=False, error=str(e))
+        response['time_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """每行一个请求；请求并发处理，响应按完成顺序写回（以id对应）"""
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        slots = asyncio.Semaphore(self.max_per_connection)
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(response):
+            async with write_lock:
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+
+        async def run(request):
+            try:
+                await respond(await self.handle_request(request))
+            except ConnectionError:
+                pass
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("请求必须是JSON对象")
+                except ValueError as e:
+                    self.stats['errors'] += 1
+                    await respond({'id': None, 'ok': False, 'error': f"无法解析请求: {e}"})
+                    continue
+                # 背压：该连接未完成请求达到上限时不再读取新行
+                await slots.acquire()
+                task = asyncio.create_task(run(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+            self.connections.discard(connection)
+
+    async def serve_tcp(self, host='127.0.0.1', port=8765):
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+
+    async def serve_unix(self, path):
+        return await asyncio.start_unix_server(self.handle_connection, path, limit=MAX_LINE_BYTES)
+
+
+class PlanningClient:
+    """规划服务客户端：同一连接上可并发发送请求，按id匹配响应"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.waiting = {}
+        self.reader_task = asyncio.create_task(self.read_responses())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765, unix_path=None):
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(unix_path, limit=MAX_LINE_BYTES)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+        return cls(reader, writer)
+
+    async def read_responses(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("连接已关闭"))
+            self.waiting.clear()
+
+    async def request(self, **fields):
+        """发送请求并等待响应"""
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write(json.dumps(dict(fields, id=request_id)).encode('utf-8') + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def plan(self, r1, r2, f, profile=None):
+        fields = {'r1': list(r1), 'r2': list(r2), 'f': list(f)}
+        if profile:
+            fields['profile'] = profile
+        return await self.request(**fields)
+
+    async def close(self):
+        self.writer.close()
+        await self.reader_task
+
+
+def _layout_cells(layout):
+    """Layout -> 请求用的 (r1, r2, f) 格子编号列表"""
+    def numbers(positions):
+        return [POSITION_NUMBERS[p] for p in positions]
+    return numbers(layout.r1), numbers(layout.r2), numbers(layout.f)
+
+
+async def _bench(args):
+    """回环压测：启动服务，多个客户端并发请求随机布局（带重复以体现合并与缓存）"""
+    service = PlanningService(args.processes, plan_table=None if args.no_table else PlanTable.open_default())
+    await service.start()
+    server = await service.serve_tcp(args.host, 0)
+    port = server.sockets[0].getsockname()[1]
+    rng = random.Random(args.seed)
+    layouts = [random_layout(rng) for _ in range(args.distinct)]
+
+    latencies = []
+
+    async def client_task():
+        client = await PlanningClient.connect(args.host, port)
+        pending = []
+        for _ in range(args.requests):
+            r1, r2, f = _layout_cells(rng.choice(layouts))
+            pending.append(asyncio.ensure_future(timed(client.plan(r1, r2, f))))
+        await asyncio.gather(*pending)
+        await client.close()
+
+    async def timed(coroutine):
+        start = time.perf_counter()
+        response = await coroutine
+        latencies.append(time.perf_counter() - start)
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client_task() for _ in range(args.clients)])
+    elapsed = time.perf_counter() - start
+    await service.stop(server)
+
+    latencies.sort()
+    print(json.dumps({
+        'requests': len(latencies),
+        'wall_time': elapsed,
+        'throughput': len(latencies) / elapsed,
+        'latency_ms': {'p50': latencies[len(latencies) // 2] * 1000,
+                       'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+                       'max': latencies[-1] * 1000},
+        'stats': service.stats,
+    }, indent=2, ensure_ascii=False))
+
+
+async def _serve(args):
+    service = PlanningService(args.processes, cache_size=args.cache_size,
+                              plan_table=None if args.no_table else PlanTable.open_default())
+    await service.start()
+    if args.unix:
+        server = await service.serve_unix(args.unix)
+    else:
+        server = await service.serve_tcp(args.host, args.port)
+    print(f"规划服务已启动: {args.unix or f'{args.host}:{args.port}'}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.stop(server)
+
+
+async def _query(args):
+    client = await PlanningClient.connect(args.host, args.port, args.unix)
+    profile = {}
+    if args.required is not None:
+        profile['required_r2_count'] = args.required
+    if args.only_200:
+        profile['allow_400'] = False
+    cells = [[int(n) for n in text.split(',') if n.strip()] for text in (args.r1, args.r2, args.f)]
+    print(json.dumps(await client.plan(*cells, profile=profile), ensure_ascii=False))
+    await client.close()
+
+
+def main(argv=None):
+    """命令行入口：serve 启动服务，query 发送单个请求，bench 本地回环压测"""
+    parser = argparse.ArgumentParser(description="路径规划服务")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'query', 'bench'):
+        sub = subparsers.add_parser(name)
+        sub.add_argument('--host', default='127.0.0.1')
+        if name != 'bench':
+            sub.add_argument('--port', type=int, default=8765)
+            sub.add_argument('--unix', default=None, help="Unix套接字路径（代替TCP）")
+        if name != 'query':
+            sub.add_argument('--processes', type=int, default=None)
+            sub.add_argument('--no-table', action='store_true', help="不使用预计算查找表")
+    subparsers.choices['serve'].add_argument('--cache-size', type=int, default=4096)
+    query_parser = subparsers.choices['query']
+    query_parser.add_argument('--r1', required=True)
+    query_parser.add_argument('--r2', required=True)
+    query_parser.add_argument('--f', required=True)
+    query_parser.add_argument('--required', type=int, default=None)
+    query_parser.add_argument('--only-200', action='store_true')
+    bench_parser = subparsers.choices['bench']
+    bench_parser.add_argument('--clients', type=int, default=16)
+    bench_parser.add_argument('--requests', type=int, default=200, help="每个客户端的请求数")
+    bench_parser.add_argument('--distinct', type=int, default=300, help="随机布局池大小")
+    bench_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run({'serve': _serve, 'query': _query, 'bench': _bench}[args.command](args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+组合求解模块 - 多个精确规划引擎在独立进程中并行竞速，取最先返回的最优解，其余引擎立即终止
+
+用法（在项目根目录）：
+    python -m core.portfolio --sample 200 --seed 0 --records portfolio.jsonl
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+from multiprocessing.connection import wait
+
+from core.compact_path import as_compact
+from core.engines import PLANNER_ENGINES, EngineNotApplicable
+from core.layouts import layout_key, random_layout
+from core.path_planner import PathPlanner
+
+# 参与竞速的引擎：均为精确算法，任何一个先返回的结果即为最优
+PORTFOLIO_ENGINES = ('dijkstra', 'astar', 'bitmask_dp', 'bidirectional')
+
+# 关闭时等待空闲工作进程正常退出的秒数
+SHUTDOWN_TIMEOUT = 1.0
+
+
+def _engine_worker(name, conn):
+    """工作进程：常驻一个引擎，逐个处理 (竞速编号, 配置, 障碍, R2) 请求，收到None时退出"""
+    planner = PathPlanner()
+    engine = PLANNER_ENGINES[name]
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        race_id, profile, obstacles, r2_positions = request
+        planner.apply_profile(profile)
+        start = time.perf_counter()
+        try:
+            status, payload = 'ok', as_compact(engine(planner, obstacles, r2_positions))
+        except EngineNotApplicable as e:
+            status, payload = 'skip', str(e)
+        except Exception as e:  # 单个引擎出错不影响其余引擎竞速
+            status, payload = 'error', repr(e)
+        conn.send((race_id, status, payload, time.perf_counter() - start))
+
+
+class PortfolioResult:
+    """一次竞速的结果"""
+
+    def __init__(self, path, winner, elapsed, finished, cancelled, failures):
+        self.path = path            # 胜者的 CompactPath，无解为None
+        self.winner = winner        # 胜出引擎名，超时为None
+        self.elapsed = elapsed      # 竞速总耗时（秒，含进程通信）
+        self.finished = finished    # 已返回的引擎 -> 引擎内求解耗时（秒）
+        self.cancelled = cancelled  # 被终止的引擎
+        self.failures = failures    # 不适用或出错的引擎 -> 原因
+
+    def as_record(self):
+        return {
+            'winner': self.winner,
+            'elapsed': self.elapsed,
+            'finished': self.finished,
+            'cancelled': self.cancelled,
+            'failures': self.failures,
+        }
+
+
+class PortfolioSolver:
+    """
+    每个引擎一个常驻进程；solve 把同一布局同时发给全部引擎，
+    第一个成功返回者胜出，仍在求解的进程被终止后立即返回结果，
+    回收与重启留到下一次竞速（或关闭）前进行；胜负记录可写入JSON行文件
+    """
+
+    def __init__(self, engines=PORTFOLIO_ENGINES, record_path=None):
+        unknown = [name for name in engines if name not in PLANNER_ENGINES]
+        if unknown:
+            raise ValueError(f"未知引擎: {', '.join(unknown)}")
+        self.engines = tuple(engines)
+        self.record_path = record_path
+        self.records = None
+        self.workers = {}
+        self.stale = []  # 已终止、尚未回收的 (引擎名, 进程, 连接)
+        self.race_id = 0
+        self.wins = Counter()
+
+    def start(self):
+        for name in self.engines:
+            self.spawn(name)
+        if self.record_path is not None:
+            self.records = open(self.record_path, 'a', encoding='utf-8')
+        return self
+
+    def spawn(self, name):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_engine_worker, args=(name, child_conn), daemon=True)
+        process.start()
+        child_conn.close()
+        self.workers[name] = (process, parent_conn)
+
+    def kill(self, name):
+        """终止正在求解的引擎进程（只发信号，不等待），由 respawn 回收并重启"""
+        process, conn = self.workers.pop(name)
+        process.terminate()
+        self.stale.append((name, process, conn))
+
+    def respawn(self, restart=True):
+        """回收被终止的进程，restart 时为其引擎重新创建工作进程"""
+        for name, process, conn in self.stale:
+            process.join()
+            conn.close()
+            if restart:
+                self.spawn(name)
+        self.stale = []
+
+    def close(self):
+        self.respawn(restart=False)
+        for process, conn in self.workers.values():
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process, conn in self.workers.values():
+            process.join(SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            conn.close()
+        self.workers = {}
+        if self.records is not None:
+            self.records.close()
+            self.records = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def solve(self, obstacles, r2_positions, profile, timeout=None):
+        """
+        竞速求解一个布局，返回 PortfolioResult
+        timeout 秒内无引擎成功返回时终止全部引擎，winner 为None；全部引擎不适用或出错时抛出RuntimeError
+        """
+        self.respawn()
+        self.race_id += 1
+        start = time.perf_counter()
+        request = (self.race_id, profile, set(obstacles), set(r2_positions))
+        pending = {}
+        for name in self.engines:
+            conn = self.workers[name][1]
+            conn.send(request)
+            pending[conn] = name
+
+        winner = path = None
+        finished, failures = {}, {}
+
+        def receive(conn):
+            nonlocal winner, path
+            name = pending.pop(conn)
+            try:
+                race_id, status, payload, elapsed = conn.recv()
+            except EOFError:
+                # 工作进程意外退出
+                failures[name] = "进程退出"
+                self.kill(name)
+                return
+            finished[name] = elapsed
+            if status != 'ok':
+                failures[name] = payload
+            elif winner is None:
+                # 最先到达的成功结果胜出，之后到达的只记录耗时
+                winner, path = name, payload
+
+        while pending and winner is None:
+            remaining = None if timeout is None else max(0.0, start + timeout - time.perf_counter())
+            ready = wait(list(pending), remaining)
+            if not ready:
+                break
+            for conn in ready:
+                receive(conn)
+
+        # 已算完但尚未读取的结果照常记录，其余引擎终止
+        cancelled = []
+        for conn in list(pending):
+            if conn.poll():
+                receive(conn)
+            else:
+                cancelled.append(pending.pop(conn))
+                self.kill(cancelled[-1])
+
+        if winner is None and not cancelled:
+            raise RuntimeError("全部引擎均无法求解: " + "; ".join(f"{k}: {v}" for k, v in failures.items()))
+        result = PortfolioResult(path, winner, time.perf_counter() - start, finished, cancelled, failures)
+        if winner is not None:
+            self.wins[winner] += 1
+        if self.records is not None:
+            record = result.as_record()
+            record['layout'] = list(layout_key(obstacles, r2_positions))
+            record['profile'] = profile
+            self.records.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.records.flush()
+        return result
+
+
+def load_win_counts(record_path, profile=None):
+    """统计记录文件中各引擎的胜出次数（可只统计某一配置），用于选择默认引擎"""
+    wins = Counter()
+    with open(record_path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record['winner'] is not None and (profile is None or record['profile'] == profile):
+                wins[record['winner']] += 1
+    return wins
+
+
+def main(argv=None):
+    """命令行入口：对随机合法布局做竞速求解，输出各引擎胜出次数"""
+    parser = argparse.ArgumentParser(description="多引擎竞速求解")
+    parser.add_argument('--sample', type=int, default=100, help="随机抽取的布局数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engines', default=','.join(PORTFOLIO_ENGINES), help="逗号分隔的引擎名")
+    parser.add_argument('--timeout', type=float, default=None, help="单个布局的竞速时限（秒）")
+    parser.add_argument('--records', default=None, help="追加写入每次竞速记录的JSON行文件")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    profile = PathPlanner().get_profile()
+    total = 0.0
+    timeouts = 0
+    with PortfolioSolver(args.engines.split(','), args.records) as solver:
+        for _ in range(args.sample):
+            layout = random_layout(rng)
+            result = solver.solve(layout.get_obstacles(), layout.get_r2_positions(), profile, args.timeout)
+            total += result.elapsed
+            timeouts += result.winner is None
+        summary = {
+            'races': args.sample,
+            'wins': dict(solver.wins.most_common()),
+            'timeouts': timeouts,
+            'mean_time': total / args.sample if args.sample else 0.0,
+        }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.records:
+        print(f"竞速记录已追加到 {args.records}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+扫描结果列存储模块 - 每个 (布局, 配置) 一行，各列为内存映射的 .npy 文件，支持筛选、分组与top-k
+
+目录结构：
+    meta.json      格式版本、列名、配置列表与行数（最后写入，存在即表示存储完整）
+    <列名>.npy     rank(uint32) profile(uint16) cost(int32, -1为无解) steps(uint8) pickups(uint16)
+                   entry(uint8) exit(uint8) moves_400(uint8)
+                   positions(uint8 [行, 状态]) pickup_events(uint8 [行, 2×R2])  路径本身，格式同 CompactPath
+pickups 为已收集R2的位掩码（第i位对应绿色格子i+1）；entry/exit 为出入口的显示编号，0表示无；
+moves_400 为路径中±400高度差的移动次数。配置字段（如 allow_400、required_r2_count）以及
+feasible、pickup_count 可作为虚拟列查询，不单独存储。
+
+用法（在项目根目录）：
+    python -m core.results_store build --output results
+    python -m core.results_store query --store results --where "allow_400==0" --where "cost>20" --top 10
+    python -m core.results_store query --store results --where "feasible==1" --group-by entry --agg mean --column cost
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from core.compact_path import CompactPath
+from core.layouts import unrank_layout
+from core.plan_table import load_profiles
+from core.shared_results import COST_UNSOLVED
+from core.sweep import LayoutSweep
+from utils.constants import (
+    EXTENDED_GRID_SIZE, EXTENDED_GREEN_POSITIONS, ALL_OUTER_POSITIONS, POSITION_HEIGHTS, POSITION_NUMBERS
+)
+
+COLUMNS = {
+    'rank': np.uint32,
+    'profile': np.uint16,
+    'cost': np.int32,
+    'steps': np.uint8,
+    'pickups': np.uint16,
+    'entry': np.uint8,
+    'exit': np.uint8,
+    'moves_400': np.uint8,
+}
+PATH_COLUMNS = {
+    'positions': np.uint8,
+    'pickup_events': np.uint8,
+}
+NO_CELL = 0
+
+# 存储格式版本：2 起包含路径列（positions、pickup_events），更早写入的meta.json没有版本字段
+STORE_FORMAT_VERSION = 2
+
+# 按扩展网格位置查表
+_IS_GREEN = np.zeros(EXTENDED_GRID_SIZE, dtype=bool)
+_IS_GREEN[EXTENDED_GREEN_POSITIONS] = True
+_IS_OUTER = np.zeros(EXTENDED_GRID_SIZE, dtype=bool)
+_IS_OUTER[ALL_OUTER_POSITIONS] = True
+_HEIGHTS = np.zeros(EXTENDED_GRID_SIZE, dtype=np.int32)
+_NUMBERS = np.zeros(EXTENDED_GRID_SIZE, dtype=np.uint8)
+_GREEN_BITS = np.zeros(EXTENDED_GRID_SIZE, dtype=np.uint16)
+for _pos in range(EXTENDED_GRID_SIZE):
+    _HEIGHTS[_pos] = POSITION_HEIGHTS.get(_pos, 0)
+    _NUMBERS[_pos] = POSITION_NUMBERS.get(_pos, NO_CELL)
+for _index, _pos in enumerate(EXTENDED_GREEN_POSITIONS):
+    _GREEN_BITS[_pos] = 1 << _index
+_POPCOUNT = np.array([bin(mask).count('1') for mask in range(1 << len(EXTENDED_GREEN_POSITIONS))], dtype=np.uint8)
+
+OPERATORS = {
+    '==': np.equal, '!=': np.not_equal, '<': np.less, '<=': np.less_equal,
+    '>': np.greater, '>=': np.greater_equal,
+    'has': lambda values, cell: (values >> (cell - 1)) & 1 == 1,  # 位掩码列含绿色格子cell
+}
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+
+def path_columns(lengths, positions, pickup_counts, pickups):
+    """
+    由共享结果数组（一个配置的若干行）向量化计算路径相关列
+    返回 {'steps', 'pickups', 'entry', 'exit', 'moves_400'}
+    """
+    n_rows, max_states = positions.shape
+    lengths = lengths.astype(np.int64)
+    steps = np.maximum(lengths - 1, 0)
+
+    mask = np.zeros(n_rows, dtype=np.uint16)
+    for k in range(pickups.shape[1] // 2):
+        picked = _GREEN_BITS[pickups[:, 2 * k + 1]]
+        mask |= np.where(k < pickup_counts, picked, 0).astype(np.uint16)
+
+    # 第j步为 positions[:, j] -> positions[:, j + 1]，仅 j < steps 有效
+    current, following = positions[:, :-1], positions[:, 1:]
+    valid = np.arange(max_states - 1) < steps[:, None]
+    moves_400 = ((np.abs(_HEIGHTS[following] - _HEIGHTS[current]) == 400) & valid).sum(axis=1)
+
+    rows = np.arange(n_rows)
+    entering = _IS_OUTER[current] & _IS_GREEN[following] & valid
+    first = entering.argmax(axis=1)
+    entry = np.where(entering.any(axis=1), _NUMBERS[current[rows, first]], NO_CELL)
+    leaving = _IS_GREEN[current] & _IS_OUTER[following] & valid
+    last = leaving.shape[1] - 1 - leaving[:, ::-1].argmax(axis=1)
+    exit_ = np.where(leaving.any(axis=1), _NUMBERS[following[rows, last]], NO_CELL)
+
+    return {'steps': steps, 'pickups': mask, 'entry': entry, 'exit': exit_, 'moves_400': moves_400}
+
+
+def write_store(directory, shared_results, profiles):
+    """把共享结果数组中已求解的行写成列存储，返回行数"""
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    parts = {name: [] for name in (*COLUMNS, *PATH_COLUMNS)}
+    for profile_index in range(len(profiles)):
+        costs = shared_results.costs[profile_index]
+        ranks = np.flatnonzero(costs != COST_UNSOLVED)
+        parts['rank'].append(ranks)
+        parts['profile'].append(np.full(len(ranks), profile_index))
+        parts['cost'].append(costs[ranks])
+        derived = path_columns(shared_results.lengths[profile_index, ranks],
+                               shared_results.positions[profile_index, ranks],
+                               shared_results.pickup_counts[profile_index, ranks],
+                               shared_results.pickups[profile_index, ranks])
+        for name, values in derived.items():
+            parts[name].append(values)
+        parts['positions'].append(shared_results.positions[profile_index, ranks])
+        parts['pickup_events'].append(shared_results.pickups[profile_index, ranks])
+
+    n_rows = 0
+    for name, dtype in {**COLUMNS, **PATH_COLUMNS}.items():
+        column = np.concatenate(parts[name]).astype(dtype)
+        np.save(os.path.join(directory, f'{name}.npy'), column)
+        n_rows = len(column)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': STORE_FORMAT_VERSION, 'rows': n_rows,
+                   'columns': list(COLUMNS) + list(PATH_COLUMNS), 'profiles': profiles}, f, ensure_ascii=False)
+    return n_rows
+
+
+class ResultsStore:
+    """只读列存储，各列以mmap方式按需载入；打开时检查格式版本与列是否齐全，不符时抛出ValueError"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        version = meta.get('version', 1)
+        if version > STORE_FORMAT_VERSION:
+            raise ValueError(f"结果存储格式版本 {version} 高于当前支持的版本 {STORE_FORMAT_VERSION}")
+        missing = [name for name in (*COLUMNS, *PATH_COLUMNS) if name not in meta.get('columns', ())]
+        if missing:
+            raise ValueError(f"结果存储缺少列 {', '.join(missing)}（格式版本 {version}，"
+                             f"当前为 {STORE_FORMAT_VERSION}），请用 build 重新生成")
+        self.rows = meta['rows']
+        self.profiles = meta['profiles']
+        self.columns = {}
+
+    def column(self, name):
+        """存储列或虚拟列的完整数组"""
+        if name in COLUMNS or name in PATH_COLUMNS:
+            if name not in self.columns:
+                self.columns[name] = np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode='r')
+            return self.columns[name]
+        if name == 'feasible':
+            return self.column('cost') >= 0
+        if name == 'pickup_count':
+            return _POPCOUNT[self.column('pickups')]
+        if self.profiles and name in self.profiles[0]:
+            # 配置字段：按配置下标查表展开
+            values = np.array([profile[name] for profile in self.profiles])
+            return values[self.column('profile')]
+        raise KeyError(f"没有列: {name}")
+
+    def query(self):
+        return Query(self)
+
+    def path(self, index):
+        """第index行的路径（CompactPath），无解为None"""
+        if self.column('cost')[index] < 0:
+            return None
+        n = int(self.column('steps')[index]) + 1
+        m = int(self.column('pickup_count')[index])
+        return CompactPath(self.column('positions')[index, :n].tobytes(),
+                           self.column('pickup_events')[index, :2 * m].tobytes())
+
+    def row(self, index):
+        """单行 -> dict，布局与出入口以显示编号表示"""
+        record = {name: int(self.column(name)[index]) for name in COLUMNS}
+        layout = unrank_layout(record['rank'])
+        record['layout'] = {kind: [POSITION_NUMBERS[p] for p in getattr(layout, kind)] for kind in ('r1', 'r2', 'f')}
+        record['pickups'] = [cell + 1 for cell in range(len(EXTENDED_GREEN_POSITIONS)) if record['pickups'] >> cell & 1]
+        if record['cost'] < 0:
+            record['cost'] = None
+        return record
+
+
+class Query:
+    """筛选条件的合取，结果为行掩码；where 返回新的Query，可链式调用"""
+
+    def __init__(self, store, mask=None):
+        self.store = store
+        self.mask = mask
+
+    def where(self, column, op, value):
+        selected = OPERATORS[op](self.store.column(column), value)
+        return Query(self.store, selected if self.mask is None else self.mask & selected)
+
+    def indices(self):
+        if self.mask is None:
+            return np.arange(self.store.rows)
+        return np.flatnonzero(self.mask)
+
+    def count(self):
+        return self.store.rows if self.mask is None else int(np.count_nonzero(self.mask))
+
+    def values(self, column):
+        values = self.store.column(column)
+        return np.asarray(values) if self.mask is None else values[self.mask]
+
+    def group_by(self, key, column=None, agg='count'):
+        """按key列分组聚合column列，返回 {key值: 聚合值}"""
+        if agg not in AGGREGATES:
+            raise ValueError(f"不支持的聚合: {agg}")
+        keys, inverse, counts = np.unique(self.values(key), return_inverse=True, return_counts=True)
+        if agg == 'count':
+            result = counts
+        else:
+            values = self.values(column).astype(np.float64)
+            if agg in ('sum', 'mean'):
+                result = np.bincount(inverse, weights=values, minlength=len(keys))
+                if agg == 'mean':
+                    result = result / counts
+            else:
+                result = np.full(len(keys), np.inf if agg == 'min' else -np.inf)
+                (np.minimum if agg == 'min' else np.maximum).at(result, inverse, values)
+        return {k.item(): v.item() for k, v in zip(keys, result)}
+
+    def top_k(self, column, k=10, largest=True):
+        """column列最大（或最小）的k行的行号，按值排序"""
+        indices = self.indices()
+        values = np.asarray(self.store.column(column)[indices], dtype=np.float64)
+        if not largest:
+            values = -values
+        k = min(k, len(indices))
+        if k == 0:
+            return indices[:0]
+        best = np.argpartition(-values, k - 1)[:k]
+        return indices[best[np.argsort(-values[best], kind='stable')]]
+
+
+def build_store(directory, profiles=None, processes=None, progress=None):
+    """扫描所有合法布局 × 配置并写出列存储，返回行数"""
+    profiles = load_profiles(None) if profiles is None else list(profiles)
+    with LayoutSweep(profiles, processes).solve_shared(progress=progress) as results:
+        return write_store(directory, results, profiles)
+
+
+_CONDITION = re.compile(r'^\s*(\w+)\s*(==|!=|<=|>=|<|>| has )\s*(-?\d+)\s*$')
+
+
+def parse_condition(text):
+    """'cost>20'、'pickups has 5' -> (列, 运算符, 值)"""
+    match = _CONDITION.match(text)
+    if not match:
+        raise ValueError(f"无法解析条件: {text}")
+    return match.group(1), match.group(2).strip(), int(match.group(3))
+
+
+def main(argv=None):
+    """命令行入口：build 扫描并写出存储，query 筛选 / 分组 / top-k"""
+    parser = argparse.ArgumentParser(description="扫描结果列存储")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="扫描所有合法布局并写出列存储")
+    build_parser.add_argument('--output', required=True)
+    build_parser.add_argument('--profiles', default=None, help="配置文件（JSON列表），默认使用查找表的默认配置集合")
+    build_parser.add_argument('--processes', type=int, default=None)
+
+    query_parser = subparsers.add_parser('query', help="查询列存储")
+    query_parser.add_argument('--store', required=True)
+    query_parser.add_argument('--where', action='append', default=[], help="条件，如 cost>20、allow_400==0、pickups has 5")
+    query_parser.add_argument('--group-by', default=None)
+    query_parser.add_argument('--agg', default='count', choices=AGGREGATES)
+    query_parser.add_argument('--column', default='cost', help="聚合或top-k所用的列")
+    query_parser.add_argument('--top', type=int, default=None, help="输出该列最大的若干行")
+    query_parser.add_argument('--smallest', action='store_true', help="top-k取最小值")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+
+        def progress(done, total):
+            print(f"\r{done}/{total}", end='', file=sys.stderr, flush=True)
+
+        rows = build_store(args.output, load_profiles(args.profiles), args.processes, progress)
+        print(f"\n已写入 {rows} 行到 {args.output} ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+        return
+
+    store = ResultsStore(args.store)
+    start = time.perf_counter()
+    query = store.query()
+    for text in args.where:
+        query = query.where(*parse_condition(text))
+    output = {'rows': query.count()}
+    if args.group_by:
+        output['groups'] = query.group_by(args.group_by, args.column, args.agg)
+    if args.top:
+        output['top'] = [store.row(i) for i in query.top_k(args.column, args.top, not args.smallest)]
+    output['time_ms'] = (time.perf_counter() - start) * 1000
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
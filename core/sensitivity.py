@@ -0,0 +1,160 @@
+"""代价参数灵敏度分析模块"""
+
+import heapq
+import numpy as np
+from core.path_planner import COST_PARAMETERS
+from utils.constants import TRUE_START_POSITION, FINAL_OUTER_TARGET
+
+
+class SensitivityAnalyzer:
+    """代价灵敏度分析器
+
+    路径总代价对代价参数是线性的：cost = features · costs。
+    对一个布局先求出所有"动作次数向量"互不支配的候选方案（数量很少），
+    之后任意代价网格上的最优代价都可由一次矩阵乘法得到，无需逐点重新搜索。
+    required_r2_count 与 allow_400 改变的是可行方案集合，分析时保持规划器当前值。
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+        self.candidates = []
+        self.features = np.zeros((0, len(COST_PARAMETERS)), dtype=np.int64)
+
+    def prepare(self, obstacles, r2_positions):
+        """为布局生成候选方案，返回候选数量"""
+        self.candidates = self.candidate_plans(obstacles, r2_positions)
+        self.features = np.array([f for f, _ in self.candidates], dtype=np.int64).reshape(-1, len(COST_PARAMETERS))
+        return len(self.candidates)
+
+    def candidate_plans(self, obstacles, r2_positions):
+        """
+        以动作次数向量为多目标的标签设定搜索
+        任何非负代价下的最优方案都不会被其他方案的次数向量严格支配，
+        因此非支配集合即完整候选集。返回 [(features_tuple, path_with_states), ...]
+        """
+        planner = self.path_planner
+        grid_size = planner.grid_size
+        required = planner.required_r2_count
+        allow_extra_when_two = (required == 2)
+        n_params = len(COST_PARAMETERS)
+        pickup_index = COST_PARAMETERS.index('pickup_cost')
+
+        # 预计算合法移动及其对应的代价参数
+        transitions = []
+        for pos in range(grid_size):
+            moves = []
+            for neighbor in planner.get_valid_neighbors(pos):
+                if planner.is_transition_allowed(pos, neighbor):
+                    moves.append((neighbor, planner.get_edge_feature(pos, neighbor)))
+            transitions.append(moves)
+
+        r2_list = sorted(r2_positions)
+        r2_bit = {pos: 1 << i for i, pos in enumerate(r2_list)}
+        blocked_static = set(obstacles) - set(r2_positions)
+
+        def add(features, index):
+            if index is None:
+                return features
+            return features[:index] + (features[index] + 1,) + features[index + 1:]
+
+        def dominated(features, frontier):
+            for other in frontier:
+                if all(a <= b for a, b in zip(other, features)):
+                    return True
+            return False
+
+        # 按次数总和出队：支配者总和严格更小，必然先出队
+        labels = []
+        settled = {}
+        solutions = []
+        pq = []
+
+        def push(features, pos, mask, parent):
+            labels.append((pos, mask, parent))
+            heapq.heappush(pq, (sum(features), features, len(labels) - 1))
+
+        push((0,) * n_params, TRUE_START_POSITION, 0, -1)
+
+        while pq:
+            _, features, label = heapq.heappop(pq)
+            pos, mask, _ = labels[label]
+            frontier = settled.setdefault(mask * grid_size + pos, [])
+            if dominated(features, frontier) or dominated(features, (f for f, _ in solutions)):
+                continue
+            frontier.append(features)
+
+            collected_cnt = bin(mask).count('1')
+            meets_requirement = (collected_cnt >= required) if allow_extra_when_two else (collected_cnt == required)
+            if pos == FINAL_OUTER_TARGET and meets_requirement:
+                solutions.append((features, label))
+                continue
+
+            if collected_cnt < required or allow_extra_when_two:
+                for neighbor in planner.get_valid_neighbors(pos):
+                    bit = r2_bit.get(neighbor)
+                    if bit is not None and not mask & bit:
+                        push(add(features, pickup_index), pos, mask | bit, label)
+
+            for neighbor, index in transitions[pos]:
+                if neighbor in blocked_static:
+                    continue
+                bit = r2_bit.get(neighbor)
+                if bit is not None and not mask & bit:
+                    continue
+                push(add(features, index), neighbor, mask, label)
+
+        candidates = []
+        for features, label in solutions:
+            path = []
+            while label != -1:
+                pos, mask, label = labels[label]
+                path.append((pos, frozenset(p for i, p in enumerate(r2_list) if mask >> i & 1)))
+            candidates.append((features, path[::-1]))
+        # 固定顺序，保证并列时argmin选出的方案稳定
+        candidates.sort(key=lambda item: item[0])
+        return candidates
+
+    def evaluate(self, cost_matrix):
+        """
+        对代价矩阵(G×6)的每一行求最优代价和最优方案下标
+        返回 (optimal_costs, plan_indices)；无候选方案时返回 (None, None)
+        """
+        if not self.candidates:
+            return None, None
+        totals = np.asarray(cost_matrix, dtype=np.int64) @ self.features.T
+        plan_indices = np.argmin(totals, axis=1)
+        return totals[np.arange(len(totals)), plan_indices], plan_indices
+
+    def parameter_sweep(self, parameter, values, base_costs=None):
+        """
+        单参数扫描：其他参数固定为base_costs（默认取规划器当前代价）
+        返回 {'values', 'costs', 'plans', 'breakpoints'}，breakpoints为 [(value, old_plan, new_plan), ...]
+        """
+        values = np.asarray(values)
+        if base_costs is None:
+            base_costs = self.path_planner.get_cost_vector()
+        cost_matrix = np.tile(np.asarray(base_costs, dtype=np.int64), (len(values), 1))
+        cost_matrix[:, COST_PARAMETERS.index(parameter)] = values
+
+        costs, plans = self.evaluate(cost_matrix)
+        breakpoints = []
+        if plans is not None:
+            changes = np.flatnonzero(plans[1:] != plans[:-1]) + 1
+            breakpoints = [(values[i].item(), int(plans[i - 1]), int(plans[i])) for i in changes]
+        return {'values': values, 'costs': costs, 'plans': plans, 'breakpoints': breakpoints}
+
+    def grid_sweep(self, parameter_values, base_costs=None):
+        """
+        多参数网格：parameter_values为 {参数名: 取值序列}，其余参数固定为base_costs
+        返回 (网格代价矩阵, optimal_costs, plan_indices)，结果按网格展开为一维
+        """
+        if base_costs is None:
+            base_costs = self.path_planner.get_cost_vector()
+        names = list(parameter_values)
+        mesh = np.meshgrid(*[np.asarray(parameter_values[name]) for name in names], indexing='ij')
+        cost_matrix = np.tile(np.asarray(base_costs, dtype=np.int64), (mesh[0].size if mesh else 1, 1))
+        for name, axis_values in zip(names, mesh):
+            cost_matrix[:, COST_PARAMETERS.index(name)] = axis_values.ravel()
+
+        costs, plans = self.evaluate(cost_matrix)
+        return cost_matrix, costs, plans
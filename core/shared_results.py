@@ -0,0 +1,106 @@
+"""共享内存结果模块 - 扫描结果按 [配置下标, 布局编号] 存放在预分配的共享内存NumPy数组中"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.compact_path import CompactPath
+from utils.constants import MAX_R2_COUNT
+
+COST_NO_PATH = -1
+COST_UNSOLVED = -2
+DEFAULT_MAX_STATES = 48
+
+
+class SharedResults:
+    """
+    扫描结果数组，全部位于同一块共享内存：
+        costs          int32 [配置, 布局]        最优代价，COST_NO_PATH 无解，COST_UNSOLVED 未求解
+        lengths        uint8 [配置, 布局]        路径状态数
+        positions      uint8 [配置, 布局, 状态]  CompactPath.positions
+        pickup_counts  uint8 [配置, 布局]        拾取事件数
+        pickups        uint8 [配置, 布局, 2×R2]  CompactPath.pickups
+    工作进程按 spec 连接后直接写入，主进程读取时不经过pickle
+    """
+
+    def __init__(self, shm, n_profiles, n_layouts, max_states, owner):
+        self.shm = shm
+        self.n_profiles = n_profiles
+        self.n_layouts = n_layouts
+        self.max_states = max_states
+        self.owner = owner
+        shape = (n_profiles, n_layouts)
+        offset = 0
+        self.arrays = {}
+        for name, dtype, extra in (('costs', np.int32, ()), ('lengths', np.uint8, ()),
+                                   ('positions', np.uint8, (max_states,)), ('pickup_counts', np.uint8, ()),
+                                   ('pickups', np.uint8, (2 * MAX_R2_COUNT,))):
+            array = np.ndarray(shape + extra, dtype=dtype, buffer=shm.buf, offset=offset)
+            self.arrays[name] = array
+            setattr(self, name, array)
+            offset += array.nbytes
+
+    @staticmethod
+    def nbytes(n_profiles, n_layouts, max_states=DEFAULT_MAX_STATES):
+        return n_profiles * n_layouts * (4 + 1 + max_states + 1 + 2 * MAX_R2_COUNT)
+
+    @classmethod
+    def create(cls, n_profiles, n_layouts, max_states=DEFAULT_MAX_STATES):
+        """分配共享内存，代价初始化为COST_UNSOLVED"""
+        shm = shared_memory.SharedMemory(create=True, size=max(1, cls.nbytes(n_profiles, n_layouts, max_states)))
+        results = cls(shm, n_profiles, n_layouts, max_states, owner=True)
+        results.costs.fill(COST_UNSOLVED)
+        return results
+
+    @classmethod
+    def attach(cls, spec):
+        """工作进程按 spec 连接已有的共享内存"""
+        name, n_profiles, n_layouts, max_states = spec
+        return cls(shared_memory.SharedMemory(name=name), n_profiles, n_layouts, max_states, owner=False)
+
+    @property
+    def spec(self):
+        return self.shm.name, self.n_profiles, self.n_layouts, self.max_states
+
+    def write(self, profile_index, ranks, cost, path):
+        """写入一组等价布局共享的结果（path为CompactPath或None）"""
+        if path is None:
+            self.costs[profile_index, ranks] = COST_NO_PATH
+            self.lengths[profile_index, ranks] = 0
+            self.pickup_counts[profile_index, ranks] = 0
+            return
+        n = len(path.positions)
+        if n > self.max_states:
+            raise ValueError(f"路径状态数 {n} 超过共享结果数组上限 {self.max_states}")
+        self.positions[profile_index, ranks, :n] = np.frombuffer(path.positions, dtype=np.uint8)
+        self.pickups[profile_index, ranks, :len(path.pickups)] = np.frombuffer(path.pickups, dtype=np.uint8)
+        self.lengths[profile_index, ranks] = n
+        self.pickup_counts[profile_index, ranks] = len(path.pickups) // 2
+        self.costs[profile_index, ranks] = cost
+
+    def read(self, profile_index, rank):
+        """返回 (代价, CompactPath)，无解为 (None, None)"""
+        cost = int(self.costs[profile_index, rank])
+        if cost == COST_UNSOLVED:
+            raise KeyError(f"配置 {profile_index} 下布局 {rank} 尚未求解")
+        if cost == COST_NO_PATH:
+            return None, None
+        n = self.lengths[profile_index, rank]
+        m = self.pickup_counts[profile_index, rank]
+        return cost, CompactPath(self.positions[profile_index, rank, :n].tobytes(),
+                                 self.pickups[profile_index, rank, :2 * m].tobytes())
+
+    def close(self):
+        """释放数组视图并断开共享内存；创建者同时删除共享内存"""
+        for name in self.arrays:
+            setattr(self, name, None)
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
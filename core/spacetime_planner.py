@@ -0,0 +1,229 @@
+"""
+时空路径规划模块 - 其他机器人按 (格子, 时间区间) 预约占用格子，用安全区间路径规划(SIPP)避让
+
+时间单位与代价相同（代价即动作耗时），路径总代价 = 到达外圈22的时刻，含等待时间。
+
+用法（在项目根目录；格子用显示编号，预约写作 编号:开始-结束，结束省略表示一直占用）：
+    python -m core.spacetime_planner --r1 4,6,12 --r2 1,5,8,9 --f 10 --reserve 15:0-6 --reserve 23:10-14
+"""
+
+import argparse
+import bisect
+import heapq
+import math
+
+from core.anytime_planner import AnytimePlanner
+from core.exact_planners import CollectionModel
+from core.layouts import Layout
+from core.path_planner import PathPlanner
+from utils.constants import TRUE_START_POSITION, FINAL_OUTER_TARGET, POSITION_NUMBERS, get_extended_position
+
+DISPLAY_POSITIONS = {number: pos for pos, number in POSITION_NUMBERS.items()}
+
+
+class ReservationTable:
+    """
+    动态障碍：格子 -> 按开始时刻排序、互不重叠的占用区间 [开始, 结束)，结束可为inf
+    只记录格子占用；对向交换位置的冲突应在两格上都预约交换所需的时间段
+    """
+
+    def __init__(self):
+        self.reserved = {}
+
+    def reserve(self, cell, start, end=math.inf):
+        """预约占用 [start, end)，与已有区间重叠或相接时合并"""
+        if end <= start:
+            return
+        intervals = self.reserved.setdefault(cell, [])
+        merged = []
+        for s, e in intervals:
+            if e < start or s > end:
+                merged.append((s, e))
+            else:
+                start, end = min(s, start), max(e, end)
+        bisect.insort(merged, (start, end))
+        self.reserved[cell] = merged
+
+    def reserve_plan(self, plan, margin=0):
+        """
+        预约另一台机器人的时空路径（SpaceTimePlan）：每个状态占用所在格子到下一状态到达为止，
+        瞬时移动至少占用1个时间单位；margin 为前后额外预留的安全时间；终点格子之后不再占用
+        """
+        times = plan.times + [plan.times[-1] + 1]
+        for (pos, _), arrive, leave in zip(plan.path, times, times[1:]):
+            self.reserve(pos, max(0, arrive - margin), max(leave, arrive + 1) + margin)
+
+    def is_free(self, cell, time):
+        return not any(s <= time < e for s, e in self.reserved.get(cell, ()))
+
+    def safe_intervals(self, cell):
+        """格子的安全（未被预约）区间列表 [(开始, 结束)]，按时间排序"""
+        intervals = []
+        start = 0
+        for s, e in self.reserved.get(cell, ()):
+            if s > start:
+                intervals.append((start, s))
+            start = max(start, e)
+        if start < math.inf:
+            intervals.append((start, math.inf))
+        return intervals
+
+
+class SpaceTimePlan:
+    """时空路径：path 与 path_with_states 格式相同，times[i] 为到达第i个状态的时刻（等待不单列状态）"""
+
+    def __init__(self, path, times):
+        self.path = path
+        self.times = times
+
+    @property
+    def arrival(self):
+        """到达外圈22的时刻"""
+        return self.times[-1]
+
+    def departures(self, planner):
+        """离开每个状态的时刻（= 到达下一状态的时刻 - 动作耗时），末状态为到达时刻"""
+        departures = []
+        for (pos, _), (next_pos, _), next_time in zip(self.path, self.path[1:], self.times[1:]):
+            duration = planner.pickup_cost if pos == next_pos else planner.get_edge_cost(pos, next_pos)
+            departures.append(next_time - duration)
+        return departures + [self.times[-1]]
+
+    def wait_time(self, planner):
+        """总等待时间：到达时刻 - 动作耗时之和"""
+        return self.arrival - planner.calculate_path_cost_with_collection(self.path)
+
+
+class SpaceTimePlanner:
+    """
+    SIPP：状态为 (安全区间, 收集掩码)，区间在全部格子上统一编号后与掩码打包为一个整数，
+    每个状态只保留最早到达时刻；等待不产生新状态，而是在移动时取目标区间内最早可达的时刻。
+    没有预约时与 dijkstra_with_collection 的最优代价一致
+    """
+
+    def __init__(self, path_planner):
+        self.path_planner = path_planner
+
+    def plan(self, obstacles, r2_positions, reservations=None, start_time=0):
+        """返回 SpaceTimePlan，无可行路径时返回None"""
+        planner = self.path_planner
+        model = CollectionModel(planner, obstacles, r2_positions)
+        grid_size = model.grid_size
+        move_h = AnytimePlanner(planner).build_heuristic(model.transitions)
+        reservations = reservations if reservations is not None else ReservationTable()
+
+        # 区间编号：cell_intervals[位置] = [(编号, 开始, 结束)]
+        cell_intervals = []
+        interval_cell = []
+        for pos in range(grid_size):
+            entries = []
+            for start, end in reservations.safe_intervals(pos):
+                entries.append((len(interval_cell), start, end))
+                interval_cell.append((pos, end))
+            cell_intervals.append(entries)
+        n_intervals = len(interval_cell)
+
+        def heuristic(pos, mask):
+            return move_h[pos] + max(0, model.required - model.popcount[mask]) * model.pickup_cost
+
+        start_interval = next((i for i, s, e in cell_intervals[TRUE_START_POSITION] if s <= start_time < e), None)
+        if start_interval is None or move_h[TRUE_START_POSITION] == math.inf:
+            return None
+        start = start_interval
+        arrival = {start: start_time}
+        parent = {start: None}
+        pq = [(start_time + heuristic(TRUE_START_POSITION, 0), start_time, start)]
+
+        while pq:
+            _, time, state = heapq.heappop(pq)
+            if time > arrival[state]:
+                continue
+            mask, interval = divmod(state, n_intervals)
+            pos, interval_end = interval_cell[interval]
+            if pos == FINAL_OUTER_TARGET and model.meets_requirement(mask):
+                return self.reconstruct(state, parent, arrival, n_intervals, interval_cell, model)
+
+            successors = []
+            # 原地拾取：拾取期间一直占用当前格子
+            if model.can_pickup(mask):
+                finish = time + model.pickup_cost
+                if finish < interval_end:
+                    for bit in model.pickups_at[pos]:
+                        if not mask & bit:
+                            successors.append(((mask | bit) * n_intervals + interval, finish))
+            # 移动：移动途中一直占用出发格子直到到达（与 reserve_plan 一致），
+            # 因此当前安全区间须覆盖到到达时刻，到达时刻落在目标格子的某个安全区间内
+            for neighbor, duration in model.transitions[pos]:
+                if not model.is_free(neighbor, mask):
+                    continue
+                for next_interval, s, e in cell_intervals[neighbor]:
+                    if s > interval_end:
+                        break
+                    arrive = max(time + duration, s)
+                    if arrive < e and arrive <= interval_end:
+                        successors.append((mask * n_intervals + next_interval, arrive))
+
+            for successor, new_time in successors:
+                if new_time < arrival.get(successor, math.inf):
+                    arrival[successor] = new_time
+                    parent[successor] = state
+                    next_mask, next_interval = divmod(successor, n_intervals)
+                    h = heuristic(interval_cell[next_interval][0], next_mask)
+                    if h < math.inf:
+                        heapq.heappush(pq, (new_time + h, new_time, successor))
+        return None
+
+    def reconstruct(self, state, parent, arrival, n_intervals, interval_cell, model):
+        states = []
+        while state is not None:
+            states.append(state)
+            state = parent[state]
+        states.reverse()
+        grid_size = model.grid_size
+        packed = [divmod(s, n_intervals)[0] * grid_size + interval_cell[divmod(s, n_intervals)[1]][0]
+                  for s in states]
+        return SpaceTimePlan(model.to_path(packed), [arrival[s] for s in states])
+
+
+def _parse_reservation(text):
+    """'15:3-8' -> (位置, 3, 8)，'15:3-' 或 '15:3' 表示一直占用"""
+    cell, _, span = text.partition(':')
+    start, _, end = span.partition('-')
+    return DISPLAY_POSITIONS[int(cell)], int(start or 0), int(end) if end else math.inf
+
+
+def main(argv=None):
+    """命令行入口：在给定预约下求解单个布局"""
+    parser = argparse.ArgumentParser(description="时空路径规划（SIPP）")
+    parser.add_argument('--r1', required=True, help="绿色格子编号1-12，逗号分隔")
+    parser.add_argument('--r2', required=True)
+    parser.add_argument('--f', required=True)
+    parser.add_argument('--reserve', action='append', default=[], help="预约 格子显示编号:开始-结束，可重复")
+    parser.add_argument('--required', type=int, default=None)
+    parser.add_argument('--only-200', action='store_true')
+    args = parser.parse_args(argv)
+
+    planner = PathPlanner()
+    if args.required is not None:
+        planner.required_r2_count = args.required
+    if args.only_200:
+        planner.set_r2_config(False)
+    cells = [[get_extended_position(int(n) - 1) for n in text.split(',') if n.strip()]
+             for text in (args.r1, args.r2, args.f)]
+    layout = Layout(*cells)
+    reservations = ReservationTable()
+    for text in args.reserve:
+        reservations.reserve(*_parse_reservation(text))
+
+    plan = SpaceTimePlanner(planner).plan(layout.get_obstacles(), layout.get_r2_positions(), reservations)
+    if plan is None:
+        print("无可行路径")
+        return
+    departures = plan.departures(planner)
+    steps = [f"{POSITION_NUMBERS.get(pos, pos)}@{arrive}" + (f"(等待至{leave})" if leave > arrive else "")
+             for (pos, _), arrive, leave in zip(plan.path, plan.times, departures)]
+    print(f"到达时刻: {plan.arrival}（等待 {plan.wait_time(planner)}）\n路径: {' → '.join(steps)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""批量求解模块 - 按布局编号区间 × 求解配置并行求解"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from core.compact_path import as_compact
+from core.layouts import count_layouts, unrank_layout, group_equivalent
+from core.path_planner import PathPlanner
+from core.shared_results import SharedResults
+from core.sweep_journal import SweepJournal, sweep_fingerprint
+
+
+_worker_planner = None
+_worker_results = None
+
+
+def _init_worker():
+    """工作进程初始化：每个进程只创建一次规划器"""
+    global _worker_planner
+    _worker_planner = PathPlanner()
+
+
+def solve_unit(profile, ranks):
+    """求解一个工作单元：配置profile下给定编号的布局，返回CompactPath列表（无解为None）"""
+    if _worker_planner is None:
+        _init_worker()
+    planner = _worker_planner
+    planner.apply_profile(profile)
+    results = []
+    for rank in ranks:
+        layout = unrank_layout(rank)
+        results.append(as_compact(planner.plan(layout.get_obstacles(), layout.get_r2_positions())))
+    return results
+
+
+def write_unit(shared, profile_index, profile, groups):
+    """求解一个工作单元并把结果写入结果数组shared（组内每个编号各写一份），返回求解的组数"""
+    results = solve_unit(profile, [group[0] for group in groups])
+    planner = _worker_planner
+    for group, path in zip(groups, results):
+        cost = None if path is None else planner.calculate_path_cost_with_collection(path)
+        shared.write(profile_index, group, cost, path)
+    return len(groups)
+
+
+def solve_unit_shared(spec, profile_index, profile, groups):
+    """
+    工作进程入口：按spec连接共享结果数组后调用 write_unit
+    共享内存在每个工作进程中只连接一次，随进程退出释放
+    """
+    global _worker_results
+    if _worker_results is None or _worker_results.spec != spec:
+        _worker_results = SharedResults.attach(spec)
+    return write_unit(_worker_results, profile_index, profile, groups)
+
+
+class LayoutSweep:
+    """
+    布局扫描：工作单元为 (配置下标, 起始组下标, 结束组下标)
+    dedup 时先按规范布局键把编号区间内的布局分组，每组只求解代表布局，结果由组内所有编号共享
+    """
+
+    def __init__(self, profiles, processes=None, chunk_size=500, dedup=True):
+        self.profiles = list(profiles)
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self.dedup = dedup
+        self.groups = []
+        self.rank_range = (0, 0)
+        self.resumed_units = 0
+
+    def plan_groups(self, start=0, stop=None):
+        """建立编号区间[start, stop)的等价组"""
+        stop = count_layouts() if stop is None else min(stop, count_layouts())
+        self.rank_range = (start, stop)
+        if self.dedup:
+            self.groups = group_equivalent(range(start, stop))
+        else:
+            self.groups = [[rank] for rank in range(start, stop)]
+        return self.groups
+
+    @property
+    def layout_count(self):
+        return sum(len(group) for group in self.groups)
+
+    @property
+    def dedup_ratio(self):
+        """因等价而跳过的求解比例"""
+        total = self.layout_count
+        return 1 - len(self.groups) / total if total else 0.0
+
+    def iter_units(self):
+        """生成所有工作单元"""
+        for profile_index in range(len(self.profiles)):
+            for unit_start in range(0, len(self.groups), self.chunk_size):
+                yield profile_index, unit_start, min(unit_start + self.chunk_size, len(self.groups))
+
+    def unit_ranks(self, unit_start, unit_stop):
+        """工作单元内各组的代表编号"""
+        return [group[0] for group in self.groups[unit_start:unit_stop]]
+
+    def fingerprint(self):
+        """当前编号区间与配置的摘要，用于校验扫描日志"""
+        return sweep_fingerprint(self.profiles, *self.rank_range, self.chunk_size, self.dedup)
+
+    def run(self, start=0, stop=None, journal=None):
+        """
+        并行求解，按完成顺序生成 (profile_index, groups, results)
+        results[i] 为 groups[i] 中所有编号共享的解；在途工作单元数量有上限，结果边产生边交给调用方处理
+        给出journal路径时，先流式重放日志中已完成的单元，再只求解其余单元并逐个追加到日志
+        """
+        self.plan_groups(start, stop)
+        self.resumed_units = 0
+        if journal is None:
+            for profile_index, unit_start, unit_stop, results in self.solve_units(self.iter_units()):
+                yield profile_index, self.groups[unit_start:unit_stop], results
+            return
+
+        with SweepJournal(journal, self.fingerprint()) as log:
+            self.resumed_units = len(log.completed)
+            for profile_index, unit_start, unit_stop, results in log.replay():
+                yield profile_index, self.groups[unit_start:unit_stop], results
+            units = (unit for unit in self.iter_units() if unit[:2] not in log.completed)
+            for profile_index, unit_start, unit_stop, results in self.solve_units(units):
+                # 先落盘再交给调用方，调用方处理时中断也不会丢失该单元
+                log.append(profile_index, unit_start, unit_stop, results)
+                yield profile_index, self.groups[unit_start:unit_stop], results
+
+    def solve_units(self, units):
+        """求解给定工作单元，按完成顺序生成 (profile_index, unit_start, unit_stop, results)"""
+        if self.processes == 1:
+            for profile_index, unit_start, unit_stop in units:
+                yield (profile_index, unit_start, unit_stop,
+                       solve_unit(self.profiles[profile_index], self.unit_ranks(unit_start, unit_stop)))
+            return
+
+        with ProcessPoolExecutor(self.processes, initializer=_init_worker) as pool:
+            max_pending = 2 * (self.processes or os.cpu_count() or 1)
+            pending = {}
+            while True:
+                for profile_index, unit_start, unit_stop in units:
+                    future = pool.submit(solve_unit, self.profiles[profile_index],
+                                         self.unit_ranks(unit_start, unit_stop))
+                    pending[future] = (profile_index, unit_start, unit_stop)
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future) + (future.result(),)
+
+    def solve_shared(self, start=0, stop=None, progress=None):
+        """
+        求解编号区间[start, stop)并返回 SharedResults（下标为 [配置下标, 编号]，调用方负责close）
+        工作进程直接写共享内存，进程间只传递编号和组数，开销不随路径长度增长
+        progress(已完成布局数, 总布局数) 在每个工作单元完成后调用
+        """
+        self.plan_groups(start, stop)
+        results = SharedResults.create(len(self.profiles), count_layouts())
+        total = self.layout_count * len(self.profiles)
+        done = 0
+        try:
+            if self.processes == 1:
+                # 单进程直接写入本进程创建的数组，不再另行连接共享内存
+                for profile_index, unit_start, unit_stop in self.iter_units():
+                    groups = self.groups[unit_start:unit_stop]
+                    write_unit(results, profile_index, self.profiles[profile_index], groups)
+                    done += sum(len(group) for group in groups)
+                    if progress:
+                        progress(done, total)
+                return results
+
+            with ProcessPoolExecutor(self.processes, initializer=_init_worker) as pool:
+                max_pending = 2 * (self.processes or os.cpu_count() or 1)
+                units = self.iter_units()
+                pending = {}
+                while True:
+                    for profile_index, unit_start, unit_stop in units:
+                        groups = self.groups[unit_start:unit_stop]
+                        future = pool.submit(solve_unit_shared, results.spec, profile_index,
+                                             self.profiles[profile_index], groups)
+                        pending[future] = sum(len(group) for group in groups)
+                        if len(pending) >= max_pending:
+                            break
+                    if not pending:
+                        break
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        future.result()
+                        done += pending.pop(future)
+                        if progress:
+                            progress(done, total)
+            return results
+        except BaseException:
+            results.close()
+            raise
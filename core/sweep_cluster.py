@@ -0,0 +1,357 @@
+"""
+分布式扫描模块 - 协调者通过TCP把工作单元分发给各节点上的工作者，结果流式传回
+
+协议（每行一个JSON对象）：
+    工作者 -> 协调者  {"op": "hello", "name": "host-1234"}
+                      {"op": "heartbeat"}
+                      {"op": "result", "profile": 0, "start": 0, "stop": 500, "results": "<base64>"}
+    协调者 -> 工作者  {"op": "setup", "profiles": [...]}
+                      {"op": "unit", "profile": 0, "start": 0, "stop": 500, "ranks": [...]}
+                      {"op": "done"}
+工作单元为 (配置下标, 起始组下标, 结束组下标)，ranks 为单元内各等价组的代表布局编号；
+results 为 sweep_journal.encode_results 的base64编码。工作者断线或心跳超时时，
+其未完成的单元重新排队；重复到达的结果直接丢弃。
+
+用法（在项目根目录）：
+    python -m core.sweep_cluster coordinator --host 0.0.0.0 --port 8766 --journal sweep.journal
+    python -m core.sweep_cluster worker --host 192.168.1.10 --port 8766
+    python -m core.sweep_cluster local --workers 4 --kill-worker-after 5
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+
+from core.path_planner import PathPlanner
+from core.plan_table import load_profiles
+from core.sweep import LayoutSweep, solve_unit
+from core.sweep_journal import SweepJournal, encode_results, decode_results
+
+MAX_LINE_BYTES = 16 * 1024 * 1024
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 5.0
+DEFAULT_PREFETCH = 2
+
+
+class WorkerState:
+    """协调者一侧的工作者连接状态"""
+
+    def __init__(self, name, writer):
+        self.name = name
+        self.writer = writer
+        self.last_seen = time.monotonic()
+        self.units = set()
+        self.completed = 0
+
+    def send(self, message):
+        self.writer.write(json.dumps(message).encode('utf-8') + b'\n')
+
+
+class SweepCoordinator:
+    """
+    扫描协调者：工作单元与等价分组沿用 LayoutSweep，每个工作者最多同时持有prefetch个单元
+    结果先写入扫描日志（若给出）再交给调用方，协调者中断后以相同参数重启可续跑
+    """
+
+    def __init__(self, sweep, heartbeat_timeout=HEARTBEAT_TIMEOUT, prefetch=DEFAULT_PREFETCH):
+        self.sweep = sweep
+        self.heartbeat_timeout = heartbeat_timeout
+        self.prefetch = prefetch
+        self.pending = deque()
+        self.done = set()
+        self.unit_count = 0
+        self.workers = set()
+        self.connections = set()
+        self.results = asyncio.Queue()
+        self.journal = None
+        self.server = None
+        self.watchdog = None
+        self.stats = dict.fromkeys(('workers', 'requeued', 'duplicates', 'resumed'), 0)
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def start(self, host='127.0.0.1', port=8766, start=0, stop=None, journal=None):
+        """建立工作单元队列并开始监听"""
+        self.sweep.plan_groups(start, stop)
+        units = list(self.sweep.iter_units())
+        self.unit_count = len(units)
+        if journal is not None:
+            self.journal = SweepJournal(journal, self.sweep.fingerprint())
+            self.journal.open()
+            self.done = set(self.journal.completed)
+            self.stats['resumed'] = len(self.done)
+        self.pending.extend(unit for unit in units if unit[:2] not in self.done)
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+        self.watchdog = asyncio.create_task(self.check_heartbeats())
+
+    async def stop(self):
+        """通知工作者结束并关闭监听与日志"""
+        for worker in list(self.workers):
+            worker.send({'op': 'done'})
+            worker.writer.close()
+        self.watchdog.cancel()
+        self.server.close()
+        if self.connections:
+            await asyncio.wait(self.connections, timeout=5)
+        await self.server.wait_closed()
+        if self.journal is not None:
+            self.journal.close()
+
+    async def iter_results(self):
+        """先流式重放日志中已完成的单元，再按到达顺序生成新结果 (profile_index, groups, results)"""
+        groups = self.sweep.groups
+        if self.journal is not None:
+            for profile_index, unit_start, unit_stop, results in self.journal.replay():
+                yield profile_index, groups[unit_start:unit_stop], results
+        while len(self.done) < self.unit_count or not self.results.empty():
+            profile_index, unit_start, unit_stop, results = await self.results.get()
+            yield profile_index, groups[unit_start:unit_stop], results
+
+    def dispatch(self, worker):
+        """给工作者补足在途单元"""
+        while len(worker.units) < self.prefetch and self.pending:
+            unit = self.pending.popleft()
+            if unit[:2] in self.done:
+                continue
+            profile_index, unit_start, unit_stop = unit
+            worker.units.add(unit)
+            worker.send({'op': 'unit', 'profile': profile_index, 'start': unit_start, 'stop': unit_stop,
+                         'ranks': self.sweep.unit_ranks(unit_start, unit_stop)})
+
+    def requeue(self, worker):
+        """工作者失联：未完成单元放回队首，并分给其余工作者"""
+        units = [unit for unit in worker.units if unit[:2] not in self.done]
+        worker.units.clear()
+        self.pending.extendleft(sorted(units, reverse=True))
+        self.stats['requeued'] += len(units)
+        for other in self.workers:
+            self.dispatch(other)
+
+    def complete(self, worker, message):
+        unit = (message['profile'], message['start'], message['stop'])
+        worker.units.discard(unit)
+        if unit[:2] in self.done:
+            # 单元被重新排队后原工作者又交回了结果
+            self.stats['duplicates'] += 1
+            return
+        results = decode_results(base64.b64decode(message['results']))
+        if self.journal is not None:
+            self.journal.append(*unit, results)
+        self.done.add(unit[:2])
+        worker.completed += 1
+        self.results.put_nowait(unit + (results,))
+
+    async def check_heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 2)
+            now = time.monotonic()
+            for worker in list(self.workers):
+                if now - worker.last_seen > self.heartbeat_timeout:
+                    # 关闭连接后由 handle_connection 负责重新排队
+                    print(f"工作者 {worker.name} 心跳超时", file=sys.stderr)
+                    worker.writer.transport.abort()
+
+    async def handle_connection(self, reader, writer):
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        worker = None
+        try:
+            hello = json.loads(await reader.readline() or b'{}')
+            if hello.get('op') != 'hello':
+                return
+            worker = WorkerState(hello.get('name') or str(writer.get_extra_info('peername')), writer)
+            self.workers.add(worker)
+            self.stats['workers'] += 1
+            worker.send({'op': 'setup', 'profiles': self.sweep.profiles})
+            self.dispatch(worker)
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                worker.last_seen = time.monotonic()
+                message = json.loads(line)
+                if message.get('op') == 'result':
+                    self.complete(worker, message)
+                    self.dispatch(worker)
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            if worker is not None:
+                self.workers.discard(worker)
+                self.requeue(worker)
+            writer.close()
+            self.connections.discard(connection)
+
+
+async def run_worker(host='127.0.0.1', port=8766, name=None, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """
+    工作者：收到的单元依次在线程中求解（事件循环保持心跳），返回完成的单元数
+    协调者发送done或断开连接时结束
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+    write_lock = asyncio.Lock()
+    units = asyncio.Queue()
+    profiles = []
+    completed = 0
+
+    async def send(message):
+        async with write_lock:
+            writer.write(json.dumps(message).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(heartbeat_interval)
+            await send({'op': 'heartbeat'})
+
+    async def solve():
+        nonlocal completed
+        while True:
+            message = await units.get()
+            results = await asyncio.to_thread(solve_unit, profiles[message['profile']], message['ranks'])
+            await send({'op': 'result', 'profile': message['profile'], 'start': message['start'],
+                        'stop': message['stop'], 'results': base64.b64encode(encode_results(results)).decode()})
+            completed += 1
+
+    await send({'op': 'hello', 'name': name or f"{socket.gethostname()}-{os.getpid()}"})
+    tasks = [asyncio.create_task(heartbeat()), asyncio.create_task(solve())]
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message['op'] == 'setup':
+                profiles[:] = message['profiles']
+            elif message['op'] == 'unit':
+                units.put_nowait(message)
+            elif message['op'] == 'done':
+                break
+    except ConnectionError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+    return completed
+
+
+class SweepSummary:
+    """按配置汇总扫描结果：布局数、有解数、平均代价"""
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.planner = PathPlanner()
+        self.layouts = [0] * len(profiles)
+        self.feasible = [0] * len(profiles)
+        self.cost_sum = [0] * len(profiles)
+
+    def add(self, profile_index, groups, results):
+        self.planner.apply_profile(self.profiles[profile_index])
+        for group, path in zip(groups, results):
+            self.layouts[profile_index] += len(group)
+            if path is not None:
+                self.feasible[profile_index] += len(group)
+                self.cost_sum[profile_index] += len(group) * self.planner.calculate_path_cost_with_collection(path)
+
+    def snapshot(self):
+        return [{'profile': profile, 'layouts': layouts, 'feasible': feasible,
+                 'mean_cost': cost_sum / feasible if feasible else None}
+                for profile, layouts, feasible, cost_sum
+                in zip(self.profiles, self.layouts, self.feasible, self.cost_sum)]
+
+
+def _spawn_worker(port):
+    return subprocess.Popen([sys.executable, '-m', 'core.sweep_cluster', 'worker', '--port', str(port)],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def _coordinate(args):
+    profiles = load_profiles(args.profiles)
+    sweep = LayoutSweep(profiles, chunk_size=args.chunk_size)
+    coordinator = SweepCoordinator(sweep, args.heartbeat_timeout)
+    host = '127.0.0.1' if args.command == 'local' else args.host
+    await coordinator.start(host, 0 if args.command == 'local' else args.port, args.start, args.stop, args.journal)
+    print(f"协调者已启动: {host}:{coordinator.port}，{coordinator.unit_count} 个工作单元"
+          f"（已完成 {coordinator.stats['resumed']}）", file=sys.stderr)
+
+    workers = []
+    killer = None
+    if args.command == 'local':
+        workers = [_spawn_worker(coordinator.port) for _ in range(args.workers)]
+        if args.kill_worker_after is not None:
+            # 模拟节点宕机：强制结束第一个工作者，其单元应被重新排队
+            killer = asyncio.get_running_loop().call_later(
+                args.kill_worker_after, lambda: workers[0].send_signal(signal.SIGKILL))
+
+    summary = SweepSummary(profiles)
+    start = time.perf_counter()
+    units = 0
+    try:
+        async for profile_index, groups, results in coordinator.iter_results():
+            summary.add(profile_index, groups, results)
+            units += 1
+            print(f"\r{units}/{coordinator.unit_count}", end='', file=sys.stderr, flush=True)
+    finally:
+        if killer is not None:
+            killer.cancel()
+        await coordinator.stop()
+        for process in workers:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    print(file=sys.stderr)
+    print(json.dumps({'units': coordinator.unit_count, 'elapsed': time.perf_counter() - start,
+                      'dedup_ratio': sweep.dedup_ratio, **coordinator.stats,
+                      'profiles': summary.snapshot()}, ensure_ascii=False, indent=2))
+
+
+def main(argv=None):
+    """命令行入口：coordinator 分发扫描，worker 连接协调者求解，local 在本机启动协调者与多个工作者进程"""
+    parser = argparse.ArgumentParser(description="分布式布局扫描")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name in ('coordinator', 'worker', 'local'):
+        sub = subparsers.add_parser(name)
+        if name != 'local':
+            sub.add_argument('--host', default='127.0.0.1')
+            sub.add_argument('--port', type=int, default=8766)
+        if name != 'worker':
+            sub.add_argument('--profiles', default=None, help="配置文件（JSON列表），默认使用查找表的默认配置集合")
+            sub.add_argument('--start', type=int, default=0, help="布局编号区间起点")
+            sub.add_argument('--stop', type=int, default=None, help="布局编号区间终点（不含）")
+            sub.add_argument('--chunk-size', type=int, default=500, help="每个工作单元的等价组数")
+            sub.add_argument('--journal', default=None, help="扫描日志路径，协调者重启后可续跑")
+            sub.add_argument('--heartbeat-timeout', type=float, default=HEARTBEAT_TIMEOUT)
+    subparsers.choices['worker'].add_argument('--name', default=None)
+    local_parser = subparsers.choices['local']
+    local_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    local_parser.add_argument('--kill-worker-after', type=float, default=None,
+                              help="若干秒后强制结束一个工作者（验证重新排队）")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'worker':
+            completed = asyncio.run(run_worker(args.host, args.port, args.name))
+            print(f"工作者结束，完成 {completed} 个工作单元", file=sys.stderr)
+        else:
+            asyncio.run(_coordinate(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""扫描日志模块 - 追加写的已完成工作单元日志，中断后重启只求解未完成的单元"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+
+from core.compact_path import CompactPath
+
+# 文件格式（小端）：
+#   文件头  magic(4s) version(H) 扫描配置摘要(32s)
+#   记录    配置下标(H) 起始组下标(I) 结束组下标(I) 负载字节数(I) + 负载 + CRC32(I，覆盖记录头与负载)
+# 负载为各组结果依次拼接：CompactPath.to_bytes()，无解为单个0字节（有解路径至少含1个状态）
+JOURNAL_MAGIC = b'PFSJ'
+JOURNAL_VERSION = 1
+JOURNAL_HEADER = struct.Struct('<4sH32s')
+RECORD_HEADER = struct.Struct('<HIII')
+RECORD_CRC = struct.Struct('<I')
+NO_PATH = b'\x00'
+
+DEFAULT_FSYNC_INTERVAL = 5.0
+
+
+def sweep_fingerprint(profiles, start, stop, chunk_size, dedup):
+    """扫描配置摘要：配置、编号区间或分组方式不同时工作单元含义不同，不能续跑"""
+    config = {'profiles': profiles, 'start': start, 'stop': stop, 'chunk_size': chunk_size, 'dedup': dedup}
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).digest()
+
+
+def encode_results(results):
+    return b''.join(NO_PATH if path is None else path.to_bytes() for path in results)
+
+
+def decode_results(payload):
+    results = []
+    offset = 0
+    while offset < len(payload):
+        n = payload[offset]
+        if n == 0:
+            results.append(None)
+            offset += 1
+            continue
+        m = payload[offset + 1 + n]
+        size = 2 + n + 2 * m
+        results.append(CompactPath.from_bytes(payload[offset:offset + size]))
+        offset += size
+    return results
+
+
+class SweepJournal:
+    """
+    已完成工作单元日志
+    每个单元完成后立即追加并flush，至多每fsync_interval秒fsync一次，关闭时再fsync；
+    打开已有日志时校验配置摘要与各记录CRC，截掉崩溃时写了一半的尾部记录
+    """
+
+    def __init__(self, path, fingerprint, fsync_interval=DEFAULT_FSYNC_INTERVAL):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.fsync_interval = fsync_interval
+        self.completed = set()
+        self.replay_end = JOURNAL_HEADER.size
+        self.file = None
+        self.last_sync = 0.0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        if os.path.exists(self.path):
+            end = self.scan()
+            self.file = open(self.path, 'r+b')
+            self.file.truncate(end)
+            self.file.seek(end)
+            self.replay_end = end
+        else:
+            self.file = open(self.path, 'wb')
+            self.file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, self.fingerprint))
+            self.sync()
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.last_sync = time.monotonic()
+
+    def read_records(self, f, decode=True):
+        """从文件头之后逐条读取有效记录，生成 (结束偏移, 配置下标, 起始组下标, 结束组下标, 结果或None)"""
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            profile_index, unit_start, unit_stop, size = RECORD_HEADER.unpack(header)
+            payload = f.read(size)
+            crc = f.read(RECORD_CRC.size)
+            if len(payload) < size or len(crc) < RECORD_CRC.size or \
+                    zlib.crc32(header + payload) != RECORD_CRC.unpack(crc)[0]:
+                return
+            yield (f.tell(), profile_index, unit_start, unit_stop,
+                   decode_results(payload) if decode else None)
+
+    def scan(self):
+        """检查已有日志并记录已完成单元，返回有效内容的结束偏移"""
+        with open(self.path, 'rb') as f:
+            header = f.read(JOURNAL_HEADER.size)
+            if len(header) < JOURNAL_HEADER.size:
+                raise ValueError(f"不是有效的扫描日志: {self.path}")
+            magic, version, fingerprint = JOURNAL_HEADER.unpack(header)
+            if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+                raise ValueError(f"不是有效的扫描日志: {self.path}")
+            if fingerprint != self.fingerprint:
+                raise ValueError(f"扫描日志与当前扫描配置不一致: {self.path}")
+            end = f.tell()
+            for end, profile_index, unit_start, _, _ in self.read_records(f, decode=False):
+                self.completed.add((profile_index, unit_start))
+        return end
+
+    def replay(self):
+        """
+        按写入顺序流式读出打开日志时已完成的单元 (profile_index, unit_start, unit_stop, results)，不整体载入内存
+        重放期间追加的新记录不会被读出
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(JOURNAL_HEADER.size)
+            for end, profile_index, unit_start, unit_stop, results in self.read_records(f):
+                if end > self.replay_end:
+                    return
+                yield profile_index, unit_start, unit_stop, results
+
+    def append(self, profile_index, unit_start, unit_stop, results):
+        payload = encode_results(results)
+        header = RECORD_HEADER.pack(profile_index, unit_start, unit_stop, len(payload))
+        self.file.write(header + payload + RECORD_CRC.pack(zlib.crc32(header + payload)))
+        self.file.flush()
+        self.completed.add((profile_index, unit_start))
+        if time.monotonic() - self.last_sync >= self.fsync_interval:
+            self.sync()
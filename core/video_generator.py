@@ -12,6 +12,10 @@ from utils.constants import (
     EXTENDED_GRID_WIDTH, EXTENDED_GRID_HEIGHT, POSITION_NUMBERS, 
     POSITION_HEIGHTS, EXTENDED_GREEN_POSITIONS, ALL_OUTER_POSITIONS
 )
+from core.compact_path import as_compact
+
+# 高度 -> 单元格类型（与界面GridCell一致）
+HEIGHT_CELL_TYPES = {200: 'low', 400: 'medium', 600: 'high'}
 
 
 class VideoGenerator:
@@ -242,15 +246,21 @@ class VideoGenerator:
         video_writer = cv2.VideoWriter(output_path, fourcc, fps, (self.video_width, self.video_height))
         
         try:
+            path = as_compact(path_with_states)
+            # 路径标记逐步累加，不必每帧重新扫描前缀
+            current_cells_data = self._prepare_cells_data(cells_data, [])
+            
             # 生成每一帧
-            for i, (pos, collected) in enumerate(path_with_states):
+            for i, (pos, collected) in enumerate(path):
                 # 创建步骤信息
-                step_info = f"step: {i+1}/{len(path_with_states)}\n"
+                step_info = f"step: {i+1}/{len(path)}\n"
                 step_info += f"pos: {POSITION_NUMBERS.get(pos, pos)}\n"
                 step_info += f"collected R2: {len(collected)}"
                 
                 # 更新cells_data以显示当前路径状态
-                current_cells_data = self._prepare_cells_data(cells_data, path_with_states[:i+1])
+                if pos in current_cells_data:
+                    current_cells_data[pos]['is_path'] = True
+                    current_cells_data[pos]['path_order'] = i
                 
                 # 创建帧
                 frame = self.create_frame(current_cells_data, pos, collected, step_info)
@@ -270,6 +280,58 @@ class VideoGenerator:
         finally:
             video_writer.release()
     
+    def create_heatmap_image(self, heatmap, title=""):
+        """
+        热力图：格子按平均经过次数叠加红色，相邻格之间按转移次数画线，R2拾取次数以蓝色圆标出
+        heatmap 为 core.heatmap.TraversalHeatmap
+        """
+        img = self.create_frame(self.create_cells_data_from_blocks({}), step_info=title).convert('RGBA')
+        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+
+        def cell_origin(position):
+            row, col = divmod(position, self.grid_width)
+            return self.margin + col * self.cell_size, self.margin + row * self.cell_size
+
+        def cell_center(position):
+            x, y = cell_origin(position)
+            return x + self.cell_size // 2, y + self.cell_size // 2
+
+        rates = heatmap.visit_rates()
+        for position, rate in enumerate(rates):
+            if rate > 0:
+                x, y = cell_origin(position)
+                draw.rectangle([x, y, x + self.cell_size, y + self.cell_size], fill=(255, 0, 0, int(40 + 160 * min(rate, 1.0))))
+
+        edges = heatmap.edge_counts()
+        max_edge = max(edges.values(), default=0)
+        for (a, b), count in edges.items():
+            width = max(1, round(14 * count / max_edge))
+            draw.line([cell_center(a), cell_center(b)], fill=(255, 165, 0, 220), width=width)
+
+        max_pickups = heatmap.pickups.max() if heatmap.plans else 0
+        for position, count in enumerate(heatmap.pickups):
+            if count:
+                cx, cy = cell_center(position)
+                radius = 6 + 18 * count / max_pickups
+                draw.ellipse([cx - radius, cy - radius, cx + radius, cy + radius],
+                             fill=(0, 0, 255, 160), outline=(255, 255, 255, 255), width=2)
+
+        img = Image.alpha_composite(img, overlay)
+        draw = ImageDraw.Draw(img)
+        for position, rate in enumerate(rates):
+            if rate > 0 or heatmap.pickups[position]:
+                x, y = cell_origin(position)
+                text = f"{rate:.0%}"
+                if heatmap.pickups[position]:
+                    text += f" / R2 {heatmap.pickups[position]}"
+                draw.text((x + 6, y + self.cell_size - 22), text, fill=(255, 255, 255), font=self._get_font(12))
+        return img.convert('RGB')
+
+    def save_heatmap(self, heatmap, output_path, title=""):
+        """热力图保存为PNG"""
+        self.create_heatmap_image(heatmap, title).save(output_path)
+
     def _prepare_cells_data(self, original_cells_data, path_states):
         """准备单元格数据，包含路径信息"""
         cells_data = original_cells_data.copy()
@@ -282,6 +344,22 @@ class VideoGenerator:
         
         return cells_data
     
+    def create_cells_data_from_blocks(self, blocks):
+        """由 {位置: 方块类型} 创建单元格数据（无界面时使用）"""
+        cells_data = {}
+        for position in range(self.grid_width * self.grid_height):
+            if position in EXTENDED_GREEN_POSITIONS:
+                cell_type = HEIGHT_CELL_TYPES[POSITION_HEIGHTS[position]]
+            else:
+                cell_type = 'outer'
+            cells_data[position] = {
+                'type': cell_type,
+                'block_type': blocks.get(position),
+                'is_path': False,
+                'path_order': -1
+            }
+        return cells_data
+    
     def create_cells_data_from_ui(self, cells):
         """从UI单元格创建数据"""
         cells_data = {}
@@ -0,0 +1,37 @@
+"""时空路径规划回归测试"""
+
+from core.layouts import Layout
+from core.path_planner import PathPlanner
+from core.spacetime_planner import SpaceTimePlanner, ReservationTable
+from utils.constants import get_extended_position
+
+
+def make_layout(r1, r2, f):
+    return Layout(*[[get_extended_position(n - 1) for n in numbers] for numbers in (r1, r2, f)])
+
+
+def assert_no_overlap(plan, reservations):
+    """按 reserve_plan 的占用方式回放：每个状态占用所在格子直到到达下一状态"""
+    leaves = plan.times[1:] + [plan.times[-1] + 1]
+    for (pos, _), arrive, leave in zip(plan.path, plan.times, leaves):
+        for time in range(arrive, leave):
+            assert reservations.is_free(pos, time), (pos, arrive, leave, time)
+
+
+def test_move_keeps_source_cell_until_arrival():
+    # 无预约时在格子7拾取后于t=5出发，耗时2的移动在t=7到达；
+    # 格子7在 [6, 9) 被预约，移动途中仍占用格子7，不能在t=5出发
+    planner = PathPlanner()
+    layout = make_layout((4, 6, 12), (1, 5, 8, 9), (10,))
+    obstacles, r2_positions = layout.get_obstacles(), layout.get_r2_positions()
+    spacetime = SpaceTimePlanner(planner)
+
+    free_plan = spacetime.plan(obstacles, r2_positions)
+    states = [(pos, time) for (pos, _), time in zip(free_plan.path, free_plan.times)]
+    assert (7, 5) in states and states[states.index((7, 5)) + 1] == (12, 7)
+
+    reservations = ReservationTable()
+    reservations.reserve(7, 6, 9)
+    plan = spacetime.plan(obstacles, r2_positions, reservations)
+    assert plan is not None
+    assert_no_overlap(plan, reservations)
@@ -2,5 +2,8 @@
 
 from .main_window import PlumForestQT
 from .control_panel import ControlPanel
+from .sensitivity_chart import SensitivityChart
+from .board_widget import BoardWidget
+from .results_browser import ResultsBrowser, ResultsTableModel
 
-__all__ = ['PlumForestQT', 'ControlPanel']
\ No newline at end of file
+__all__ = ['PlumForestQT', 'ControlPanel', 'SensitivityChart', 'BoardWidget', 'ResultsBrowser', 'ResultsTableModel']
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""棋盘控件模块"""
+
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QFont, QPen, QBrush, QPixmap
+
+from utils.constants import POSITION_NUMBERS
+
+
+class BoardWidget(QWidget):
+    """
+    单个控件绘制整块5x6棋盘，单元格状态保存在 GridCell 中
+    格子背景（含编号）、路径标记和方块图案按当前格子尺寸缓存为QPixmap，绘制时用到的画笔同样随尺寸缓存；
+    单元格状态变化只标记该格区域，
+    Qt会把同一事件循环内的多次 update(rect) 合并成一次 paintEvent，只重画脏区内的格子
+    """
+
+    cellClicked = pyqtSignal(int)
+
+    BASE_CELL_SIZE = 120
+    MIN_CELL_SIZE = 40
+
+    CELL_COLORS = {
+        'low': QColor('#295210'),
+        'medium': QColor('#2A7138'),
+        'high': QColor('#98A650'),
+        'outer': QColor('#87CEEB'),  # 淡蓝色
+    }
+    HEIGHT_LABELS = {'low': "L(200)", 'medium': "M(400)", 'high': "H(600)"}
+    BLOCK_COLORS = {
+        ('R1', False): QColor(255, 0, 0),
+        ('R2', False): QColor(0, 0, 255),
+        ('R2', True): QColor(100, 100, 255),  # 被收集的R2方块变浅蓝色
+        ('F', False): QColor(128, 0, 128),
+    }
+
+    def __init__(self, cells, parent=None):
+        super().__init__(parent)
+        self.cells = cells
+        self.rows = len(cells)
+        self.cols = len(cells[0])
+        self.cell_size = self.BASE_CELL_SIZE
+        self.origin_x = 0
+        self.origin_y = 0
+        self.hover_position = -1
+        self.robot = None  # 回放时的机器人位置 (起点格, 终点格, 插值比例)
+        self.heatmap = None  # 通行热力图叠加层（core.heatmap.TraversalHeatmap）
+        self.heatmap_overlay = None  # 热力图按当前格子尺寸预先算好的图元，见 build_heatmap_overlay
+        self.pixmap_cache = {}
+        self.paint_tools = None  # 当前格子尺寸下的画笔与字体，与pixmap_cache一起失效
+
+        for row in cells:
+            for cell in row:
+                cell.board = self
+
+        self.setMouseTracking(True)
+        self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
+        self.setMinimumSize(self.cols * self.MIN_CELL_SIZE, self.rows * self.MIN_CELL_SIZE)
+
+    def sizeHint(self):
+        return QSize(self.cols * self.BASE_CELL_SIZE, self.rows * self.BASE_CELL_SIZE)
+
+    def cell_at(self, position):
+        return self.cells[position // self.cols][position % self.cols]
+
+    def cell_rect(self, position):
+        """格子在控件中的矩形"""
+        row, col = position // self.cols, position % self.cols
+        return QRect(self.origin_x + col * self.cell_size, self.origin_y + row * self.cell_size,
+                     self.cell_size, self.cell_size)
+
+    def position_at(self, point):
+        """命中测试：控件坐标 -> 格子编号，不在棋盘内返回-1"""
+        x, y = point.x() - self.origin_x, point.y() - self.origin_y
+        if x < 0 or y < 0:
+            return -1
+        row, col = y // self.cell_size, x // self.cell_size
+        if row >= self.rows or col >= self.cols:
+            return -1
+        return row * self.cols + col
+
+    def update_cell(self, position):
+        """标记单个格子需要重绘"""
+        self.update(self.cell_rect(position))
+
+    def resizeEvent(self, event):
+        """按控件大小缩放格子，保持正方形并居中"""
+        self.cell_size = max(1, min(self.width() // self.cols, self.height() // self.rows))
+        self.origin_x = (self.width() - self.cell_size * self.cols) // 2
+        self.origin_y = (self.height() - self.cell_size * self.rows) // 2
+        self.pixmap_cache.clear()
+        self.paint_tools = None
+        self.build_heatmap_overlay()
+        super().resizeEvent(event)
+
+    def scaled(self, value):
+        """按基准尺寸120缩放长度"""
+        return max(1, round(value * self.cell_size / self.BASE_CELL_SIZE))
+
+    def tools(self):
+        """按当前格子尺寸创建一次的画笔与字体"""
+        if self.paint_tools is None:
+            self.paint_tools = {
+                'hover_pen': QPen(QColor('#007acc'), self.scaled(3)),
+            }
+        return self.paint_tools
+
+    def display_number(self, cell):
+        """格子显示编号（外围不可通行区域无编号）"""
+        if cell.is_clickable:
+            return POSITION_NUMBERS.get(cell.position, cell.position + 1)
+        return POSITION_NUMBERS.get(cell.position, "")
+
+    def background_pixmap(self, cell_type, display_number=""):
+        """格子底色、边框、高度标识和编号"""
+        key = ('background', cell_type, display_number)
+        pixmap = self.pixmap_cache.get(key)
+        if pixmap is None:
+            size = self.cell_size
+            pixmap = QPixmap(size, size)
+            pixmap.fill(self.CELL_COLORS.get(cell_type, self.CELL_COLORS['medium']))
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            border = self.scaled(2)
+            painter.setPen(QPen(QColor('#333'), border))
+            painter.drawRect(QRect(border // 2, border // 2, size - border, size - border))
+
+            # 绘制高度标识（在右上角，仅对绿色区域）
+            height_text = self.HEIGHT_LABELS.get(cell_type)
+            if height_text:
+                painter.setPen(QPen(QColor(100, 100, 100), 1))
+                painter.setFont(QFont("Arial", self.scaled(9)))
+                painter.drawText(QRect(0, self.scaled(5), size - self.scaled(5), size),
+                                 Qt.AlignRight | Qt.AlignTop, height_text)
+
+            if display_number != "":
+                painter.setPen(QPen(QColor(0, 0, 0), 1))
+                painter.setFont(QFont("Arial", self.scaled(16), QFont.Bold))
+                painter.drawText(QRect(0, 0, size, size), Qt.AlignCenter, str(display_number))
+            painter.end()
+            self.pixmap_cache[key] = pixmap
+        return pixmap
+
+    def path_pixmap(self, path_order):
+        """路径标记：半透明黄色底、橙色边框和路径顺序"""
+        key = ('path', path_order)
+        pixmap = self.pixmap_cache.get(key)
+        if pixmap is None:
+            size = self.cell_size
+            pixmap = QPixmap(size, size)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            width = self.scaled(3)
+            painter.setBrush(QBrush(QColor(255, 255, 0, 150)))  # 半透明黄色
+            painter.setPen(QPen(QColor(255, 165, 0), width))  # 橙色边框
+            painter.drawRect(QRect(0, 0, size, size).adjusted(width // 2, width // 2,
+                                                              -(width + 1) // 2, -(width + 1) // 2))
+            painter.setPen(QPen(QColor(0, 0, 0), 2))
+            painter.setFont(QFont("Arial", self.scaled(14), QFont.Bold))
+            painter.drawText(QRect(0, 0, size, size), Qt.AlignCenter, str(path_order + 1))
+            painter.end()
+            self.pixmap_cache[key] = pixmap
+        return pixmap
+
+    def block_pixmap(self, block_type, is_collected):
+        """方块图案（R2收集后显示✓）"""
+        is_collected = is_collected and block_type == 'R2'
+        key = ('block', block_type, is_collected)
+        pixmap = self.pixmap_cache.get(key)
+        if pixmap is None:
+            size = self.scaled(40)
+            pixmap = QPixmap(size, size)
+            pixmap.fill(self.BLOCK_COLORS[(block_type, is_collected)])
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(QColor(0, 0, 0), 2))
+            painter.drawRect(QRect(1, 1, size - 2, size - 2))
+            painter.setPen(QPen(QColor(255, 255, 255), 1))
+            painter.setFont(QFont("Arial", self.scaled(12), QFont.Bold))
+            painter.drawText(QRect(0, 0, size, size), Qt.AlignCenter, "✓" if is_collected else block_type)
+            painter.end()
+            self.pixmap_cache[key] = pixmap
+        return pixmap
+
+    def robot_pixmap(self):
+        """回放用的机器人图案"""
+        key = ('robot',)
+        pixmap = self.pixmap_cache.get(key)
+        if pixmap is None:
+            size = self.scaled(56)
+            pixmap = QPixmap(size, size)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setBrush(QBrush(QColor(255, 140, 0, 220)))
+            painter.setPen(QPen(QColor(0, 0, 0), 2))
+            painter.drawEllipse(QRect(1, 1, size - 2, size - 2))
+            painter.setPen(QPen(QColor(255, 255, 255), 1))
+            painter.setFont(QFont("Arial", self.scaled(13), QFont.Bold))
+            painter.drawText(QRect(0, 0, size, size), Qt.AlignCenter, "R2")
+            painter.end()
+            self.pixmap_cache[key] = pixmap
+        return pixmap
+
+    def robot_rect(self):
+        """机器人当前所在矩形（两格中心之间线性插值）"""
+        if self.robot is None:
+            return QRect()
+        start, end, fraction = self.robot
+        a, b = self.cell_rect(start).center(), self.cell_rect(end).center()
+        size = self.scaled(56)
+        x = round(a.x() + (b.x() - a.x()) * fraction) - size // 2
+        y = round(a.y() + (b.y() - a.y()) * fraction) - size // 2
+        return QRect(x, y, size, size)
+
+    def set_robot(self, start, end, fraction):
+        """移动机器人，只重画新旧位置"""
+        old_rect = self.robot_rect()
+        self.robot = (start, end, fraction)
+        new_rect = self.robot_rect()
+        if new_rect != old_rect:
+            self.update(old_rect)
+            self.update(new_rect)
+
+    def clear_robot(self):
+        if self.robot is not None:
+            self.update(self.robot_rect())
+            self.robot = None
+
+    def paintEvent(self, event):
+        """只重画与脏区相交的格子"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        region = event.region()
+        for row in self.cells:
+            for cell in row:
+                rect = self.cell_rect(cell.position)
+                if region.intersects(rect):
+                    self.draw_cell(painter, cell, rect)
+
+        if self.heatmap_overlay is not None:
+            self.draw_heatmap(painter, region)
+
+        if self.robot is not None:
+            rect = self.robot_rect()
+            if region.intersects(rect):
+                painter.drawPixmap(rect.topLeft(), self.robot_pixmap())
+
+    def set_heatmap(self, heatmap):
+        """显示通行热力图（None为移除）；统计量与图元只在这里和缩放时计算一次，整块重画"""
+        self.heatmap = heatmap
+        self.build_heatmap_overlay()
+        self.update()
+
+    def build_heatmap_overlay(self):
+        """
+        按当前格子尺寸预先算好热力图图元：
+            cells  [(格子矩形, 底色或None, 拾取圆半径, 文字矩形, 文字)]
+            edges  [(包围矩形, 画笔, 起点, 终点)]
+        """
+        heatmap = self.heatmap
+        if heatmap is None:
+            self.heatmap_overlay = None
+            return
+        rates = heatmap.visit_rates()
+        max_pickups = heatmap.pickups.max() if heatmap.plans else 0
+        cells = []
+        for position, (rate, count) in enumerate(zip(rates, heatmap.pickups)):
+            if rate <= 0 and not count:
+                continue
+            rect = self.cell_rect(position)
+            color = QColor(255, 0, 0, int(40 + 160 * min(rate, 1.0))) if rate > 0 else None
+            radius = self.scaled(6 + 18 * count / max_pickups) if count else 0
+            text = f"{rate:.0%}" + (f" / R2 {count}" if count else "")
+            cells.append((rect, color, radius, rect.adjusted(self.scaled(6), 0, 0, -self.scaled(4)), text))
+
+        edges = heatmap.edge_counts()
+        max_edge = max(edges.values(), default=0)
+        lines = []
+        for (a, b), count in edges.items():
+            width = max(1, round(self.scaled(14) * count / max_edge))
+            start, end = self.cell_rect(a).center(), self.cell_rect(b).center()
+            bounds = QRect(start, end).normalized().adjusted(-width, -width, width, width)
+            lines.append((bounds, QPen(QColor(255, 165, 0, 220), width, Qt.SolidLine, Qt.RoundCap), start, end))
+
+        self.heatmap_overlay = {
+            'cells': cells,
+            'edges': lines,
+            'circle_pen': QPen(QColor(255, 255, 255), 2),
+            'circle_brush': QBrush(QColor(0, 0, 255, 160)),
+            'text_pen': QPen(QColor(255, 255, 255), 1),
+            'font': QFont("Arial", self.scaled(10)),
+        }
+
+    def draw_heatmap(self, painter, region):
+        """格子按平均经过次数叠加红色，相邻格转移画橙色线，R2拾取次数画蓝色圆；只画与脏区相交的图元"""
+        overlay = self.heatmap_overlay
+        cells = [cell for cell in overlay['cells'] if region.intersects(cell[0])]
+        painter.setPen(Qt.NoPen)
+        for rect, color, _, _, _ in cells:
+            if color is not None:
+                painter.setBrush(color)
+                painter.drawRect(rect)
+
+        for bounds, pen, start, end in overlay['edges']:
+            if region.intersects(bounds):
+                painter.setPen(pen)
+                painter.drawLine(start, end)
+
+        painter.setFont(overlay['font'])
+        for rect, _, radius, text_rect, text in cells:
+            if radius:
+                painter.setPen(overlay['circle_pen'])
+                painter.setBrush(overlay['circle_brush'])
+                painter.drawEllipse(rect.center(), radius, radius)
+            painter.setPen(overlay['text_pen'])
+            painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignBottom, text)
+
+    def draw_cell(self, painter, cell, rect):
+        """绘制单个格子：背景（含编号）、路径、方块、悬停框，均为缓存的图案"""
+        painter.drawPixmap(rect.topLeft(), self.background_pixmap(cell.cell_type, self.display_number(cell)))
+
+        # 绘制路径（如果有）
+        if cell.is_path:
+            painter.drawPixmap(rect.topLeft(), self.path_pixmap(cell.path_order))
+
+        # 绘制方块（如果有）
+        if cell.block_type:
+            block = self.block_pixmap(cell.block_type, cell.is_collected)
+            x = rect.x() + (rect.width() - block.width()) // 2
+            y = rect.y() + (rect.height() - block.height()) // 2 + self.scaled(10)
+            painter.drawPixmap(x, y, block)
+
+        if cell.position == self.hover_position:
+            width = self.scaled(3)
+            painter.setBrush(Qt.NoBrush)
+            painter.setPen(self.tools()['hover_pen'])
+            painter.drawRect(rect.adjusted(width // 2, width // 2, -(width + 1) // 2, -(width + 1) // 2))
+
+    def set_hover(self, position):
+        """切换悬停格子，只重画新旧两个格子"""
+        if position == self.hover_position:
+            return
+        if self.hover_position >= 0:
+            self.update_cell(self.hover_position)
+        self.hover_position = position
+        if position >= 0:
+            self.update_cell(position)
+
+    def mouseMoveEvent(self, event):
+        position = self.position_at(event.pos())
+        clickable = position >= 0 and self.cell_at(position).is_clickable
+        self.set_hover(position if clickable else -1)
+        self.setCursor(Qt.PointingHandCursor if clickable else Qt.ArrowCursor)
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.set_hover(-1)
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            position = self.position_at(event.pos())
+            if position >= 0 and self.cell_at(position).is_clickable:
+                self.cellClicked.emit(position)
+                return
+        super().mousePressEvent(event)
@@ -2,13 +2,14 @@
 
 from PyQt5.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QGridLayout,
                              QLabel, QCheckBox, QSpinBox, QComboBox, QPushButton,
-                             QTextEdit, QScrollArea)
+                             QTextEdit, QScrollArea, QSlider, QLineEdit)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+from ui.sensitivity_chart import SensitivityChart
 from utils.constants import (
     DEFAULT_COST_UP_200, DEFAULT_COST_DOWN_200, DEFAULT_COST_UP_400,
     DEFAULT_COST_DOWN_400, DEFAULT_PICKUP_COST, DEFAULT_REQUIRED_R2_COUNT,
-    DEFAULT_OUTER_ZONE_MOVE_COST
+    DEFAULT_OUTER_ZONE_MOVE_COST, DEFAULT_TURN_COST, DEFAULT_ALIGN_COST
 )
 
 
@@ -44,6 +45,9 @@ class ControlPanel(QScrollArea):
         # 功能按钮
         self.setup_function_buttons(layout)
         
+        # 代价灵敏度分析
+        self.setup_sensitivity_controls(layout)
+        
         # 状态信息组
         self.setup_status_info(layout)
         
@@ -113,13 +117,19 @@ class ControlPanel(QScrollArea):
         
         # 算法选择
         self.algorithm_combo = QComboBox()
-        self.algorithm_combo.addItems(["Dijkstra算法"])
+        self.algorithm_combo.addItems(["Dijkstra算法", "Pareto多目标", "Anytime限时", "考虑转向"])
         self.algorithm_combo.setFont(QFont("Arial", 11))
         path_layout.addWidget(self.algorithm_combo)
         
         # 路径规划按钮
         self.setup_path_buttons(path_layout)
         
+        # 路径回放
+        self.setup_playback_controls(path_layout)
+        
+        # 路径下发
+        self.setup_stream_controls(path_layout)
+        
         layout.addWidget(path_group)
     
     def setup_cost_controls(self, path_layout):
@@ -203,6 +213,24 @@ class ControlPanel(QScrollArea):
         
         task_grid.addWidget(QLabel("个R2块"), 1, 2)
         
+        # 朝向模型（算法选择“考虑转向”时生效）
+        task_grid.addWidget(QLabel("转向/对齐:"), 2, 0)
+        self.turn_cost_spinbox = QSpinBox()
+        self.turn_cost_spinbox.setMinimum(0)
+        self.turn_cost_spinbox.setMaximum(100)
+        self.turn_cost_spinbox.setValue(DEFAULT_TURN_COST)
+        self.turn_cost_spinbox.setFixedWidth(60)
+        self.turn_cost_spinbox.setToolTip("每转90°的代价")
+        task_grid.addWidget(self.turn_cost_spinbox, 2, 1)
+        
+        self.align_cost_spinbox = QSpinBox()
+        self.align_cost_spinbox.setMinimum(0)
+        self.align_cost_spinbox.setMaximum(100)
+        self.align_cost_spinbox.setValue(DEFAULT_ALIGN_COST)
+        self.align_cost_spinbox.setFixedWidth(60)
+        self.align_cost_spinbox.setToolTip("转向后上下台阶前重新对齐的代价")
+        task_grid.addWidget(self.align_cost_spinbox, 2, 2)
+        
         path_layout.addLayout(task_grid)
     
     def setup_path_buttons(self, path_layout):
@@ -228,6 +256,53 @@ class ControlPanel(QScrollArea):
         
         path_layout.addLayout(button_layout)
     
+    def setup_playback_controls(self, path_layout):
+        """设置路径回放控制"""
+        playback_row = QHBoxLayout()
+        
+        self.play_btn = QPushButton("播放")
+        self.play_btn.setFont(QFont("Arial", 11))
+        playback_row.addWidget(self.play_btn)
+        
+        self.stop_btn = QPushButton("停止")
+        self.stop_btn.setFont(QFont("Arial", 11))
+        playback_row.addWidget(self.stop_btn)
+        
+        playback_row.addWidget(QLabel("速度:"))
+        self.playback_speed_combo = QComboBox()
+        self.playback_speed_combo.addItems(["0.5x", "1x", "2x", "4x", "8x"])
+        self.playback_speed_combo.setCurrentIndex(1)
+        self.playback_speed_combo.setFont(QFont("Arial", 11))
+        playback_row.addWidget(self.playback_speed_combo)
+        path_layout.addLayout(playback_row)
+        
+        self.playback_slider = QSlider(Qt.Horizontal)
+        path_layout.addWidget(self.playback_slider)
+        
+        self.playback_label = QLabel("回放: 未计算路径")
+        self.playback_label.setFont(QFont("Arial", 9))
+        path_layout.addWidget(self.playback_label)
+        
+        self.set_playback_enabled(False)
+    
+    def setup_stream_controls(self, path_layout):
+        """设置路径下发（连接下位机后每次计算出路径即发送）"""
+        stream_row = QHBoxLayout()
+        stream_row.addWidget(QLabel("下位机:"))
+        self.stream_address_edit = QLineEdit("127.0.0.1:9000")
+        self.stream_address_edit.setFont(QFont("Arial", 11))
+        stream_row.addWidget(self.stream_address_edit)
+        
+        self.stream_btn = QPushButton("连接")
+        self.stream_btn.setFont(QFont("Arial", 11))
+        stream_row.addWidget(self.stream_btn)
+        path_layout.addLayout(stream_row)
+    
+    def set_playback_enabled(self, enabled):
+        """启用/禁用回放控件（有路径时才可用）"""
+        for widget in (self.play_btn, self.stop_btn, self.playback_speed_combo, self.playback_slider):
+            widget.setEnabled(enabled)
+    
     def setup_function_buttons(self, layout):
         """设置功能按钮"""
         func_layout = QHBoxLayout()
@@ -242,8 +317,72 @@ class ControlPanel(QScrollArea):
         self.clear_btn.setFixedHeight(35)
         func_layout.addWidget(self.clear_btn)
         
+        self.worst_case_btn = QPushButton("最坏布局")
+        self.worst_case_btn.setFont(QFont("Arial", 12))
+        self.worst_case_btn.setFixedHeight(35)
+        func_layout.addWidget(self.worst_case_btn)
+        
+        self.heatmap_btn = QPushButton("热力图")
+        self.heatmap_btn.setFont(QFont("Arial", 12))
+        self.heatmap_btn.setFixedHeight(35)
+        self.heatmap_btn.setCheckable(True)
+        self.heatmap_btn.setToolTip("选择扫描结果存储目录，在棋盘上叠加各格子的通行统计")
+        func_layout.addWidget(self.heatmap_btn)
+        
+        self.browse_results_btn = QPushButton("结果浏览")
+        self.browse_results_btn.setFont(QFont("Arial", 12))
+        self.browse_results_btn.setFixedHeight(35)
+        self.browse_results_btn.setToolTip("选择扫描结果存储目录，按需加载浏览各布局的规划结果")
+        func_layout.addWidget(self.browse_results_btn)
+        
         layout.addLayout(func_layout)
     
+    def setup_sensitivity_controls(self, layout):
+        """设置代价灵敏度分析"""
+        sensitivity_group = QFrame()
+        sensitivity_group.setFrameStyle(QFrame.Box)
+        sensitivity_layout = QVBoxLayout(sensitivity_group)
+        sensitivity_layout.setSpacing(5)
+        
+        sensitivity_layout.addWidget(QLabel("代价灵敏度分析:"))
+        
+        param_row = QHBoxLayout()
+        self.sensitivity_param_combo = QComboBox()
+        self.sensitivity_param_combo.addItems(["上200", "下200", "上400", "下400", "拾取", "外围移动"])
+        self.sensitivity_param_combo.setFont(QFont("Arial", 11))
+        param_row.addWidget(self.sensitivity_param_combo)
+        
+        param_row.addWidget(QLabel("范围:"))
+        self.sensitivity_min_spinbox = QSpinBox()
+        self.sensitivity_min_spinbox.setMinimum(0)
+        self.sensitivity_min_spinbox.setMaximum(100)
+        self.sensitivity_min_spinbox.setValue(0)
+        self.sensitivity_min_spinbox.setFixedWidth(60)
+        param_row.addWidget(self.sensitivity_min_spinbox)
+        
+        self.sensitivity_max_spinbox = QSpinBox()
+        self.sensitivity_max_spinbox.setMinimum(0)
+        self.sensitivity_max_spinbox.setMaximum(100)
+        self.sensitivity_max_spinbox.setValue(20)
+        self.sensitivity_max_spinbox.setFixedWidth(60)
+        param_row.addWidget(self.sensitivity_max_spinbox)
+        sensitivity_layout.addLayout(param_row)
+        
+        self.sensitivity_btn = QPushButton("灵敏度分析")
+        self.sensitivity_btn.setFont(QFont("Arial", 12))
+        self.sensitivity_btn.setFixedHeight(35)
+        sensitivity_layout.addWidget(self.sensitivity_btn)
+        
+        self.sensitivity_chart = SensitivityChart()
+        sensitivity_layout.addWidget(self.sensitivity_chart)
+        
+        self.sensitivity_label = QLabel("断点: 未分析")
+        self.sensitivity_label.setFont(QFont("Arial", 9))
+        self.sensitivity_label.setWordWrap(True)
+        sensitivity_layout.addWidget(self.sensitivity_label)
+        
+        layout.addWidget(sensitivity_group)
+    
     def setup_status_info(self, layout):
         """设置状态信息"""
         status_group = QFrame()
@@ -1,18 +1,33 @@
 """主窗口模块"""
 
 import random
+import time
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QGridLayout, QLabel, QMessageBox, QFrame)
+                             QLabel, QMessageBox, QFrame)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
-from core.path_planner import PathPlanner
+from core.path_planner import PathPlanner, COST_PARAMETERS
+from core.pareto_planner import ParetoPlanner
+from core.anytime_planner import AnytimePlanner, DEFAULT_TIME_LIMIT
+from core.heading_planner import HeadingPlanner, MotionModel, HEADING_NAMES
+from core.sensitivity import SensitivityAnalyzer
+from core.layouts import Layout, random_layout, unrank_layout
+from core.compact_path import as_compact
+from core.plan_table import PlanTable
+from core.adversarial import AdversarialSearch
+from core.plan_stream import connect_plan_stream
 from core.grid_cell import GridCell
+from core.heatmap import TraversalHeatmap
+from core.results_store import ResultsStore
 from ui.control_panel import ControlPanel
+from ui.board_widget import BoardWidget
+from ui.playback import PathPlayback
+from ui.results_browser import ResultsBrowser
 from utils.constants import (
     EXTENDED_GRID_WIDTH, EXTENDED_GRID_HEIGHT, EXTENDED_GREEN_POSITIONS,
     ENTRY_ZONE_POSITIONS, EXIT_ZONE_POSITIONS, TRUE_START_POSITION,
-    GREEN_AREA_START_ROW, GREEN_AREA_START_COL, ORIGINAL_GRID_WIDTH, ORIGINAL_GRID_HEIGHT, ORIGINAL_GRID_SIZE,
+    GREEN_AREA_START_ROW, GREEN_AREA_START_COL, ORIGINAL_GRID_WIDTH, ORIGINAL_GRID_HEIGHT,
     LOW_POSITIONS, HIGH_POSITIONS, MEDIUM_POSITIONS, POSITION_NUMBERS,
     OUTER_POSITIONS, ENTRANCE_POSITIONS, FORBIDDEN_F_POSITIONS,
     MAX_R1_COUNT, MAX_R2_COUNT, MAX_F_COUNT
@@ -22,6 +37,9 @@ from PyQt5.QtWidgets import QFileDialog, QProgressDialog
 from PyQt5.QtCore import QThread, pyqtSignal
 import os
 
+# 回放进度条每步的刻度数
+PLAYBACK_SLIDER_TICKS = 100
+
 class VideoGenerationThread(QThread):
     """视频生成线程"""
     progress = pyqtSignal(int)
@@ -55,10 +73,21 @@ class PlumForestQT(QMainWindow):
     def __init__(self):
         super().__init__()
         self.path_planner = PathPlanner(EXTENDED_GRID_WIDTH, EXTENDED_GRID_HEIGHT)
+        self.pareto_planner = ParetoPlanner(self.path_planner)
+        self.anytime_planner = AnytimePlanner(self.path_planner)
+        self.heading_planner = HeadingPlanner(self.path_planner)
+        self.sensitivity_analyzer = SensitivityAnalyzer(self.path_planner)
+        self.adversarial_search = AdversarialSearch(self.path_planner)
+        self.path_planner.collect_stats = True
+        # 预计算查找表（python -m core.plan_table build 生成），不存在时只用实时搜索
+        self.plan_table = PlanTable.open_default()
         self.video_generator = VideoGenerator(EXTENDED_GRID_WIDTH, EXTENDED_GRID_HEIGHT)
         self.current_path = None
         self.collected_r2_positions = set()
+        self.plan_stream = None  # 已连接下位机的发送端
+        self.results_browser = None  # 结果存储浏览窗口
         self.init_ui()
+        self.playback = PathPlayback(self.board, self)
         self.setup_constraints()
         self.connect_signals()
         
@@ -129,13 +158,9 @@ class PlumForestQT(QMainWindow):
         """)
         area2_layout = QVBoxLayout(area2_container)
         area2_layout.setSpacing(0)
-        area2_layout.setContentsMargins(0, 0, 0, 0)
-        
-        # 创建5x6网格
-        grid_layout = QGridLayout()
-        grid_layout.setSpacing(0)
-        grid_layout.setContentsMargins(15, 15, 15, 15)
+        area2_layout.setContentsMargins(15, 15, 15, 15)
         
+        # 创建5x6网格（单元格只保存状态，由棋盘控件统一绘制）
         self.cells = []
         for i in range(EXTENDED_GRID_HEIGHT):
             row = []
@@ -162,15 +187,13 @@ class PlumForestQT(QMainWindow):
                     cell_type = 'outer'
                     is_clickable = False
                 
-                cell = GridCell(position, cell_type, is_clickable)
-                if is_clickable:
-                    cell.clicked.connect(lambda checked, pos=position: self.on_cell_clicked(pos))
-                row.append(cell)
-                grid_layout.addWidget(cell, i, j)
+                row.append(GridCell(position, cell_type, is_clickable))
             
             self.cells.append(row)
         
-        area2_layout.addLayout(grid_layout)
+        self.board = BoardWidget(self.cells)
+        self.board.cellClicked.connect(self.on_cell_clicked)
+        area2_layout.addWidget(self.board)
         main_layout.addWidget(area2_container)
         
         area3_label = QLabel("三区")
@@ -239,30 +262,60 @@ class PlumForestQT(QMainWindow):
         self.control_panel.clear_path_btn.clicked.connect(self.clear_path)
         self.control_panel.random_btn.clicked.connect(self.random_placement)
         self.control_panel.clear_btn.clicked.connect(self.clear_all)
+        self.control_panel.worst_case_btn.clicked.connect(self.find_worst_case_layout)
+        self.control_panel.heatmap_btn.clicked.connect(self.toggle_heatmap)
+        self.control_panel.browse_results_btn.clicked.connect(self.open_results_browser)
         
         # 视频生成按钮
         self.control_panel.generate_video_btn.clicked.connect(self.generate_video)
+        
+        # 灵敏度分析按钮
+        self.control_panel.sensitivity_btn.clicked.connect(self.run_sensitivity_analysis)
+        
+        # 路径回放
+        self.control_panel.play_btn.clicked.connect(self.playback.toggle)
+        self.control_panel.stop_btn.clicked.connect(self.playback.stop)
+        self.control_panel.playback_speed_combo.currentIndexChanged.connect(self.on_playback_speed_changed)
+        self.control_panel.playback_slider.valueChanged.connect(self.on_playback_slider_moved)
+        self.playback.progressChanged.connect(self.on_playback_progress)
+        self.control_panel.stream_btn.clicked.connect(self.toggle_plan_stream)
+        self.playback.playingChanged.connect(
+            lambda playing: self.control_panel.play_btn.setText("暂停" if playing else "播放"))
     
-    def calculate_path(self):
-        """计算最优路径"""
-        # 更新路径规划器的参数
-        cost_up_200 = self.control_panel.cost_up_200_spinbox.value()
-        cost_down_200 = self.control_panel.cost_down_200_spinbox.value()
-        cost_up_400 = self.control_panel.cost_up_400_spinbox.value()
-        cost_down_400 = self.control_panel.cost_down_400_spinbox.value()
-        pickup_cost = self.control_panel.pickup_cost_spinbox.value()
-        required_r2_count = self.control_panel.required_r2_spinbox.value()
-        outer_zone_cost = self.control_panel.outer_zone_cost_spinbox.value()
-
-        # R2构型
-        r2_cfg_text = self.control_panel.r2_config_combo.currentText()
-        allow_400 = (r2_cfg_text == "200与400台阶")
+    def update_planner_settings(self):
+        """将控制面板中的代价与构型同步到路径规划器"""
+        allow_400 = (self.control_panel.r2_config_combo.currentText() == "200与400台阶")
         self.path_planner.set_r2_config(allow_400)
-
-        self.path_planner.set_costs(cost_up_200, cost_down_200, cost_up_400, cost_down_400, 
-                                   pickup_cost, required_r2_count, outer_zone_cost)
-        
-        # 获取障碍物和R2方块位置（基于扩展网格）
+        self.path_planner.set_costs(
+            self.control_panel.cost_up_200_spinbox.value(),
+            self.control_panel.cost_down_200_spinbox.value(),
+            self.control_panel.cost_up_400_spinbox.value(),
+            self.control_panel.cost_down_400_spinbox.value(),
+            self.control_panel.pickup_cost_spinbox.value(),
+            self.control_panel.required_r2_spinbox.value(),
+            self.control_panel.outer_zone_cost_spinbox.value())
+    
+    def apply_profile_to_controls(self, profile):
+        """update_planner_settings 的逆操作：把配置dict写回控制面板并同步到路径规划器"""
+        panel = self.control_panel
+        spinboxes = {
+            'cost_up_200': panel.cost_up_200_spinbox,
+            'cost_down_200': panel.cost_down_200_spinbox,
+            'cost_up_400': panel.cost_up_400_spinbox,
+            'cost_down_400': panel.cost_down_400_spinbox,
+            'pickup_cost': panel.pickup_cost_spinbox,
+            'outer_zone_move_cost': panel.outer_zone_cost_spinbox,
+            'required_r2_count': panel.required_r2_spinbox,
+        }
+        for key, spinbox in spinboxes.items():
+            if key in profile:
+                spinbox.setValue(profile[key])
+        if 'allow_400' in profile:
+            panel.r2_config_combo.setCurrentText("200与400台阶" if profile['allow_400'] else "仅200台阶")
+        self.update_planner_settings()
+    
+    def collect_layout(self):
+        """获取障碍物和R2方块位置（基于扩展网格）"""
         obstacles = set()
         r2_positions = set()
         
@@ -272,6 +325,48 @@ class PlumForestQT(QMainWindow):
                     obstacles.add(cell.position)
                     if cell.block_type == 'R2':
                         r2_positions.add(cell.position)
+        return obstacles, r2_positions
+    
+    def run_sensitivity_analysis(self):
+        """对当前布局扫描选定代价参数，显示最优方案变化的断点"""
+        self.update_planner_settings()
+        obstacles, r2_positions = self.collect_layout()
+        
+        low = self.control_panel.sensitivity_min_spinbox.value()
+        high = self.control_panel.sensitivity_max_spinbox.value()
+        if high <= low:
+            QMessageBox.warning(self, "灵敏度分析", "扫描范围上限必须大于下限！")
+            return
+        
+        if self.sensitivity_analyzer.prepare(obstacles, r2_positions) == 0:
+            self.control_panel.sensitivity_chart.clear()
+            self.control_panel.sensitivity_label.setText("断点: 当前布局无可行路径")
+            return
+        
+        param_index = self.control_panel.sensitivity_param_combo.currentIndex()
+        param_label = self.control_panel.sensitivity_param_combo.currentText()
+        result = self.sensitivity_analyzer.parameter_sweep(COST_PARAMETERS[param_index], range(low, high + 1))
+        self.control_panel.sensitivity_chart.set_data(
+            result['values'], result['costs'], result['plans'], result['breakpoints'], param_label)
+        
+        lines = [f"候选方案: {len(self.sensitivity_analyzer.candidates)}个"]
+        for value, old_plan, new_plan in result['breakpoints']:
+            lines.append(f"{param_label}={value}: 方案{old_plan + 1} → 方案{new_plan + 1}")
+        if not result['breakpoints']:
+            lines.append(f"{param_label}在[{low}, {high}]内最优方案不变")
+        for k in sorted(set(int(p) for p in result['plans'])):
+            plan = self.sensitivity_analyzer.candidates[k][1]
+            lines.append(f"方案{k + 1}: " + " → ".join(str(self.get_display_number(p)) for p, _ in plan))
+        self.control_panel.sensitivity_label.setText("\n".join(lines))
+    
+    def calculate_path(self):
+        """计算最优路径"""
+        # 更新路径规划器的参数
+        required_r2_count = self.control_panel.required_r2_spinbox.value()
+        self.update_planner_settings()
+        
+        # 获取障碍物和R2方块位置（基于扩展网格）
+        obstacles, r2_positions = self.collect_layout()
         
         # 检查R2方块数量是否足够
         if len(r2_positions) < required_r2_count:
@@ -286,12 +381,68 @@ class PlumForestQT(QMainWindow):
         end_positions = [self.get_extended_position(pos) for pos in [9, 10, 11]]
         
         # 执行路径规划
-        path_with_states = self.path_planner.dijkstra_with_collection(
-            start_positions, end_positions, obstacles, r2_positions)
+        algorithm_text = self.control_panel.algorithm_combo.currentText()
+        pareto_lines = []
+        stage_lines = []
+        solve_start = time.perf_counter()
+        solve_message = None
+        if algorithm_text == "Pareto多目标":
+            frontier = self.pareto_planner.pareto_with_collection(obstacles, r2_positions)
+            # 棋盘上显示时间最短的方案，其余非支配方案列在路径信息中
+            path_with_states = frontier[0][1] if frontier else None
+            for k, ((time_cost, risk, extra), plan) in enumerate(frontier):
+                plan_str = " → ".join(str(self.get_display_number(p)) for p, _ in plan)
+                pareto_lines.append(f"方案{k + 1}: 时间={time_cost}, ±400次数={risk}, 额外拾取={extra} | {plan_str}")
+        elif algorithm_text == "Anytime限时":
+            # 时限内逐轮收紧次优界，显示最后一轮的最好方案
+            final, stages = self.anytime_planner.solve(obstacles, r2_positions, DEFAULT_TIME_LIMIT)
+            path_with_states = final.path
+            stage_lines = [stage.summary() for stage in stages]
+            solve_message = f"{algorithm_text} ({DEFAULT_TIME_LIMIT * 1000:g} ms): {final.summary()}"
+        elif algorithm_text == "考虑转向":
+            self.heading_planner.motion_model = MotionModel(self.control_panel.turn_cost_spinbox.value(),
+                                                            self.control_panel.align_cost_spinbox.value())
+            plan = self.heading_planner.plan(obstacles, r2_positions)
+            path_with_states = plan.path if plan else None
+            if plan:
+                algorithm_text += (f" (含转向/对齐总代价 {plan.cost}，转向 {plan.turns()} 次，"
+                                   f"起始朝向{HEADING_NAMES[plan.headings[0]]})")
+        else:
+            hit = False
+            if self.plan_table is not None:
+                blocks = {cell.position: cell.block_type for row in self.cells for cell in row if cell.block_type}
+                hit, path_with_states = self.plan_table.lookup(Layout.from_blocks(blocks),
+                                                               self.path_planner.get_profile())
+            if hit:
+                algorithm_text += " (查找表)"
+            else:
+                path_with_states = self.path_planner.dijkstra_with_collection(
+                    start_positions, end_positions, obstacles, r2_positions)
+                solve_message = self.path_planner.last_stats.summary()
+        
+        # 状态栏显示求解耗时与扩展数，便于发现异常耗时的布局
+        if solve_message is None:
+            solve_message = f"{algorithm_text} 求解 {(time.perf_counter() - solve_start) * 1000:.3f} ms"
+        self.statusBar().showMessage(solve_message)
+        
+        self.show_path_result(path_with_states, algorithm_text, solve_message, pareto_lines, stage_lines)
+    
+    def show_path_result(self, path_with_states, algorithm_text, solve_message, pareto_lines=(), stage_lines=()):
+        """在棋盘与路径信息中显示规划结果（path_with_states为None表示无解）"""
+        cost_up_200 = self.control_panel.cost_up_200_spinbox.value()
+        cost_down_200 = self.control_panel.cost_down_200_spinbox.value()
+        cost_up_400 = self.control_panel.cost_up_400_spinbox.value()
+        cost_down_400 = self.control_panel.cost_down_400_spinbox.value()
+        pickup_cost = self.control_panel.pickup_cost_spinbox.value()
+        required_r2_count = self.control_panel.required_r2_spinbox.value()
+        outer_zone_cost = self.control_panel.outer_zone_cost_spinbox.value()
+        allow_400 = self.path_planner.allow_400
         
         if path_with_states:
             self.current_path = path_with_states
             self.display_path_with_collection(path_with_states)
+            self.load_playback(path_with_states)
+            self.send_plan_stream(path_with_states, solve_message)
             
             # 启用视频生成按钮
             self.control_panel.generate_video_btn.setEnabled(True)
@@ -316,17 +467,28 @@ class PlumForestQT(QMainWindow):
 移动步数: {len(positions_only)}
 收集R2块: {actual_collected_count}个 (目标≥{required_r2_count if required_r2_count==2 else required_r2_count})
 R2构型: {'200与400台阶' if allow_400 else '仅200台阶'}
-算法: Dijkstra算法
+算法: {algorithm_text}
 代价设置: ↑200={cost_up_200}, ↓200={cost_down_200}, ↑400={cost_up_400}, ↓400={cost_down_400}, 拾取={pickup_cost}, 外围={outer_zone_cost}
 
 详细步骤:
 {chr(10).join(path_details)}"""
+            if pareto_lines:
+                path_info += f"""
+
+Pareto前沿 ({len(pareto_lines)}个非支配方案):
+{chr(10).join(pareto_lines)}"""
+            if stage_lines:
+                path_info += f"""
+
+限时求解各轮:
+{chr(10).join(stage_lines)}"""
             
             self.control_panel.path_info_text.setText(path_info)
             self.control_panel.status_label.setText(f"状态: 路径计算完成 (总代价: {total_cost})")
         else:
             # 禁用视频生成按钮
             self.control_panel.generate_video_btn.setEnabled(False)
+            self.unload_playback()
 
             QMessageBox.warning(self, "路径规划", "无法找到满足收集任务的路径！")
             self.control_panel.path_info_text.setText("路径信息: 无可行路径")
@@ -336,14 +498,9 @@ R2构型: {'200与400台阶' if allow_400 else '仅200台阶'}
         """构建详细的路径信息"""
         details = []
 
-        for i in range(len(path_with_states) - 1):
-            current_pos, current_collected = path_with_states[i]
-            next_pos, next_collected = path_with_states[i + 1]
-
+        for current_pos, next_pos, collected_pos in as_compact(path_with_states).iter_steps():
             # 收集
-            if current_pos == next_pos and current_collected != next_collected:
-                newly_collected = next_collected - current_collected
-                collected_pos = list(newly_collected)[0]
+            if collected_pos is not None:
                 details.append(f"在位置{self.get_display_number(current_pos)}收集R2块{self.get_display_number(collected_pos)} [代价:{self.path_planner.pickup_cost}]")
                 continue
 
@@ -409,24 +566,90 @@ R2构型: {'200与400台阶' if allow_400 else '仅200台阶'}
             QMessageBox.critical(self, "错误", f"视频生成失败: {message}")
     
 
+    def toggle_plan_stream(self):
+        """连接/断开下位机，连接后立即发送当前路径"""
+        if self.plan_stream is not None:
+            self.disconnect_plan_stream()
+            return
+        
+        host, _, port = self.control_panel.stream_address_edit.text().strip().rpartition(':')
+        try:
+            self.plan_stream = connect_plan_stream(host or '127.0.0.1', int(port))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "路径下发", f"无法连接下位机: {e}")
+            return
+        self.control_panel.stream_btn.setText("断开")
+        self.control_panel.status_label.setText("状态: 已连接下位机")
+        if self.current_path:
+            self.send_plan_stream(self.current_path, "")
+    
+    def disconnect_plan_stream(self):
+        """断开下位机：关闭发送端并等待其应答线程退出"""
+        self.plan_stream.close()
+        self.plan_stream = None
+        self.control_panel.stream_btn.setText("连接")
+        self.control_panel.status_label.setText("状态: 已断开下位机")
+
+    def send_plan_stream(self, path_with_states, message):
+        """已连接下位机时下发路径（不等待应答，应答由发送端后台线程接收）"""
+        if self.plan_stream is None:
+            return
+        try:
+            seq, size = self.plan_stream.send_plan(path_with_states, self.path_planner)
+        except OSError as e:
+            self.disconnect_plan_stream()
+            QMessageBox.warning(self, "路径下发", f"下发失败，已断开: {e}")
+            return
+        self.statusBar().showMessage(f"{message} | 已下发计划#{seq} ({size}字节)" if message
+                                     else f"已下发计划#{seq} ({size}字节)")
+    
+    def load_playback(self, path_with_states):
+        """载入回放路径，进度条每步PLAYBACK_SLIDER_TICKS格以支持插值拖动"""
+        self.playback.load(path_with_states)
+        slider = self.control_panel.playback_slider
+        slider.blockSignals(True)
+        slider.setRange(0, self.playback.last_step * PLAYBACK_SLIDER_TICKS)
+        slider.blockSignals(False)
+        self.control_panel.set_playback_enabled(True)
+        self.on_playback_progress(self.playback.progress)
+    
+    def unload_playback(self):
+        """停止回放并禁用回放控件"""
+        self.playback.unload()
+        self.control_panel.set_playback_enabled(False)
+        self.control_panel.playback_label.setText("回放: 未计算路径")
+    
+    def on_playback_progress(self, progress):
+        """回放进度变化时同步进度条和步骤说明"""
+        slider = self.control_panel.playback_slider
+        slider.blockSignals(True)
+        slider.setValue(round(progress * PLAYBACK_SLIDER_TICKS))
+        slider.blockSignals(False)
+        step = int(progress)
+        pos, collected = self.playback.path_with_states[step]
+        self.control_panel.playback_label.setText(
+            f"回放: 第{step}/{self.playback.last_step}步, 位置{self.get_display_number(pos)}, 已收集{len(collected)}个R2")
+    
+    def on_playback_slider_moved(self, value):
+        self.playback.seek(value / PLAYBACK_SLIDER_TICKS)
+    
+    def on_playback_speed_changed(self, index):
+        speed = float(self.control_panel.playback_speed_combo.itemText(index).rstrip('x'))
+        self.playback.set_speed(PathPlayback.DEFAULT_SPEED * speed)
+    
     def display_path_with_collection(self, path_with_states):
         """显示带收集任务的路径"""
         # 清除之前的路径和收集状态
         self.clear_path_display()
         self.clear_collected_display()
         
-        # 记录所有被收集的R2方块
-        all_collected = set()
-        if path_with_states:
-            final_collected = path_with_states[-1][1]
-            # 将frozenset转换为普通set
-            all_collected = set(final_collected) if isinstance(final_collected, frozenset) else final_collected
+        path = as_compact(path_with_states)
+        
+        # 记录所有被收集的R2方块（只需拾取事件，不必逐步扫描已收集集合）
+        all_collected = set(path.final_collected) if path else set()
         
         # 显示路径
-        positions_only = []
-        for pos, collected in path_with_states:
-            if pos not in [-1, self.path_planner.grid_size]:
-                positions_only.append(pos)
+        positions_only = path.positions if path else []
         
         for i, pos in enumerate(positions_only):
             row, col = pos // EXTENDED_GRID_WIDTH, pos % EXTENDED_GRID_WIDTH
@@ -461,6 +684,7 @@ R2构型: {'200与400台阶' if allow_400 else '仅200台阶'}
     
     def clear_path(self):
         """清除路径"""
+        self.unload_playback()
         self.clear_path_display()
         self.clear_collected_display()
         self.current_path = None
@@ -470,6 +694,7 @@ R2构型: {'200与400台阶' if allow_400 else '仅200台阶'}
     
     def clear_all(self):
         """清除所有方块和路径"""
+        self.unload_playback()
         for row in self.cells:
             for cell in row:
                 cell.clear_block()
@@ -575,43 +800,108 @@ R2构型: {'200与400台阶' if allow_400 else '仅200台阶'}
     def random_placement(self):
         self.clear_all()
         
-        # 获取所有绿色区域位置
-        green_positions = [self.get_extended_position(pos) for pos in range(ORIGINAL_GRID_SIZE)]
-        
-        entrance_available = [self.get_extended_position(pos) for pos in self.entrance_positions]
-        if entrance_available:
-            entrance_r2 = random.choice(entrance_available)
-            self.place_block(entrance_r2, 'R2')
-            green_positions.remove(entrance_r2)
-        
-        available_f_positions = [pos for pos in green_positions 
-                               if self.get_original_position(pos) not in self.forbidden_f_positions]
-        if available_f_positions:
-            f_position = random.choice(available_f_positions)
-            self.place_block(f_position, 'F')
-            green_positions.remove(f_position)
-        
-        available_r1_positions = [pos for pos in green_positions 
-                                if self.get_original_position(pos) in self.outer_positions]
-        if len(available_r1_positions) >= MAX_R1_COUNT:
-            r1_positions = random.sample(available_r1_positions, MAX_R1_COUNT)
-        else:
-            r1_positions = available_r1_positions
+        # 与无界面批量采样共用 core.layouts.random_layout，在所有合法布局中均匀抽取
+        layout = random_layout(random)
+        for pos, block_type in layout.get_blocks().items():
+            self.place_block(pos, block_type)
         
-        for pos in r1_positions:
-            self.place_block(pos, 'R1')
-            green_positions.remove(pos)
+        self.update_status()
+    
+    def find_worst_case_layout(self):
+        """保持当前R2不动，搜索使最优代价最大的R1/F放置并显示在棋盘上"""
+        _, r2_positions = self.collect_layout()
+        if not r2_positions:
+            QMessageBox.warning(self, "最坏布局", "请先放置R2方块！")
+            return
         
-        remaining_r2_count = MAX_R2_COUNT - 1
-        if len(green_positions) >= remaining_r2_count:
-            remaining_r2_positions = random.sample(green_positions, remaining_r2_count)
-        else:
-            remaining_r2_positions = green_positions
+        self.update_planner_settings()
+        result = self.adversarial_search.worst_case(r2_positions)
+        if result is None:
+            QMessageBox.warning(self, "最坏布局", "剩余位置不足以放下全部R1/F方块！")
+            return
         
-        for pos in remaining_r2_positions:
-            self.place_block(pos, 'R2')
+        self.clear_all()
+        for pos, block_type in result['layout'].get_blocks().items():
+            self.place_block(pos, block_type)
         
-        self.update_status()
+        if result['path'] is None:
+            self.control_panel.path_info_text.setText(
+                f"最坏布局: 任务无法完成\n搜索求解次数: {result['solves']}")
+            self.control_panel.status_label.setText("状态: 最坏布局下无可行路径")
+            return
+        
+        self.calculate_path()
+        self.control_panel.status_label.setText(
+            f"状态: 最坏布局代价 {result['cost']} (搜索求解 {result['solves']} 次)")
+    
+    def toggle_heatmap(self):
+        """
+        叠加/移除通行热力图
+        统计所选结果存储中与当前代价配置相同的行；存储中没有该配置时统计全部行
+        """
+        if self.board.heatmap is not None:
+            self.board.set_heatmap(None)
+            self.control_panel.heatmap_btn.setChecked(False)
+            return
+        
+        directory = QFileDialog.getExistingDirectory(self, "选择扫描结果存储目录")
+        self.control_panel.heatmap_btn.setChecked(False)
+        if not directory:
+            return
+        try:
+            store = ResultsStore(directory)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self, "热力图", f"无法打开结果存储: {e}")
+            return
+        
+        self.update_planner_settings()
+        profile = self.path_planner.get_profile()
+        query = store.query()
+        scope = "全部配置"
+        if profile in store.profiles:
+            query = query.where('profile', '==', store.profiles.index(profile))
+            scope = "当前配置"
+        heatmap = TraversalHeatmap()
+        heatmap.add_store(store, query.indices())
+        self.board.set_heatmap(heatmap)
+        self.control_panel.heatmap_btn.setChecked(True)
+        self.control_panel.status_label.setText(f"状态: 热力图（{scope}，{heatmap.plans} 条路径）")
+    
+    def open_results_browser(self):
+        """打开结果存储浏览窗口（非模态），选中行时在棋盘上显示该布局与存储的路径"""
+        directory = QFileDialog.getExistingDirectory(self, "选择扫描结果存储目录")
+        if not directory:
+            return
+        try:
+            store = ResultsStore(directory)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self, "结果浏览", f"无法打开结果存储: {e}")
+            return
+        
+        if self.results_browser is not None:
+            self.results_browser.close()
+        self.results_browser = ResultsBrowser(store, f"扫描结果浏览 - {os.path.basename(directory)}", self)
+        self.results_browser.rowSelected.connect(self.show_store_row)
+        self.results_browser.show()
+    
+    def show_store_row(self, index):
+        """显示结果存储第index行：应用其配置、摆放布局并载入存储的路径，不重新求解"""
+        store = self.results_browser.store
+        record = store.row(index)
+        self.apply_profile_to_controls(store.profiles[record['profile']])
+        
+        self.clear_all()
+        for pos, block_type in unrank_layout(record['rank']).get_blocks().items():
+            self.place_block(pos, block_type)
+        
+        path = store.path(index)
+        message = f"结果存储第 {index} 行（布局 {record['rank']}，配置 {record['profile']}）"
+        self.statusBar().showMessage(message)
+        if path is None:
+            self.control_panel.path_info_text.setText("路径信息: 无可行路径")
+            self.control_panel.status_label.setText("状态: 该布局在此配置下无可行路径")
+            return
+        self.show_path_result(path, "结果存储", message)
     
     def update_count_display(self):
         count_text = f"R1: {self.block_counts['R1']}/{MAX_R1_COUNT}, R2: {self.block_counts['R2']}/{MAX_R2_COUNT}, F: {self.block_counts['F']}/{MAX_F_COUNT}"
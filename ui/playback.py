@@ -0,0 +1,126 @@
+"""路径回放模块"""
+
+from PyQt5.QtCore import QObject, QTimer, QElapsedTimer, Qt, pyqtSignal
+
+
+class PathPlayback(QObject):
+    """
+    在棋盘上直接回放路径，无需编码视频
+    进度为浮点步数：整数部分决定轨迹与收集状态，小数部分用于机器人在两格之间插值；
+    只有步数变化时才更新格子状态，机器人移动只重画新旧位置覆盖的区域
+    """
+
+    progressChanged = pyqtSignal(float)
+    playingChanged = pyqtSignal(bool)
+
+    FRAME_INTERVAL_MS = 16  # 约60fps
+    DEFAULT_SPEED = 1.0     # 每秒步数，与视频默认每步1秒一致
+
+    def __init__(self, board, parent=None):
+        super().__init__(parent)
+        self.board = board
+        self.path_with_states = None
+        self.progress = 0.0
+        self.speed = self.DEFAULT_SPEED
+        self.applied_step = -1
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(self.FRAME_INTERVAL_MS)
+        self.timer.timeout.connect(self.on_frame)
+        self.clock = QElapsedTimer()
+
+    @property
+    def last_step(self):
+        return len(self.path_with_states) - 1 if self.path_with_states else 0
+
+    def is_playing(self):
+        return self.timer.isActive()
+
+    def load(self, path_with_states):
+        """载入新路径（停在完整路径显示状态）"""
+        self.pause()
+        self.path_with_states = path_with_states
+        self.applied_step = -1
+        self.progress = float(self.last_step)
+        self.progressChanged.emit(self.progress)
+
+    def unload(self):
+        """停止回放并移除机器人"""
+        self.pause()
+        self.path_with_states = None
+        self.applied_step = -1
+        self.board.clear_robot()
+
+    def set_speed(self, steps_per_second):
+        self.speed = max(0.01, steps_per_second)
+
+    def play(self):
+        if not self.path_with_states or self.is_playing():
+            return
+        if self.progress >= self.last_step:
+            self.progress = 0.0
+        self.clock.start()
+        self.timer.start()
+        self.playingChanged.emit(True)
+        self.apply(self.progress)
+
+    def pause(self):
+        if self.timer.isActive():
+            self.timer.stop()
+            self.playingChanged.emit(False)
+
+    def toggle(self):
+        if self.is_playing():
+            self.pause()
+        else:
+            self.play()
+
+    def stop(self):
+        """停止并恢复完整路径显示"""
+        if not self.path_with_states:
+            return
+        self.pause()
+        self.apply(float(self.last_step))
+        self.board.clear_robot()
+
+    def seek(self, progress):
+        """拖动进度条"""
+        if not self.path_with_states:
+            return
+        self.clock.restart()
+        self.apply(min(max(progress, 0.0), float(self.last_step)))
+
+    def on_frame(self):
+        """定时器帧：按实际经过时间推进进度"""
+        progress = self.progress + self.clock.restart() / 1000.0 * self.speed
+        if progress >= self.last_step:
+            progress = float(self.last_step)
+            self.timer.stop()
+            self.playingChanged.emit(False)
+        self.apply(progress)
+
+    def apply(self, progress):
+        """把棋盘设置为给定进度的状态"""
+        self.progress = progress
+        step = int(progress)
+        if step != self.applied_step:
+            self.apply_step(step)
+        pos = self.path_with_states[step][0]
+        next_pos = self.path_with_states[min(step + 1, self.last_step)][0]
+        self.board.set_robot(pos, next_pos, progress - step)
+        self.progressChanged.emit(progress)
+
+    def apply_step(self, step):
+        """轨迹显示前step+1个状态，R2收集状态取第step个状态"""
+        trail = {}
+        for order, (pos, _) in enumerate(self.path_with_states[:step + 1]):
+            trail[pos] = order
+        collected = self.path_with_states[step][1]
+        for row in self.board.cells:
+            for cell in row:
+                if cell.position in trail:
+                    cell.set_path(True, trail[cell.position])
+                else:
+                    cell.set_path(False)
+                cell.set_collected(cell.block_type == 'R2' and cell.position in collected)
+        self.applied_step = step
@@ -0,0 +1,180 @@
+"""扫描结果浏览模块 - 按需加载的结果存储表格，选中行即在棋盘上显示对应布局与路径"""
+
+import numpy as np
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                             QPushButton, QTableView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from core.layouts import unrank_layout
+from core.results_store import parse_condition
+from utils.constants import EXTENDED_GREEN_POSITIONS, POSITION_NUMBERS
+
+# (列名, 表头)；layout 为显示用虚拟列，按布局编号排序
+BROWSER_COLUMNS = [
+    ('rank', "布局编号"),
+    ('layout', "布局 R1 | R2 | F"),
+    ('profile', "配置"),
+    ('cost', "代价"),
+    ('steps', "步数"),
+    ('pickups', "拾取"),
+    ('entry', "入口"),
+    ('exit', "出口"),
+    ('moves_400', "400移动"),
+]
+
+# 每次向视图追加的行数
+FETCH_BATCH = 200
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    结果存储的只读表格模型
+    order 为当前筛选与排序下的存储行号，视图滚动到末尾时再按批追加，单元格取值时才读取列数据
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.order = np.arange(store.rows)
+        self.loaded = 0
+        self.sort_column = None
+        self.sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(BROWSER_COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.order)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self.order) - self.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return BROWSER_COLUMNS[section][1]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+        name = BROWSER_COLUMNS[index.column()][0]
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter) if name in ('layout', 'pickups') else int(Qt.AlignCenter)
+        if role != Qt.DisplayRole:
+            return None
+        row = int(self.order[index.row()])
+        if name == 'layout':
+            layout = unrank_layout(int(self.store.column('rank')[row]))
+            return " | ".join(",".join(str(POSITION_NUMBERS[p]) for p in sorted(getattr(layout, kind)))
+                              for kind in ('r1', 'r2', 'f'))
+        value = int(self.store.column(name)[row])
+        if name == 'cost' and value < 0:
+            return "无解"
+        if name == 'pickups':
+            return ",".join(str(cell + 1) for cell in range(len(EXTENDED_GREEN_POSITIONS)) if value >> cell & 1)
+        if name in ('entry', 'exit') and value == 0:
+            return "-"
+        return str(value)
+
+    def store_row(self, view_row):
+        """视图行 -> 存储行号"""
+        return int(self.order[view_row])
+
+    def set_rows(self, rows):
+        """替换为新的筛选结果，保持当前排序"""
+        self.beginResetModel()
+        self.order = np.asarray(rows)
+        self.loaded = min(FETCH_BATCH, len(self.order))
+        self.endResetModel()
+        if self.sort_column is not None:
+            self.sort(self.sort_column, self.sort_order)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """对全部筛选结果排序（稳定排序，相同值保持存储顺序），之后从第一批重新加载"""
+        self.sort_column, self.sort_order = column, order
+        name = BROWSER_COLUMNS[column][0]
+        values = np.asarray(self.store.column('rank' if name == 'layout' else name)[self.order], dtype=np.int64)
+        keys = -values if order == Qt.DescendingOrder else values
+        if name == 'cost':
+            # 无论升序降序，无解都排在最后
+            keys = np.where(values < 0, np.iinfo(np.int64).max, keys)
+        self.beginResetModel()
+        self.order = self.order[np.argsort(keys, kind='stable')]
+        self.loaded = min(FETCH_BATCH, len(self.order))
+        self.endResetModel()
+
+
+class ResultsBrowser(QDialog):
+    """结果存储浏览窗口：逗号分隔的筛选条件 + 可排序表格，选中行时发出 rowSelected(存储行号)"""
+
+    rowSelected = pyqtSignal(int)
+
+    def __init__(self, store, title="扫描结果浏览", parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.setWindowTitle(title)
+        self.resize(820, 520)
+
+        layout = QVBoxLayout(self)
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(QLabel("筛选:"))
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("如 profile==0, cost>20, pickups has 5")
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        filter_row.addWidget(self.filter_edit)
+        self.filter_btn = QPushButton("应用")
+        self.filter_btn.clicked.connect(self.apply_filter)
+        filter_row.addWidget(self.filter_btn)
+        layout.addLayout(filter_row)
+
+        self.model = ResultsTableModel(store, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(0, Qt.AscendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        # 只按首批行计算列宽，避免已加载行很多时每次刷新都重算
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.selectionModel().currentRowChanged.connect(self.on_current_row_changed)
+        layout.addWidget(self.table)
+
+        self.count_label = QLabel()
+        self.count_label.setFont(QFont("Arial", 10))
+        layout.addWidget(self.count_label)
+        self.update_count()
+
+    def apply_filter(self):
+        """解析筛选条件并刷新表格，条件有误时在状态行提示"""
+        query = self.store.query()
+        try:
+            for text in self.filter_edit.text().split(','):
+                if text.strip():
+                    query = query.where(*parse_condition(text))
+        except (ValueError, KeyError) as e:
+            self.count_label.setText(f"筛选条件有误: {e}")
+            return
+        self.model.set_rows(query.indices())
+        self.update_count()
+
+    def update_count(self):
+        self.count_label.setText(f"共 {len(self.model.order)} 行（存储 {self.store.rows} 行）")
+
+    def on_current_row_changed(self, current, previous):
+        if current.isValid():
+            self.rowSelected.emit(self.model.store_row(current.row()))
@@ -0,0 +1,84 @@
+"""灵敏度分析图表模块"""
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QColor, QFont, QPen, QPolygonF
+
+
+class SensitivityChart(QWidget):
+    """最优代价随单个代价参数变化的折线图，不同颜色表示不同最优方案，虚线为断点"""
+
+    PLAN_COLORS = [QColor(31, 119, 180), QColor(255, 127, 14), QColor(44, 160, 44),
+                   QColor(214, 39, 40), QColor(148, 103, 189), QColor(140, 86, 75)]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(180)
+        self.values = []
+        self.costs = []
+        self.plans = []
+        self.breakpoints = []
+        self.parameter_label = ""
+
+    def set_data(self, values, costs, plans, breakpoints, parameter_label):
+        """设置扫描结果"""
+        self.values = [int(v) for v in values]
+        self.costs = [int(c) for c in costs]
+        self.plans = [int(p) for p in plans]
+        self.breakpoints = breakpoints
+        self.parameter_label = parameter_label
+        self.update()
+
+    def clear(self):
+        """清除图表"""
+        self.values, self.costs, self.plans, self.breakpoints = [], [], [], []
+        self.update()
+
+    def paintEvent(self, event):
+        """绘制坐标轴、分段折线和断点"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), Qt.white)
+        painter.setFont(QFont("Arial", 8))
+
+        area = QRectF(self.rect()).adjusted(36, 10, -10, -28)
+        painter.setPen(QPen(QColor(80, 80, 80), 1))
+        painter.drawRect(area)
+
+        if not self.values:
+            painter.drawText(area, Qt.AlignCenter, "未分析")
+            return
+
+        x_min, x_max = self.values[0], self.values[-1]
+        y_min, y_max = min(self.costs), max(self.costs)
+        x_span = max(x_max - x_min, 1)
+        y_span = max(y_max - y_min, 1)
+
+        def to_point(x, y):
+            return QPointF(area.left() + (x - x_min) / x_span * area.width(),
+                           area.bottom() - (y - y_min) / y_span * area.height())
+
+        # 坐标刻度
+        painter.drawText(QRectF(0, area.top() - 6, 32, 12), Qt.AlignRight, str(y_max))
+        painter.drawText(QRectF(0, area.bottom() - 6, 32, 12), Qt.AlignRight, str(y_min))
+        painter.drawText(QRectF(area.left() - 20, area.bottom() + 2, 40, 12), Qt.AlignCenter, str(x_min))
+        painter.drawText(QRectF(area.right() - 20, area.bottom() + 2, 40, 12), Qt.AlignCenter, str(x_max))
+        painter.drawText(QRectF(area.left(), area.bottom() + 14, area.width(), 12), Qt.AlignCenter,
+                         self.parameter_label)
+
+        # 按最优方案分段绘制
+        start = 0
+        for i in range(1, len(self.values) + 1):
+            if i == len(self.values) or self.plans[i] != self.plans[start]:
+                color = self.PLAN_COLORS[self.plans[start] % len(self.PLAN_COLORS)]
+                painter.setPen(QPen(color, 2))
+                segment = QPolygonF([to_point(self.values[k], self.costs[k]) for k in range(start, i)])
+                painter.drawPolyline(segment)
+                start = i
+
+        # 断点
+        painter.setPen(QPen(QColor(120, 120, 120), 1, Qt.DashLine))
+        for value, _, new_plan in self.breakpoints:
+            top = to_point(value, y_max)
+            painter.drawLine(QPointF(top.x(), area.top()), QPointF(top.x(), area.bottom()))
+            painter.drawText(QPointF(top.x() + 2, area.top() + 10), f"{value}→方案{new_plan + 1}")
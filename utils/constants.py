@@ -139,4 +139,8 @@ DEFAULT_COST_UP_400 = 4
 DEFAULT_COST_DOWN_400 = 4
 DEFAULT_PICKUP_COST = 1
 DEFAULT_REQUIRED_R2_COUNT = 3
-DEFAULT_OUTER_ZONE_MOVE_COST = 1  # 新增：外围区域移动代价
\ No newline at end of file
+DEFAULT_OUTER_ZONE_MOVE_COST = 1  # 新增：外围区域移动代价
+
+# 朝向模型：每转90°的代价，转向后踏上200/400台阶前重新对齐的代价
+DEFAULT_TURN_COST = 1
+DEFAULT_ALIGN_COST = 1
\ No newline at end of file